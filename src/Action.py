@@ -0,0 +1,42 @@
+from typing import NamedTuple, Optional
+
+
+class Action(NamedTuple):
+    """
+    A decision of a single player on the current roll.
+
+    The active player may mark the white sum, one colored sum, both, or
+    neither (which adds a failed attempt). The other players may only mark
+    the white sum or pass, so their actions never use the colored fields.
+
+    Attributes
+    ----------
+    white_color : str, optional
+        The row marked with the sum of the white dice.
+    white_number : int, optional
+        The sum of the white dice.
+    colored_color : str, optional
+        The row marked with a white die plus the die of that color.
+    colored_number : int, optional
+        The sum of the white die and the colored die.
+    """
+
+    white_color: Optional[str] = None
+    white_number: Optional[int] = None
+    colored_color: Optional[str] = None
+    colored_number: Optional[int] = None
+
+    @property
+    def choice(self) -> int:
+        """
+        The menu number of the action as used by `Qwixx.play_action`.
+
+        Returns
+        -------
+        int
+            1 for white only, 2 for colored only, 3 for white followed by
+            colored and 4 for no mark at all.
+        """
+        if self.white_color is not None:
+            return 3 if self.colored_color is not None else 1
+        return 2 if self.colored_color is not None else 4
@@ -0,0 +1,96 @@
+from Action import Action
+
+
+class ActionSpace:
+    """
+    A fixed numbering of all possible decisions on a roll.
+
+    An action index is `white * N_COLORED + colored`. `white` is 0 to skip
+    the white dice, or 1 + the row marked with their sum. `colored` is 0 to
+    skip the colored dice, or 1 + 2 * the row + 0 for the lower and 1 for
+    the higher of the two sums of that colored die with a white die. Index
+    0 marks nothing, and the other players only use indices with
+    `colored` equal to 0.
+
+    Attributes
+    ----------
+    COLORS : tuple[str]
+        The colors of the rows, in the order used by the numbering.
+    N_WHITE : int
+        The number of options for the white dice.
+    N_COLORED : int
+        The number of options for the colored dice.
+    N_ACTIONS : int
+        The number of action indices.
+    """
+
+    COLORS = ("Red", "Yellow", "Green", "Blue")
+    N_WHITE = 1 + len(COLORS)
+    N_COLORED = 1 + 2 * len(COLORS)
+    N_ACTIONS = N_WHITE * N_COLORED
+
+    _ROW = {color: i for i, color in enumerate(COLORS)}
+
+    @classmethod
+    def encode(cls, roll: dict, action: Action) -> int:
+        """
+        Get the index of an action on a roll.
+
+        Parameters
+        ----------
+        roll : dict
+            The dictionary of the rolled dice, as returned by
+            `Qwixx.roll_dice`.
+        action : Action
+            The action.
+
+        Returns
+        -------
+        int
+            The index of the action.
+        """
+        white = 0
+        if action.white_color is not None:
+            white = 1 + cls._ROW[action.white_color]
+
+        colored = 0
+        if action.colored_color is not None:
+            sums = roll[action.colored_color]
+            colored = 1 + 2 * cls._ROW[action.colored_color] + \
+                (action.colored_number != sums[0])
+
+        return white * cls.N_COLORED + colored
+
+    @classmethod
+    def decode(cls, roll: dict, index: int) -> Action:
+        """
+        Get the action with the given index on a roll.
+
+        Parameters
+        ----------
+        roll : dict
+            The dictionary of the rolled dice, as returned by
+            `Qwixx.roll_dice`.
+        index : int
+            The index of the action.
+
+        Returns
+        -------
+        Action
+            The action.
+        """
+        white, colored = divmod(index, cls.N_COLORED)
+
+        white_color, white_number = None, None
+        if white:
+            white_color = cls.COLORS[white - 1]
+            white_number = roll["White"][0]
+
+        colored_color, colored_number = None, None
+        if colored:
+            row, high = divmod(colored - 1, 2)
+            colored_color = cls.COLORS[row]
+            colored_number = roll[colored_color][high]
+
+        return Action(white_color, white_number, colored_color,
+                      colored_number)
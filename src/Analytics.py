@@ -0,0 +1,528 @@
+from multiprocessing import Pool
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from ActionSpace import ActionSpace
+from GameLog import GameLog, GameLogReader
+from ScoreRow import ScoreRow
+
+
+class Analytics:
+    """
+    Aggregate statistics of the games in game logs.
+
+    The records of whole games are read in chunks and decoded all at once
+    as NumPy arrays, so a corpus is summarized in a single pass without a
+    Python object per game or event. Only histograms are kept, which add up
+    across chunks, files and processes (see `merge`):
+
+    - the final scores of the players, by number of players;
+    - the number of turns of the games;
+    - the turn in which each color was locked;
+    - the number of failed attempts of each player in a game;
+    - how often a player had no option: the active player without a white
+      option, without a colored option or without any mark, and the other
+      players without a white option.
+
+    A lock is a mark of the last number of a row after at least
+    `ScoreRow.LOCK_MARKS` other marks, found from the marks of the logged
+    actions. Games that have no END record, such as the last game of an
+    interrupted log, are left out.
+
+    Attributes
+    ----------
+    games : int
+        The number of games.
+    scores : numpy.ndarray
+        scores[n, s - SCORE_MIN] is the number of players of games with n
+        players that ended with score s.
+    turns : numpy.ndarray
+        turns[t] is the number of games that lasted t turns.
+    lock_turns : numpy.ndarray
+        lock_turns[c, t] is the number of games in which color c of
+        `ActionSpace.COLORS` was locked in turn t.
+    failed : numpy.ndarray
+        failed[k] is the number of players that ended a game with k failed
+        attempts.
+    options : Dict[str, int]
+        The number of decisions of the active player ("active"), of those
+        without a white option ("active_no_white"), without a colored option
+        ("active_no_colored") and without any mark ("active_none"), and the
+        number of times another player could decide on the white sum
+        ("passive") and had no option ("passive_none"). The other players
+        cannot decide after a failed attempt that ends the game.
+    """
+
+    SCORE_MIN = -20
+    SCORE_MAX = 300
+    N_SCORES = SCORE_MAX - SCORE_MIN + 1
+
+    # The fields of the records; the payload depends on the kind
+    RECORD = np.dtype({"names": ["kind", "player", "turn", "payload"],
+                       "formats": ["u1", "u1", "<u2", ("u1", 12)],
+                       "itemsize": GameLog.RECORD_SIZE})
+
+    # The last number of each row
+    LAST = np.array([ScoreRow(color).numbers[-1]
+                     for color in ActionSpace.COLORS])
+
+    # The legal-action bits of the marks of the white sum only and of the
+    # colored sums only
+    WHITE_BITS = sum(1 << (white * ActionSpace.N_COLORED)
+                     for white in range(1, ActionSpace.N_WHITE))
+    COLORED_BITS = sum(1 << colored
+                       for colored in range(1, ActionSpace.N_COLORED))
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.games = 0
+        self.scores = np.zeros((GameLog.MAX_PLAYERS + 1, self.N_SCORES),
+                               dtype=np.int64)
+        self.turns = np.zeros(0, dtype=np.int64)
+        self.lock_turns = np.zeros((len(ActionSpace.COLORS), 0),
+                                   dtype=np.int64)
+        self.failed = np.zeros(0, dtype=np.int64)
+        self.options = {"active": 0, "active_no_white": 0,
+                        "active_no_colored": 0, "active_none": 0,
+                        "passive": 0, "passive_none": 0}
+
+    @staticmethod
+    def _add(total: np.ndarray, part: np.ndarray) -> np.ndarray:
+        """Add histograms along their last axis, padding the shorter one."""
+        length = max(total.shape[-1], part.shape[-1])
+        pad = [(0, 0)] * (total.ndim - 1)
+        total = np.pad(total, pad + [(0, length - total.shape[-1])])
+        total += np.pad(part, pad + [(0, length - part.shape[-1])])
+        return total
+
+    def add_records(self, data: bytes) -> None:
+        """
+        Add the games in a block of records.
+
+        Parameters
+        ----------
+        data : bytes
+            The records of whole games, as returned by
+            `GameLogReader.raw`.
+
+        Returns
+        -------
+        None
+        """
+        records = np.frombuffer(data, dtype=self.RECORD)
+        if not len(records):
+            return
+        kind = records["kind"]
+        player = records["player"].astype(np.int64)
+        turn = records["turn"].astype(np.int64)
+        payload = records["payload"]
+
+        game = np.cumsum(kind == GameLog.GAME) - 1
+        n_games = game[-1] + 1
+        n_players = np.zeros(n_games, dtype=np.int64)
+        n_players[game[kind == GameLog.GAME]] = \
+            payload[kind == GameLog.GAME, 0]
+        finished = np.zeros(n_games, dtype=bool)
+        finished[game[kind == GameLog.END]] = True
+        keep = finished[game]
+
+        # The roll of every record: the last ROLL record up to it
+        positions = np.arange(len(records))
+        roll = np.maximum.accumulate(
+            np.where(kind == GameLog.ROLL, positions, 0))
+        faces = payload[roll, :6].astype(np.int64)
+
+        self._add_ends(records[(kind == GameLog.END) & keep], n_players)
+
+        act = (kind == GameLog.ACTION) & keep
+        active = act & (player == player[roll])
+        index = payload[:, 0].astype(np.int64)
+        masks = np.ascontiguousarray(payload[:, 1:9]).view("<u8").ravel()
+
+        self._add_options(masks[active])
+        passive = np.bincount(roll[act & ~active], minlength=len(records))
+
+        # The other players do not decide after the failed attempt that ends
+        # a game: it is the only active decision followed by the END record
+        last = np.flatnonzero((kind == GameLog.END) & keep) - 1
+        last = last[active[last] & (index[last] == 0)]
+        rolls = (kind == GameLog.ROLL) & keep
+        rolls[roll[last]] = False
+        opportunities = n_players[game[rolls]] - 1
+        self.options["passive"] += int(opportunities.sum())
+        self.options["passive_none"] += int(
+            (opportunities - passive[rolls]).sum())
+
+        # Failed attempts of every seat of every game
+        seat = game * GameLog.MAX_PLAYERS + player
+        failures = np.bincount(
+            seat[active & (index == 0)],
+            minlength=n_games * GameLog.MAX_PLAYERS,
+        ).reshape(n_games, GameLog.MAX_PLAYERS)
+        seated = (np.arange(GameLog.MAX_PLAYERS) < n_players[:, None]) & \
+            finished[:, None]
+        self.failed = self._add(self.failed, np.bincount(failures[seated]))
+
+        self._add_locks(np.flatnonzero(act), game, player, turn, index,
+                        faces, n_games, finished)
+
+    def _add_ends(self, ends: np.ndarray, n_players: np.ndarray) -> None:
+        """Count the final scores and game lengths."""
+        self.games += len(ends)
+        scores = np.ascontiguousarray(ends["payload"]).view("<i2").reshape(
+            len(ends), GameLog.MAX_PLAYERS).astype(np.int64)
+        players = ends["player"].astype(np.int64)
+        seated = np.arange(GameLog.MAX_PLAYERS) < players[:, None]
+        bins = np.clip(scores - self.SCORE_MIN, 0, self.N_SCORES - 1)
+        bins += (players * self.N_SCORES)[:, None]
+        self.scores += np.bincount(
+            bins[seated], minlength=self.scores.size).reshape(
+                self.scores.shape)
+        self.turns = self._add(self.turns,
+                               np.bincount(ends["turn"].astype(np.int64)))
+
+    def _add_options(self, masks: np.ndarray) -> None:
+        """Count the decisions of the active player without options."""
+        self.options["active"] += len(masks)
+        self.options["active_no_white"] += int(
+            np.count_nonzero(masks & np.uint64(self.WHITE_BITS) == 0))
+        self.options["active_no_colored"] += int(
+            np.count_nonzero(masks & np.uint64(self.COLORED_BITS) == 0))
+        self.options["active_none"] += int(np.count_nonzero(masks == 1))
+
+    def _add_locks(self, actions: np.ndarray, game: np.ndarray,
+                   player: np.ndarray, turn: np.ndarray, index: np.ndarray,
+                   faces: np.ndarray, n_games: int,
+                   finished: np.ndarray) -> None:
+        """Find the turn in which each color was locked in every game."""
+        white, colored = np.divmod(index[actions], ActionSpace.N_COLORED)
+        roll = faces[actions]
+        low = np.minimum(roll[:, 4], roll[:, 5])
+        high = np.maximum(roll[:, 4], roll[:, 5])
+
+        # Every mark, the white sum before the colored sum of an action
+        has_white = white > 0
+        has_colored = colored > 0
+        row = (colored - 1) // 2
+        die = roll[np.arange(len(actions)), np.maximum(row, 0)]
+        colored_number = die + np.where((colored - 1) % 2 == 1, high, low)
+        mark_record = np.concatenate([actions[has_white],
+                                      actions[has_colored]])
+        mark_order = np.concatenate([2 * actions[has_white],
+                                     2 * actions[has_colored] + 1])
+        mark_color = np.concatenate([white[has_white] - 1,
+                                     row[has_colored]])
+        mark_number = np.concatenate([(low + high)[has_white],
+                                      colored_number[has_colored]])
+
+        # The number of marks of each row up to and including each mark
+        key = (game[mark_record] * GameLog.MAX_PLAYERS +
+               player[mark_record]) * len(ActionSpace.COLORS) + mark_color
+        order = np.lexsort((mark_order, key))
+        key = key[order]
+        starts = np.ones(len(key), dtype=bool)
+        starts[1:] = key[1:] != key[:-1]
+        positions = np.arange(len(key))
+        count = positions - np.maximum.accumulate(
+            np.where(starts, positions, 0)) + 1
+
+        color = mark_color[order]
+        record = mark_record[order]
+        lock = (mark_number[order] == self.LAST[color]) & \
+            (count > ScoreRow.LOCK_MARKS)
+
+        first = np.full((n_games, len(ActionSpace.COLORS)), np.iinfo(
+            np.int64).max)
+        np.minimum.at(first, (game[record[lock]], color[lock]),
+                      turn[record[lock]])
+        locked = (first != np.iinfo(np.int64).max) & finished[:, None]
+        for c in range(len(ActionSpace.COLORS)):
+            counts = np.bincount(first[locked[:, c], c])
+            self.lock_turns = self._add(
+                self.lock_turns,
+                np.pad(counts[None, :], ((c, len(ActionSpace.COLORS) - c - 1),
+                                         (0, 0))))
+
+    def add_log(self, path: str, first: int = 0, last: int = None,
+                chunk_games: int = 10000) -> None:
+        """
+        Add the games of a log file, a chunk of games at a time.
+
+        Parameters
+        ----------
+        path : str
+            The path of the log file.
+        first : int, optional
+            The number of the first game. Defaults to 0.
+        last : int, optional
+            The number of the game after the last one. Defaults to the end.
+        chunk_games : int, optional
+            The number of games decoded at once. Defaults to 10000.
+
+        Returns
+        -------
+        None
+        """
+        with GameLogReader(path) as reader:
+            starts = reader.game_starts
+            if last is None or last > len(starts):
+                last = len(starts)
+            for start in range(first, last, chunk_games):
+                stop = min(start + chunk_games, last)
+                end = starts[stop] if stop < len(starts) else len(reader)
+                self.add_records(reader.raw(starts[start], end))
+
+    def merge(self, other: "Analytics") -> None:
+        """
+        Add the statistics of other games.
+
+        Parameters
+        ----------
+        other : Analytics
+            The statistics to add.
+
+        Returns
+        -------
+        None
+        """
+        self.games += other.games
+        self.scores += other.scores
+        self.turns = self._add(self.turns, other.turns)
+        self.lock_turns = self._add(self.lock_turns, other.lock_turns)
+        self.failed = self._add(self.failed, other.failed)
+        for key, count in other.options.items():
+            self.options[key] += count
+
+    @classmethod
+    def run(cls, paths: Sequence[str], processes: int = None,
+            chunk_games: int = 10000, progress: Callable = None
+            ) -> "Analytics":
+        """
+        Analyze log files on a process pool.
+
+        Parameters
+        ----------
+        paths : Sequence[str]
+            The paths of the log files.
+        processes : int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+            With 1, the logs are analyzed in this process.
+        chunk_games : int, optional
+            The number of games per task. Defaults to 10000.
+        progress : Callable, optional
+            Called with the statistics so far after every chunk.
+
+        Returns
+        -------
+        Analytics
+            The statistics of all games.
+        """
+        tasks = []
+        for path in paths:
+            with GameLogReader(path) as reader:
+                n_games = reader.n_games
+            tasks.extend((path, first, min(first + chunk_games, n_games))
+                         for first in range(0, n_games, chunk_games))
+
+        total = cls()
+        if processes == 1:
+            parts = map(cls.analyze_chunk, tasks)
+            for part in parts:
+                total.merge(part)
+                if progress is not None:
+                    progress(total)
+        else:
+            with Pool(processes) as pool:
+                for part in pool.imap_unordered(cls.analyze_chunk, tasks):
+                    total.merge(part)
+                    if progress is not None:
+                        progress(total)
+        return total
+
+    @staticmethod
+    def analyze_chunk(task: tuple) -> "Analytics":
+        """
+        Analyze a range of games of a log file.
+
+        Parameters
+        ----------
+        task : tuple
+            The path of the log file and the numbers of the first game and
+            of the game after the last one.
+
+        Returns
+        -------
+        Analytics
+            The statistics of the games.
+        """
+        path, first, last = task
+        analytics = Analytics()
+        analytics.add_log(path, first, last, chunk_games=last - first)
+        return analytics
+
+    @staticmethod
+    def _quantiles(counts: np.ndarray, values: np.ndarray,
+                   quantiles: Sequence[float]) -> List[int]:
+        """Read quantiles from a histogram."""
+        cumulative = np.cumsum(counts)
+        return [int(values[np.searchsorted(cumulative, q * cumulative[-1])])
+                for q in quantiles]
+
+    def _describe(self, counts: np.ndarray, values: np.ndarray) -> dict:
+        """Summarize a histogram."""
+        n = int(counts.sum())
+        if not n:
+            return {"count": 0}
+        mean = float((counts * values).sum() / n)
+        p10, p50, p90 = self._quantiles(counts, values, (0.1, 0.5, 0.9))
+        return {"count": n, "mean": mean,
+                "std": float(np.sqrt((counts * (values - mean) ** 2).sum() /
+                                     n)),
+                "p10": p10, "p50": p50, "p90": p90,
+                "min": int(values[counts > 0][0]),
+                "max": int(values[counts > 0][-1])}
+
+    def tables(self) -> Dict[str, dict]:
+        """
+        Summarize the statistics as small tables.
+
+        Returns
+        -------
+        Dict[str, dict]
+            The number of games ("games"); the count, mean, standard
+            deviation, percentiles, minimum and maximum of the final scores
+            by number of players ("scores") and of the game lengths in turns
+            ("turns"); per color the fraction of games in which it was
+            locked and the summary of the lock turns ("locks"); the fraction
+            of players with each number of failed attempts and their mean
+            ("failed"); and the fraction of decisions without options
+            ("options").
+        """
+        score_values = np.arange(self.SCORE_MIN, self.SCORE_MAX + 1)
+        scores = {n: self._describe(self.scores[n], score_values)
+                  for n in range(len(self.scores)) if self.scores[n].any()}
+
+        locks = {}
+        for c, color in enumerate(ActionSpace.COLORS):
+            counts = self.lock_turns[c] if self.lock_turns.shape[1] else \
+                np.zeros(0, dtype=np.int64)
+            summary = self._describe(counts, np.arange(len(counts)))
+            summary["rate"] = summary["count"] / self.games \
+                if self.games else 0.0
+            locks[color] = summary
+
+        seats = int(self.failed.sum())
+        failed = {"seats": seats,
+                  "mean": float((self.failed *
+                                 np.arange(len(self.failed))).sum() / seats)
+                  if seats else 0.0,
+                  "fractions": (self.failed / seats).tolist()
+                  if seats else []}
+
+        options = self.options
+        active = options["active"] or 1
+        passive = options["passive"] or 1
+        return {
+            "games": self.games,
+            "scores": scores,
+            "turns": self._describe(self.turns, np.arange(len(self.turns))),
+            "locks": locks,
+            "failed": failed,
+            "options": {
+                "active_no_white": options["active_no_white"] / active,
+                "active_no_colored": options["active_no_colored"] / active,
+                "active_none": options["active_none"] / active,
+                "passive_none": options["passive_none"] / passive,
+            },
+        }
+
+    def report(self) -> str:
+        """
+        Format the summary tables as text.
+
+        Returns
+        -------
+        str
+            The tables.
+        """
+        tables = self.tables()
+        lines = [f"{tables['games']} games", "",
+                 f"{'Players':<10}{'Seats':>10}{'Mean':>8}{'Std':>8}"
+                 f"{'p10':>6}{'p50':>6}{'p90':>6}"]
+        for n, row in tables["scores"].items():
+            lines.append(f"{n:<10}{row['count']:>10}{row['mean']:>8.2f}"
+                         f"{row['std']:>8.2f}{row['p10']:>6}{row['p50']:>6}"
+                         f"{row['p90']:>6}")
+
+        turns = tables["turns"]
+        if turns["count"]:
+            lines += ["", f"Turns: mean {turns['mean']:.1f}, p10 "
+                      f"{turns['p10']}, p50 {turns['p50']}, p90 "
+                      f"{turns['p90']}"]
+
+        lines += ["", f"{'Color':<10}{'Locked':>10}{'Mean turn':>11}"
+                  f"{'p50':>6}"]
+        for color, row in tables["locks"].items():
+            mean = f"{row['mean']:>11.1f}{row['p50']:>6}" \
+                if row["count"] else f"{'-':>11}{'-':>6}"
+            lines.append(f"{color:<10}{row['rate']:>10.3f}{mean}")
+
+        failed = tables["failed"]
+        lines += ["", f"Failed attempts per player: mean "
+                  f"{failed['mean']:.2f}, "
+                  + ", ".join(f"{k}: {fraction:.3f}" for k, fraction
+                              in enumerate(failed["fractions"]))]
+
+        options = tables["options"]
+        lines += ["", "Decisions without options: "
+                  f"active no white {options['active_no_white']:.3f}, "
+                  f"no colored {options['active_no_colored']:.3f}, "
+                  f"none {options['active_none']:.3f}; "
+                  f"others none {options['passive_none']:.3f}"]
+        return "\n".join(lines)
+
+    def save(self, path: str) -> None:
+        """
+        Save the histograms as an .npz file, to be merged or summarized
+        later.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+
+        Returns
+        -------
+        None
+        """
+        np.savez_compressed(
+            path, games=self.games, scores=self.scores, turns=self.turns,
+            lock_turns=self.lock_turns, failed=self.failed,
+            options=np.array([self.options[key] for key in self.options]))
+
+    @classmethod
+    def load(cls, path: str) -> "Analytics":
+        """
+        Load histograms saved by `save`.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+
+        Returns
+        -------
+        Analytics
+            The statistics.
+        """
+        analytics = cls()
+        with np.load(path) as data:
+            analytics.games = int(data["games"])
+            analytics.scores = data["scores"]
+            analytics.turns = data["turns"]
+            analytics.lock_turns = data["lock_turns"]
+            analytics.failed = data["failed"]
+            analytics.options = dict(zip(analytics.options,
+                                         data["options"].tolist()))
+        return analytics
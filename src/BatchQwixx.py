@@ -0,0 +1,482 @@
+from typing import Callable
+
+import numpy as np
+
+from ActionSpace import ActionSpace
+from ScoreRow import ScoreRow
+
+
+class BatchQwixx:
+    """
+    A batch of Qwixx games played in lockstep with NumPy arrays.
+
+    All games have the same number of players and apply the same rules as
+    `Qwixx`, but every turn is rolled, checked and applied for all unfinished
+    games at once. Rows are numbered as in `ActionSpace.COLORS` and a
+    position in a row counts from the left, so that a row is a bitmask like
+    in `ScoreRow`. Decisions are made by vectorized policies: callables that
+    take the batch, the deciding player of each game and the legal-action
+    masks, and return one `ActionSpace` index per game.
+
+    Attributes
+    ----------
+    n_games : int
+        The number of games in the batch.
+    n_players : int
+        The number of players in each game.
+    rng : numpy.random.Generator
+        The random number generator used for the dice.
+    marks : numpy.ndarray
+        (n_games, n_players, 4) bitmasks of the marked positions.
+    last : numpy.ndarray
+        (n_games, n_players, 4) positions of the last marks, -1 if none.
+    count : numpy.ndarray
+        (n_games, n_players, 4) numbers of marks.
+    closed : numpy.ndarray
+        (n_games, n_players, 4) flags of the closed rows.
+    failed : numpy.ndarray
+        (n_games, n_players) numbers of failed attempts.
+    locked : numpy.ndarray
+        (n_games, 4) flags of the locked colors.
+    turn_closed : numpy.ndarray
+        (n_games, 4) flags of the rows locked by any player in the current
+        turn.
+    enabled : numpy.ndarray
+        (n_games, 4) flags of the colors that are still active.
+    dice : numpy.ndarray
+        (n_games, 6) values of the red, yellow, green, blue and the two
+        white dice of the last roll.
+    current : numpy.ndarray
+        (n_games,) numbers of the active players.
+    done : numpy.ndarray
+        (n_games,) flags of the finished games.
+    turns : numpy.ndarray
+        (n_games,) numbers of turns played.
+    """
+
+    N_ROWS = len(ActionSpace.COLORS)
+    N_POSITIONS = 11
+
+    # The position of a sum s in row r is s * _DIRECTION[r] + _OFFSET[r]
+    _DIRECTION = np.array([1, 1, -1, -1], dtype=np.int8)
+    _OFFSET = np.array([-2, -2, 12, 12], dtype=np.int8)
+
+    # The row of each colored option, without the "skip" option
+    _COLORED_ROW = np.repeat(np.arange(N_ROWS), 2)
+
+    def __init__(self, n_games: int, n_players: int, seed: int = None):
+        """
+        Initialize the batch.
+
+        Parameters
+        ----------
+        n_games : int
+            The number of games in the batch.
+        n_players : int
+            The number of players in each game.
+        seed : int, optional
+            The seed of the random number generator.
+        """
+        self.n_games = n_games
+        self.n_players = n_players
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Start all games with empty score sheets and random start players.
+
+        Returns
+        -------
+        None
+        """
+        shape = (self.n_games, self.n_players, self.N_ROWS)
+        self.marks = np.zeros(shape, dtype=np.uint16)
+        self.last = np.full(shape, -1, dtype=np.int8)
+        self.count = np.zeros(shape, dtype=np.int8)
+        self.closed = np.zeros(shape, dtype=bool)
+        self.failed = np.zeros((self.n_games, self.n_players), dtype=np.int8)
+        self.locked = np.zeros((self.n_games, self.N_ROWS), dtype=bool)
+        self.enabled = np.ones((self.n_games, self.N_ROWS), dtype=bool)
+        self.turn_closed = np.zeros((self.n_games, self.N_ROWS), dtype=bool)
+        self.dice = np.zeros((self.n_games, 6), dtype=np.int8)
+        self.current = self.rng.integers(0, self.n_players, self.n_games)
+        self.done = np.zeros(self.n_games, dtype=bool)
+        self.turns = np.zeros(self.n_games, dtype=np.int32)
+
+    def reset_games(self, games: np.ndarray) -> None:
+        """
+        Start the given games again with empty score sheets and random start
+        players.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            The indices of the games.
+
+        Returns
+        -------
+        None
+        """
+        self.marks[games] = 0
+        self.last[games] = -1
+        self.count[games] = 0
+        self.closed[games] = False
+        self.failed[games] = 0
+        self.locked[games] = False
+        self.enabled[games] = True
+        self.turn_closed[games] = False
+        self.current[games] = self.rng.integers(0, self.n_players,
+                                                len(games))
+        self.done[games] = False
+        self.turns[games] = 0
+
+    def roll_dice(self, games: np.ndarray) -> None:
+        """
+        Roll the dice of the given games; the dice of locked colors are 0.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            The indices of the games.
+
+        Returns
+        -------
+        None
+        """
+        self.dice[games] = self.rng.integers(1, 7, (len(games), 6),
+                                             dtype=np.int8)
+        self.dice[games, :self.N_ROWS] *= self.enabled[games]
+
+    def positions(self, games: np.ndarray) -> tuple:
+        """
+        Get the positions of the rolled sums in each row.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            The indices of the games.
+
+        Returns
+        -------
+        numpy.ndarray, numpy.ndarray
+            The (len(games), 4) positions of the white sum and the
+            (len(games), 8) positions of the lower and higher colored sum of
+            each row.
+        """
+        dice = self.dice[games]
+        white = dice[:, 4] + dice[:, 5]
+        colored = np.sort(dice[:, :4, None] + dice[:, None, 4:], axis=2)
+
+        white_pos = white[:, None] * self._DIRECTION + self._OFFSET
+        colored_pos = colored * self._DIRECTION[:, None] + \
+            self._OFFSET[:, None]
+
+        return white_pos, colored_pos.reshape(len(games), 2 * self.N_ROWS)
+
+    def legal_mask(self, games: np.ndarray, players: np.ndarray,
+                   active: bool) -> np.ndarray:
+        """
+        Compute the legal actions of one player in each of the given games.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            The indices of the games.
+        players : numpy.ndarray
+            The number of the deciding player in each game.
+        active : bool
+            Whether the players are the active players.
+
+        Returns
+        -------
+        numpy.ndarray
+            (len(games), ActionSpace.N_ACTIONS) flags of the legal actions.
+        """
+        n = len(games)
+        white_pos, colored_pos = self.positions(games)
+        last = self.last[games, players]
+        count = self.count[games, players]
+        open_rows = ~self.closed[games, players]
+
+        # The last number of a row needs enough marks before it
+        end = self.N_POSITIONS - 1
+        ready = count >= ScoreRow.LOCK_MARKS
+        white_ok = open_rows & (white_pos > last) & ((white_pos < end) | ready)
+
+        mask = np.zeros((n, ActionSpace.N_WHITE, ActionSpace.N_COLORED),
+                        dtype=bool)
+        mask[:, 0, 0] = True
+        mask[:, 1:, 0] = white_ok
+
+        if active:
+            rows = self._COLORED_ROW
+            colored_open = (open_rows & self.enabled[games])[:, rows]
+            colored_ok = colored_open & (colored_pos > last[:, rows]) & \
+                ((colored_pos < end) | ready[:, rows])
+
+            # A colored sum in the row of the white sum has to come after it,
+            # and the white mark counts towards the last number
+            same = rows[None, None, :] == np.arange(self.N_ROWS)[None, :, None]
+            after_white = colored_open[:, None, :] & \
+                (colored_pos[:, None, :] > white_pos[:, :, None]) & \
+                ((colored_pos < end) |
+                 (count[:, rows] + 1 >= ScoreRow.LOCK_MARKS))[:, None, :]
+
+            mask[:, 0, 1:] = colored_ok
+            mask[:, 1:, 1:] = white_ok[:, :, None] & \
+                np.where(same, after_white, colored_ok[:, None, :])
+
+        return mask.reshape(n, ActionSpace.N_ACTIONS)
+
+    def _mark(self, games: np.ndarray, players: np.ndarray,
+              rows: np.ndarray, positions: np.ndarray) -> None:
+        """Mark one position in one row of one player in each game."""
+        self.marks[games, players, rows] |= \
+            (1 << positions.astype(np.uint16)).astype(np.uint16)
+        self.last[games, players, rows] = positions
+        self.count[games, players, rows] += 1
+        self.closed[games, players, rows] |= \
+            positions == self.N_POSITIONS - 1
+
+    def apply(self, games: np.ndarray, players: np.ndarray,
+              actions: np.ndarray, active: bool) -> np.ndarray:
+        """
+        Apply one legal action of one player in each of the given games.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            The indices of the games.
+        players : numpy.ndarray
+            The number of the deciding player in each game.
+        actions : numpy.ndarray
+            The `ActionSpace` index of the action in each game.
+        active : bool
+            Whether the players are the active players.
+
+        Returns
+        -------
+        numpy.ndarray
+            (len(games), 4) flags of the rows closed by the actions.
+        """
+        white_pos, colored_pos = self.positions(games)
+        white, colored = np.divmod(actions, ActionSpace.N_COLORED)
+        closed_before = self.closed[games, players]
+
+        sel = white > 0
+        if sel.any():
+            rows = white[sel] - 1
+            self._mark(games[sel], players[sel], rows,
+                       white_pos[sel, rows])
+
+        sel = colored > 0
+        if active and sel.any():
+            options = colored[sel] - 1
+            self._mark(games[sel], players[sel], self._COLORED_ROW[options],
+                       colored_pos[sel, options])
+
+        # Marking nothing is a failed attempt for the active player
+        if active:
+            sel = actions == 0
+            self.failed[games[sel], players[sel]] += 1
+
+        return self.closed[games, players] & ~closed_before
+
+    def is_game_over(self, games: np.ndarray) -> np.ndarray:
+        """
+        Check which of the given games have ended.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            The indices of the games.
+
+        Returns
+        -------
+        numpy.ndarray
+            (len(games),) flags of the finished games.
+        """
+        return (self.failed[games] >= 4).any(axis=1) | \
+            (self.enabled[games].sum(axis=1) <= 2)
+
+    def turn(self, policy: Callable = None) -> None:
+        """
+        Play one turn in every unfinished game.
+
+        Parameters
+        ----------
+        policy : Callable, optional
+            The vectorized policy of all players. Defaults to
+            `random_policy`.
+
+        Returns
+        -------
+        None
+        """
+        if policy is None:
+            policy = self.random_policy
+
+        games = np.flatnonzero(~self.done)
+        if len(games) == 0:
+            return
+
+        self.begin_turn(games)
+
+        # Let the current player go first
+        current = self.current[games]
+        mask = self.legal_mask(games, current, True)
+        self.apply_active(games, policy(self, current, mask))
+
+        over = self.is_game_over(games)
+        self.done[games[over]] = True
+        games, current = games[~over], current[~over]
+
+        # Let the other players mark the score sheet using the white dice
+        for i in range(self.n_players):
+            passive = games[current != i]
+            if len(passive) == 0:
+                continue
+            players = np.full(len(passive), i)
+            mask = self.legal_mask(passive, players, False)
+            self.apply_passive(passive, players,
+                               policy(self, players, mask))
+
+        self.end_turn(games)
+
+    def begin_turn(self, games: np.ndarray) -> None:
+        """
+        Roll the dice for the next turn of the given games.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            The indices of the games.
+
+        Returns
+        -------
+        None
+        """
+        self.roll_dice(games)
+        self.turns[games] += 1
+        self.turn_closed[games] = False
+
+    def apply_active(self, games: np.ndarray, actions: np.ndarray) -> None:
+        """
+        Apply the actions of the active players of the given games.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            The indices of the games.
+        actions : numpy.ndarray
+            The `ActionSpace` index of the action in each game.
+
+        Returns
+        -------
+        None
+        """
+        self.turn_closed[games] |= self.apply(games, self.current[games],
+                                              actions, True)
+
+    def apply_passive(self, games: np.ndarray, players: np.ndarray,
+                      actions: np.ndarray) -> None:
+        """
+        Apply the actions of other players than the active players.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            The indices of the games.
+        players : numpy.ndarray
+            The number of the deciding player in each game.
+        actions : numpy.ndarray
+            The `ActionSpace` index of the action in each game.
+
+        Returns
+        -------
+        None
+        """
+        self.turn_closed[games] |= self.apply(games, players, actions, False)
+
+    def end_turn(self, games: np.ndarray) -> np.ndarray:
+        """
+        Finish the turn of the given games after all players have decided.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            The indices of the games.
+
+        Returns
+        -------
+        numpy.ndarray
+            (len(games),) flags of the games that have ended.
+        """
+        # Lock the rows locked in this turn for every player
+        turn_closed = self.turn_closed[games]
+        self.closed[games] |= turn_closed[:, None, :]
+        self.locked[games] |= turn_closed
+        self.enabled[games] &= ~turn_closed
+
+        over = self.is_game_over(games)
+        self.done[games[over]] = True
+        games = games[~over]
+        self.current[games] = (self.current[games] + 1) % self.n_players
+        return over
+
+    def play(self, policy: Callable = None) -> np.ndarray:
+        """
+        Play all games until they have ended.
+
+        Parameters
+        ----------
+        policy : Callable, optional
+            The vectorized policy of all players. Defaults to
+            `random_policy`.
+
+        Returns
+        -------
+        numpy.ndarray
+            (n_games, n_players) final scores.
+        """
+        while not self.done.all():
+            self.turn(policy)
+
+        return self.calculate_scores()
+
+    def calculate_scores(self) -> np.ndarray:
+        """
+        Calculate the score of every player, like
+        `ScoreSheet.calculate_score`.
+
+        Returns
+        -------
+        numpy.ndarray
+            (n_games, n_players) scores.
+        """
+        count = self.count.astype(np.int32)
+        lock = self.last == self.N_POSITIONS - 1
+        rows = count * (count + 1) // 2 + lock
+        return rows.sum(axis=2) - 5 * self.failed.astype(np.int32)
+
+    def random_policy(self, batch, players: np.ndarray,
+                      mask: np.ndarray) -> np.ndarray:
+        """
+        Pick uniformly among the legal actions in every game.
+
+        Parameters
+        ----------
+        batch : BatchQwixx
+            The batch in which the decisions are made.
+        players : numpy.ndarray
+            The deciding player of each game.
+        mask : numpy.ndarray
+            The legal-action masks.
+
+        Returns
+        -------
+        numpy.ndarray
+            The `ActionSpace` index of the chosen action in each game.
+        """
+        return np.argmax(self.rng.random(mask.shape) * mask, axis=1)
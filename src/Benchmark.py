@@ -0,0 +1,327 @@
+import json
+import platform
+import random
+import time
+from typing import Callable, Dict, List, Sequence
+
+from DiceSource import BufferedDice, RandomDice
+from Die import Die
+from HeuristicPlayer import (CautiousPlayer, GreedyPlayer, LockRacingPlayer,
+                             SkipGapPlayer)
+from Player import RandomPlayer
+from Qwixx import Qwixx
+from Rules import STANDARD, Rules
+from ScoreRow import ScoreRow
+
+
+class Benchmark:
+    """
+    Time the hot paths of the engine and compare them with a baseline.
+
+    Every case is a setup function that prepares its inputs and returns a
+    callable doing `number` operations. A case is timed `repeat` times and
+    its best time counts, since slower runs only add noise from the rest of
+    the machine. All inputs come from seeded dice, so every run measures the
+    same work.
+
+    Results are a dict of cases, each with the number of operations per
+    second ("ops_per_sec") and the time per operation in microseconds
+    ("usec_per_op"), and can be saved as JSON and used as the baseline of a
+    later run.
+
+    Attributes
+    ----------
+    player_counts : Sequence[int]
+        The numbers of players of the cases that depend on them.
+    repeat : int
+        The number of timed runs per case.
+    seed : int
+        The seed of the inputs.
+    """
+
+    MIXED = Rules.variant(layouts={
+        "Yellow": (2, 3, 4, 5, 6, 7, 12, 11, 10, 9, 8),
+        "Green": (12, 11, 10, 9, 8, 7, 2, 3, 4, 5, 6)})
+
+    def __init__(self, player_counts: Sequence[int] = (2, 3, 4, 5),
+                 repeat: int = 5, seed: int = 0):
+        """
+        Initialize the benchmark.
+
+        Parameters
+        ----------
+        player_counts : Sequence[int], optional
+            The numbers of players of the cases that depend on them.
+            Defaults to 2 to 5.
+        repeat : int, optional
+            The number of timed runs per case. Defaults to 5.
+        seed : int, optional
+            The seed of the inputs. Defaults to 0.
+        """
+        self.player_counts = tuple(player_counts)
+        self.repeat = repeat
+        self.seed = seed
+
+    def cases(self) -> Dict[str, tuple]:
+        """
+        List the cases of the benchmark.
+
+        Returns
+        -------
+        Dict[str, tuple]
+            The setup function and the number of operations per run of each
+            case, mapped by name.
+        """
+        cases = {
+            "die_roll": (self._die_roll, 100000),
+            "roll_dice": (self._roll_dice, 20000),
+            "row_is_allowed": (self._row_is_allowed, 100000),
+            "row_fill_in_number": (self._row_fill_in_number, 20000),
+            "sheet_calculate_score": (self._sheet_calculate_score, 100000),
+        }
+        for n in self.player_counts:
+            cases[f"allowed_combinations_{n}p"] = (
+                lambda number, n=n: self._allowed_combinations(number, n),
+                20000)
+        for name, policy in (("greedy", GreedyPlayer),
+                             ("skip_gap", SkipGapPlayer),
+                             ("lock_racing", LockRacingPlayer),
+                             ("cautious", CautiousPlayer)):
+            cases[f"decision_{name}"] = (
+                lambda number, policy=policy: self._decision(number, policy),
+                20000)
+        for n in self.player_counts:
+            cases[f"games_{n}p"] = (
+                lambda number, n=n: self._games(number, n), 200)
+        # A variant with mixed-direction rows should be as fast as the
+        # standard game
+        cases["games_mixed_4p"] = (
+            lambda number: self._games(number, 4, self.MIXED), 200)
+        return cases
+
+    def _states(self, n_players: int, count: int) -> List[Qwixx]:
+        """Random positions of games, taken at every decision."""
+        rng = random.Random(self.seed)
+        dice = BufferedDice(self.seed)
+        states = []
+        while len(states) < count:
+            game = Qwixx(n_players, dice_source=dice)
+            game.reset()
+            while game.to_move is not None and len(states) < count:
+                states.append(game.clone())
+                game.step(rng.choice(game.legal_actions()))
+        return states
+
+    def _die_roll(self, number: int) -> Callable:
+        die = Die("Red", source=RandomDice(self.seed))
+
+        def run():
+            for _ in range(number):
+                die.roll()
+        return run
+
+    def _roll_dice(self, number: int) -> Callable:
+        game = Qwixx(4, dice_source=RandomDice(self.seed))
+
+        def run():
+            for _ in range(number):
+                game.roll_dice()
+        return run
+
+    def _row_is_allowed(self, number: int) -> Callable:
+        rng = random.Random(self.seed)
+        rows = []
+        for _ in range(64):
+            row = ScoreRow(rng.choice(("Red", "Green")))
+            for value in sorted(rng.sample(row.numbers[:-1], 4),
+                                key=row.position):
+                row.fill_in_number(value)
+            rows.append(row)
+        inputs = [(rows[i % 64], rng.randint(2, 12)) for i in range(number)]
+
+        def run():
+            for row, value in inputs:
+                row.is_allowed(value)
+        return run
+
+    def _row_fill_in_number(self, number: int) -> Callable:
+        # Every operation fills a fresh row from left to right
+        rng = random.Random(self.seed)
+        plans = []
+        for _ in range(number // 5):
+            plans.append(sorted(rng.sample(ScoreRow.ASCENDING, 5)))
+
+        def run():
+            for plan in plans:
+                row = ScoreRow("Red")
+                for value in plan:
+                    row.fill_in_number(value)
+        return run
+
+    def _sheet_calculate_score(self, number: int) -> Callable:
+        sheets = [state.players[0] for state in self._states(4, 64)]
+
+        def run():
+            for i in range(number):
+                sheets[i & 63].calculate_score()
+        return run
+
+    def _allowed_combinations(self, number: int, n_players: int) -> Callable:
+        states = self._states(n_players, 256)
+
+        def run():
+            for i in range(number):
+                state = states[i & 255]
+                state.allowed_combinations(state.roll, state.to_move)
+        return run
+
+    def _decision(self, number: int, policy: type) -> Callable:
+        states = self._states(4, 256)
+        inputs = [(state, state.to_move, state.legal_actions())
+                  for state in states]
+        player = policy(seed=self.seed)
+        # Fill the caches of the player, as in a long tournament
+        for state, player_number, actions in inputs:
+            player.choose_action(state, player_number, actions)
+
+        def run():
+            for i in range(number):
+                state, player_number, actions = inputs[i & 255]
+                player.choose_action(state, player_number, actions)
+        return run
+
+    def _games(self, number: int, n_players: int,
+               rules: Rules = STANDARD) -> Callable:
+        policies = [RandomPlayer(self.seed + i) for i in range(n_players)]
+        game = Qwixx(n_players, policies=policies,
+                     dice_source=BufferedDice(self.seed), rules=rules)
+
+        def run():
+            # Every run plays the same games
+            game.dice_source.seed(self.seed)
+            for i, policy in enumerate(policies):
+                policy.rng.seed(self.seed + i)
+            for _ in range(number):
+                game.play()
+        return run
+
+    def run(self, names: Sequence[str] = None,
+            progress: Callable = None) -> Dict[str, dict]:
+        """
+        Run the benchmark.
+
+        Parameters
+        ----------
+        names : Sequence[str], optional
+            The cases to run. Defaults to all cases.
+        progress : Callable, optional
+            Called with the name and the result of every case.
+
+        Returns
+        -------
+        Dict[str, dict]
+            The result of each case.
+
+        Raises
+        ------
+        ValueError
+            If a case does not exist.
+        """
+        cases = self.cases()
+        if names is None:
+            names = list(cases)
+        unknown = set(names) - set(cases)
+        if unknown:
+            raise ValueError(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+        results = {}
+        for name in names:
+            setup, number = cases[name]
+            run = setup(number)
+            best = float("inf")
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                run()
+                best = min(best, time.perf_counter() - start)
+
+            results[name] = {"ops_per_sec": number / best,
+                             "usec_per_op": best / number * 1e6}
+            if progress is not None:
+                progress(name, results[name])
+
+        return results
+
+    @staticmethod
+    def compare(results: Dict[str, dict], baseline: Dict[str, dict],
+                tolerance: float = 0.1) -> List[dict]:
+        """
+        Compare results with a baseline.
+
+        Parameters
+        ----------
+        results : Dict[str, dict]
+            The results of a run.
+        baseline : Dict[str, dict]
+            The results of the baseline run.
+        tolerance : float, optional
+            The fraction by which a case may be slower than the baseline
+            before it counts as a regression. Defaults to 0.1.
+
+        Returns
+        -------
+        List[dict]
+            Per case in both runs the name, the operations per second of
+            both runs, the speedup over the baseline and whether the case
+            regressed.
+        """
+        rows = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            old = baseline[name]["ops_per_sec"]
+            new = result["ops_per_sec"]
+            speedup = new / old
+            rows.append({"name": name, "baseline": old, "ops_per_sec": new,
+                         "speedup": speedup,
+                         "regression": speedup < 1 - tolerance})
+        return rows
+
+    @staticmethod
+    def save(results: Dict[str, dict], path: str) -> None:
+        """
+        Save results as JSON, with a description of the machine.
+
+        Parameters
+        ----------
+        results : Dict[str, dict]
+            The results of a run.
+        path : str
+            The path of the file.
+
+        Returns
+        -------
+        None
+        """
+        data = {"python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results}
+        with open(path, "w") as file:
+            json.dump(data, file, indent=2)
+
+    @staticmethod
+    def load(path: str) -> Dict[str, dict]:
+        """
+        Load results saved by `save`.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+
+        Returns
+        -------
+        Dict[str, dict]
+            The results.
+        """
+        with open(path) as file:
+            return json.load(file)["results"]
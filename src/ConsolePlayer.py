@@ -0,0 +1,323 @@
+from typing import List
+
+from Action import Action
+from Player import Player
+from ScoreSheet import ScoreSheet
+
+
+class ConsolePlayer(Player):
+    """
+    A human player that decides through the console.
+
+    Methods
+    -------
+    choose_action(game, player_number, actions) -> Action
+        Show the options and ask the player to choose one.
+    """
+
+    def choose_action(self, game, player_number: int,
+                      actions: List[Action]) -> Action:
+        player = game.players[player_number]
+        white_combos, colored_combos = game.allowed_combinations(
+            game.roll, player_number)
+
+        if player_number == game.current_player:
+            action = self.ask_active_action(player, white_combos,
+                                            colored_combos, actions)
+        else:
+            print("------------------------------------------------------")
+            print(
+                f"{player.name}, you can mark the score sheet "
+                "using the white dice\n"
+            )
+
+            print(player)
+            print("\nYour possible choices: ")
+            self.print_roll(white_combos)
+
+            color, number = self.ask_player_action(player, white_combos)
+            action = Action(color, number)
+
+        self.print_action(player, action,
+                          player_number == game.current_player)
+        return action
+
+    def ask_active_action(self, player: ScoreSheet, white_combos: dict,
+                          colored_combos: dict,
+                          actions: List[Action]) -> Action:
+        """
+        Ask the active player to choose an action.
+
+        Parameters
+        ----------
+        player : ScoreSheet
+            The score sheet of the active player.
+        white_combos : dict
+            The dictionary of the allowed white combinations.
+        colored_combos : dict
+            The dictionary of the allowed colored combinations.
+        actions : List[Action]
+            The legal actions.
+
+        Returns
+        -------
+        Action
+            The chosen action.
+        """
+
+        # Print the allowed white combinations
+        print(
+            f"{player.name} can mark the following using the white dice: "
+        )
+        self.print_roll(white_combos)
+
+        # Print the allowed combinations
+        print(
+            f"{player.name} can mark the following using other "
+            "combinations: "
+        )
+        self.print_roll(colored_combos)
+
+        # Show the player their score sheet
+        print(player)
+
+        # Ask the player to choose a combination
+        while True:
+            print(f"{player.name}, choose an action: ")
+            try:
+                choice = int(
+                    input(
+                        "1. Mark the score sheet using the white dice\n2. "
+                        "Mark the score sheet using the colored dice\n3. Mark "
+                        "the score sheet with the white dice followed by the "
+                        "colored dice\n4. Add a failed attempt\n"
+                    )
+                )
+                if choice not in [1, 2, 3, 4]:
+                    raise ValueError
+            except ValueError:
+                print("Invalid input.")
+                continue
+
+            print()
+
+            result = self.process_action_choice(
+                choice, white_combos, colored_combos, actions)
+
+            if result is None:
+                continue
+
+            action = Action(*result)
+            if action not in actions:
+                print("This action is not allowed. Try again.\n")
+                continue
+
+            return action
+
+    def get_combo_input(self, description: str, valid_combos: dict) -> tuple:
+        """
+        Get the input for a combination.
+
+        Parameters
+        ----------
+        description : str
+            The description of the combination.
+        valid_combos : dict
+            The dictionary of the allowed combinations.
+
+        Returns
+        -------
+        str, int
+            The chosen color and number.
+        """
+
+        combo = input(description)
+        split_combo = combo.split(" ")
+
+        try:
+            color, number = split_combo[0], int(split_combo[1])
+        except (IndexError, ValueError):
+            color, number = None, None
+
+        if color not in valid_combos or number not in valid_combos[color]:
+            print("Invalid choice. Try again.\n")
+            return None, None
+
+        return color, number
+
+    def process_action_choice(self, action: int, white_combos: dict,
+                              colored_combos: dict,
+                              actions: List[Action]) -> tuple:
+        """
+        Process the action choice.
+
+        After a white mark, the colored combinations are taken from the
+        legal actions that start with it, since the white mark can move the
+        row on and can make the last number of the row allowed.
+
+        Parameters
+        ----------
+        action : int
+            The action to be processed.
+        white_combos : dict
+            The dictionary of the allowed white combinations.
+        colored_combos : dict
+            The dictionary of the allowed colored combinations.
+        actions : List[Action]
+            The legal actions.
+
+        Returns
+        -------
+        tuple
+            The tuple of the chosen white color, white number, colored color,
+            and colored number.
+        """
+
+        white_color, white_number, colored_color, colored_number = \
+            None, None, None, None
+
+        if action in [1, 3]:
+            white_color, white_number = self.get_white_combo(white_combos)
+            if white_color is None:
+                return None
+
+        if action == 3:
+            colored_combos = {}
+            for legal in actions:
+                if legal.colored_color is not None and \
+                        legal.white_color == white_color and \
+                        legal.white_number == white_number:
+                    colored_combos.setdefault(legal.colored_color, []).append(
+                        legal.colored_number)
+            if not colored_combos:
+                print("No colored combination can follow this white "
+                      "combination. Try again.\n")
+                return None
+            print("After the white dice, you can mark: ")
+            self.print_roll(colored_combos)
+
+        if action in [2, 3]:
+            colored_color, colored_number = self.get_combo_input(
+                "Choose a combination that uses the colored dice:\n",
+                colored_combos)
+            if colored_color is None:
+                return None
+
+        return white_color, white_number, colored_color, colored_number
+
+    def get_white_combo(self, white_combos: dict) -> tuple:
+        """
+        Get the input for a white combination.
+
+        Parameters
+        ----------
+        white_combos : dict
+            The dictionary of the allowed white combinations.
+
+        Returns
+        -------
+        str, int
+            The chosen color and number.
+        """
+
+        return self.get_combo_input(
+            "Choose a combination that uses the white dice:\n", white_combos)
+
+    def ask_player_action(self, player: ScoreSheet, white_combos: dict):
+        """
+        Ask the player to choose an action.
+
+        Parameters
+        ----------
+        player : ScoreSheet
+            The player.
+        white_combos : dict
+            The dictionary of the allowed white combinations.
+
+        Returns
+        -------
+        str, int
+            The chosen color and number.
+        """
+
+        while True:
+            want_to = input(
+                "Would you like to mark the score sheet using the white dice? "
+                "(y/n)\n")
+            if want_to.lower() == "y":
+                color, number = self.get_white_combo(white_combos)
+                if color is not None:
+                    return color, number
+            elif want_to.lower() == "n":
+                return None, None
+            else:
+                print("Invalid choice. Try again.\n")
+
+    @staticmethod
+    def print_action(player: ScoreSheet, action: Action,
+                     active: bool) -> None:
+        """
+        Print the action a player has chosen.
+
+        Parameters
+        ----------
+        player : ScoreSheet
+            The player.
+        action : Action
+            The chosen action.
+        active : bool
+            Whether the player is the active player.
+
+        Returns
+        -------
+        None
+        """
+
+        choice = action.choice
+        if choice == 1:
+            print(
+                f"{player.name} marked the score sheet using the white dice "
+                f"{action.white_color} {action.white_number}."
+            )
+        elif choice == 2:
+            print(
+                f"{player.name} marked the score sheet using the colored "
+                f"dice {action.colored_color} {action.colored_number}."
+            )
+        elif choice == 3:
+            print(
+                f"{player.name} marked the score sheet using the white dice "
+                f"{action.white_color} {action.white_number} and the "
+                f"colored dice {action.colored_color} "
+                f"{action.colored_number}."
+            )
+        elif active:
+            print(f"{player.name} added a failed attempt.")
+
+        print()
+
+    @staticmethod
+    def print_roll(roll: dict):
+        """
+        Print the roll in a nice way.
+
+        Parameters
+        ----------
+        roll : dict
+            The dictionary of the rolled dice.
+
+        Returns
+        -------
+        None
+        """
+
+        print("Color     | Roll(s)")
+        print("----------+----------")
+        for key, value in roll.items():
+            r = key
+            r += " " * (10 - len(key)) + "| "
+            for v in value:
+                r += str(v) + " "
+
+            print(r)
+        print()
@@ -0,0 +1,212 @@
+import random
+from array import array
+from typing import Iterable
+
+
+class DiceSource:
+    """
+    Base class for the source of the die rolls of a game.
+
+    Methods
+    -------
+    roll(sides) -> int
+        Return the value of one die roll.
+    seed(seed)
+        Restart the source from a seed.
+    """
+
+    def roll(self, sides: int = 6) -> int:
+        """
+        Roll one die.
+
+        Parameters
+        ----------
+        sides : int, optional
+            The number of sides of the die. Defaults to 6.
+
+        Returns
+        -------
+        int
+            A value between 1 and the number of sides.
+        """
+        raise NotImplementedError
+
+    def seed(self, seed: int = None) -> None:
+        """
+        Restart the source from a seed.
+
+        Parameters
+        ----------
+        seed : int, optional
+            The seed. Defaults to a random seed.
+
+        Returns
+        -------
+        None
+        """
+        raise NotImplementedError
+
+
+class RandomDice(DiceSource):
+    """
+    Dice rolled one at a time with their own random number generator.
+
+    Attributes
+    ----------
+    rng : random.Random
+        The random number generator.
+    """
+
+    def __init__(self, seed: int = None):
+        """
+        Initialize the dice.
+
+        Parameters
+        ----------
+        seed : int, optional
+            The seed of the random number generator.
+        """
+        self.rng = random.Random(seed)
+
+    def roll(self, sides: int = 6) -> int:
+        return self.rng.randint(1, sides)
+
+    def seed(self, seed: int = None) -> None:
+        self.rng.seed(seed)
+
+
+class BufferedDice(DiceSource):
+    """
+    Dice read from buffers of rolls that are drawn in bulk.
+
+    A buffer is filled with random bytes at once. Bytes that would make
+    some values more likely than others are dropped, and the rest are
+    mapped to die values. Reading a roll from the buffer allocates nothing.
+
+    Attributes
+    ----------
+    rng : random.Random
+        The random number generator.
+    buffer_size : int
+        The number of random bytes drawn per refill.
+    """
+
+    def __init__(self, seed: int = None, buffer_size: int = 1 << 16):
+        """
+        Initialize the dice.
+
+        Parameters
+        ----------
+        seed : int, optional
+            The seed of the random number generator.
+        buffer_size : int, optional
+            The number of random bytes drawn per refill. Defaults to 65536.
+        """
+        self.rng = random.Random(seed)
+        self.buffer_size = buffer_size
+        self._buffers = {}
+        self._tables = {}
+
+    def seed(self, seed: int = None) -> None:
+        self.rng.seed(seed)
+        self._buffers.clear()
+
+    def roll(self, sides: int = 6) -> int:
+        buffer = self._buffers.get(sides)
+        if buffer is None or buffer[1] >= len(buffer[0]):
+            buffer = self._fill(sides)
+        values, position = buffer
+        buffer[1] = position + 1
+        return values[position]
+
+    def _fill(self, sides: int) -> list:
+        """Draw a new buffer of rolls of a die with the given sides."""
+        table = self._tables.get(sides)
+        if table is None:
+            if not 1 <= sides <= 255:
+                raise ValueError("Dice must have between 1 and 255 sides.")
+            # Keep the bytes below the largest multiple of sides
+            limit = 256 - 256 % sides
+            table = self._tables[sides] = (
+                bytes(b % sides + 1 if b < limit else 0 for b in range(256)),
+                bytes(range(limit, 256)),
+            )
+
+        values = b""
+        while not values:
+            raw = self.rng.getrandbits(8 * self.buffer_size).to_bytes(
+                self.buffer_size, "little")
+            values = raw.translate(*table)
+
+        buffer = self._buffers[sides] = [values, 0]
+        return buffer
+
+
+class ReplayDice(DiceSource):
+    """
+    Dice that replay a recorded sequence of rolls.
+
+    Attributes
+    ----------
+    values : array
+        The recorded rolls.
+    position : int
+        The index of the next roll.
+    """
+
+    def __init__(self, values: Iterable[int]):
+        """
+        Initialize the dice.
+
+        Parameters
+        ----------
+        values : Iterable[int]
+            The recorded rolls.
+        """
+        self.values = array("B", values)
+        self.position = 0
+
+    def roll(self, sides: int = 6) -> int:
+        if self.position >= len(self.values):
+            raise ValueError("The recorded rolls have run out.")
+        value = self.values[self.position]
+        self.position += 1
+        return value
+
+    def seed(self, seed: int = None) -> None:
+        """Replay the recorded rolls from the start; the seed is ignored."""
+        self.position = 0
+
+
+class RecordingDice(DiceSource):
+    """
+    Dice that record the rolls of another source, so they can be replayed.
+
+    Attributes
+    ----------
+    source : DiceSource
+        The source of the rolls.
+    values : array
+        The recorded rolls.
+    """
+
+    def __init__(self, source: DiceSource):
+        """
+        Initialize the dice.
+
+        Parameters
+        ----------
+        source : DiceSource
+            The source of the rolls.
+        """
+        self.source = source
+        self.values = array("B")
+
+    def roll(self, sides: int = 6) -> int:
+        value = self.source.roll(sides)
+        self.values.append(value)
+        return value
+
+    def seed(self, seed: int = None) -> None:
+        self.source.seed(seed)
+        del self.values[:]
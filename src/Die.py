@@ -1,4 +1,4 @@
-import random
+from DiceSource import DiceSource, RandomDice
 
 
 class Die:
@@ -11,6 +11,8 @@ class Die:
         The color of the die.
     sides : int
         The number of sides of the die (default is 6).
+    source : DiceSource
+        The source of the rolls of the die.
 
     Methods
     -------
@@ -18,7 +20,8 @@ class Die:
         Return a random value between 1 and the number of sides.
     """
 
-    def __init__(self, color: str, sides: int = 6):
+    def __init__(self, color: str, sides: int = 6,
+                 source: DiceSource = None):
         """
         Initialize the die.
 
@@ -28,9 +31,13 @@ class Die:
             The color of the die.
         sides : int, optional
             The number of sides of the die. Defaults to 6.
+        source : DiceSource, optional
+            The source of the rolls of the die. Defaults to its own unseeded
+            RandomDice.
         """
         self.color = color
         self.sides = sides
+        self.source = source if source is not None else RandomDice()
 
     def roll(self) -> int:
         """
@@ -41,4 +48,4 @@ class Die:
         int
             A random value between 1 and the number of sides.
         """
-        return random.randint(1, self.sides)
+        return self.source.roll(self.sides)
@@ -0,0 +1,487 @@
+import mmap
+import struct
+from typing import Iterator, List, NamedTuple
+
+from Action import Action
+from ActionSpace import ActionSpace
+
+
+class Recorder:
+    """
+    Base class for the observers of the events of a game.
+
+    A `Qwixx` game with a recorder calls it at the start of a game, after
+    every roll, before every decision is applied and at the end of the game.
+    The methods do nothing by default.
+    """
+
+    def start_game(self, game, start_player: int) -> None:
+        """
+        Called when a game starts, before the first roll.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The game.
+        start_player : int
+            The number of the player that starts.
+
+        Returns
+        -------
+        None
+        """
+
+    def roll(self, game) -> None:
+        """
+        Called after the dice are rolled for a turn.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The game, with the new roll and active player.
+
+        Returns
+        -------
+        None
+        """
+
+    def action(self, game, player_number: int, action: Action) -> None:
+        """
+        Called when a legal decision is about to be applied.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The game, still in the state before the decision.
+        player_number : int
+            The number of the deciding player.
+        action : Action
+            The decision.
+
+        Returns
+        -------
+        None
+        """
+
+    def end_game(self, game) -> None:
+        """
+        Called when the game is over.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The finished game.
+
+        Returns
+        -------
+        None
+        """
+
+
+class Event(NamedTuple):
+    """
+    A record of a game log.
+
+    Attributes
+    ----------
+    kind : int
+        One of `GameLog.GAME`, `GameLog.ROLL`, `GameLog.ACTION` and
+        `GameLog.END`.
+    player : int
+        The start player of a game, the active player of a roll, the
+        deciding player of an action or the number of players at the end.
+    turn : int
+        The number of the turn in the game, 0 at the start.
+    data : tuple
+        The number of players at the start of a game, the six faces of a
+        roll (see `Qwixx.faces`), the `ActionSpace` index and the mask of
+        legal indices of an action, or the final scores.
+    """
+
+    kind: int
+    player: int
+    turn: int
+    data: tuple
+
+
+class GameLog:
+    """
+    The binary format of game logs.
+
+    A log file starts with `MAGIC` and is followed by records of
+    `RECORD_SIZE` bytes, so the file can be appended to and any record can
+    be found by its index. Every record starts with its kind, a player and
+    the turn number (see `Event`); the rest depends on the kind:
+
+    - GAME: the number of players.
+    - ROLL: the faces of the red, yellow, green, blue and white dice.
+    - ACTION: the index of the action and a bit per legal index.
+    - END: the score of each player (at most `MAX_PLAYERS`).
+
+    A game is a GAME record followed by its rolls and actions in order and
+    an END record.
+    """
+
+    MAGIC = b"QWIXLOG1"
+    RECORD_SIZE = 16
+    MAX_PLAYERS = 6
+
+    GAME = 1
+    ROLL = 2
+    ACTION = 3
+    END = 4
+
+    STRUCTS = {
+        GAME: struct.Struct("<BBHB11x"),
+        ROLL: struct.Struct("<BBH6B6x"),
+        ACTION: struct.Struct("<BBHBQ3x"),
+        END: struct.Struct(f"<BBH{MAX_PLAYERS}h"),
+    }
+
+    @staticmethod
+    def legal_mask(game) -> int:
+        """
+        Get the mask of the `ActionSpace` indices of the legal actions.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The game.
+
+        Returns
+        -------
+        int
+            Bit i is set if action index i is legal for `game.to_move`.
+        """
+        mask = 0
+        for action in game.legal_actions():
+            mask |= 1 << ActionSpace.encode(game.roll, action)
+        return mask
+
+
+class GameLogWriter(Recorder):
+    """
+    A recorder that appends the events of games to a log file.
+
+    The records are packed into a preallocated buffer and written to the
+    file in bulk when the buffer is full, on `flush` and on `close`. The
+    writer can record any number of games one after the other.
+
+    Attributes
+    ----------
+    path : str
+        The path of the log file.
+    batch_size : int
+        The number of records written at once.
+    records : int
+        The number of records written by this writer.
+    games : int
+        The number of games started by this writer.
+    """
+
+    def __init__(self, path: str, batch_size: int = 1 << 16):
+        """
+        Open a log file for appending; a new file gets the header.
+
+        Parameters
+        ----------
+        path : str
+            The path of the log file.
+        batch_size : int, optional
+            The number of records written at once. Defaults to 65536.
+
+        Raises
+        ------
+        ValueError
+            If the file exists and is not a game log.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.records = 0
+        self.games = 0
+
+        self._file = open(path, "ab+")
+        self._file.seek(0)
+        header = self._file.read(len(GameLog.MAGIC))
+        if not header:
+            self._file.write(GameLog.MAGIC)
+        elif header != GameLog.MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a game log.")
+
+        self._buffer = bytearray(batch_size * GameLog.RECORD_SIZE)
+        self._used = 0
+
+    def _next(self) -> int:
+        """Get the offset of the next free record in the buffer."""
+        if self._used == len(self._buffer):
+            self.flush()
+        offset = self._used
+        self._used += GameLog.RECORD_SIZE
+        self.records += 1
+        return offset
+
+    def start_game(self, game, start_player: int) -> None:
+        game.rules.require_standard("GameLogWriter")
+        if game.n_players > GameLog.MAX_PLAYERS:
+            raise ValueError(
+                f"A game log has at most {GameLog.MAX_PLAYERS} players.")
+        GameLog.STRUCTS[GameLog.GAME].pack_into(
+            self._buffer, self._next(), GameLog.GAME, start_player, 0,
+            game.n_players)
+        self.games += 1
+
+    def roll(self, game) -> None:
+        GameLog.STRUCTS[GameLog.ROLL].pack_into(
+            self._buffer, self._next(), GameLog.ROLL, game.current_player,
+            game.turns, *game.faces)
+
+    def action(self, game, player_number: int, action: Action) -> None:
+        GameLog.STRUCTS[GameLog.ACTION].pack_into(
+            self._buffer, self._next(), GameLog.ACTION, player_number,
+            game.turns, ActionSpace.encode(game.roll, action),
+            GameLog.legal_mask(game))
+
+    def end_game(self, game) -> None:
+        scores = [player.calculate_score() for player in game.players]
+        scores += [0] * (GameLog.MAX_PLAYERS - len(scores))
+        GameLog.STRUCTS[GameLog.END].pack_into(
+            self._buffer, self._next(), GameLog.END, game.n_players,
+            game.turns, *scores)
+
+    def flush(self) -> None:
+        """
+        Write the buffered records to the file.
+
+        Returns
+        -------
+        None
+        """
+        if self._used:
+            self._file.write(memoryview(self._buffer)[:self._used])
+            self._used = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        Write the buffered records and close the file.
+
+        Returns
+        -------
+        None
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> "GameLogWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GameLogReader:
+    """
+    Read a game log without loading it into memory.
+
+    The file is memory-mapped, so records are decoded only when they are
+    accessed, and the operating system pages the file in and out as needed.
+    Records are indexed like a sequence, and the start of every game is
+    found once, on the first access by game, by scanning only the kind
+    bytes of the records.
+
+    Attributes
+    ----------
+    path : str
+        The path of the log file.
+    """
+
+    # The number of records whose kinds are scanned at once
+    _SCAN = 1 << 20
+
+    def __init__(self, path: str):
+        """
+        Open a log file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the log file.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a game log.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0,
+                               access=mmap.ACCESS_READ)
+        if self._mmap[:len(GameLog.MAGIC)] != GameLog.MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a game log.")
+
+        # A record cut off by an interrupted write is ignored
+        size = len(self._mmap) - len(GameLog.MAGIC)
+        self._length = size // GameLog.RECORD_SIZE
+        self._base = memoryview(self._mmap)
+        self._view = self._base[
+            len(GameLog.MAGIC):
+            len(GameLog.MAGIC) + self._length * GameLog.RECORD_SIZE]
+        self._starts = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> Event:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Record index out of range.")
+        return self._decode(index * GameLog.RECORD_SIZE)
+
+    def __iter__(self) -> Iterator[Event]:
+        return self.events()
+
+    def _decode(self, offset: int) -> Event:
+        """Decode the record at a byte offset."""
+        kind = self._view[offset]
+        kind, player, turn, *data = GameLog.STRUCTS[kind].unpack_from(
+            self._view, offset)
+        if kind == GameLog.END:
+            data = data[:player]
+        return Event(kind, player, turn, tuple(data))
+
+    def events(self, start: int = 0, stop: int = None) -> Iterator[Event]:
+        """
+        Iterate over a range of records.
+
+        Parameters
+        ----------
+        start : int, optional
+            The index of the first record. Defaults to 0.
+        stop : int, optional
+            The index after the last record. Defaults to the end.
+
+        Yields
+        ------
+        Event
+            The records in order.
+        """
+        if stop is None or stop > self._length:
+            stop = self._length
+        for offset in range(start * GameLog.RECORD_SIZE,
+                            stop * GameLog.RECORD_SIZE,
+                            GameLog.RECORD_SIZE):
+            yield self._decode(offset)
+
+    def raw(self, start: int = 0, stop: int = None) -> bytes:
+        """
+        Copy a range of records without decoding them, for bulk processing.
+
+        Parameters
+        ----------
+        start : int, optional
+            The index of the first record. Defaults to 0.
+        stop : int, optional
+            The index after the last record. Defaults to the end.
+
+        Returns
+        -------
+        bytes
+            The records, `RECORD_SIZE` bytes each.
+        """
+        if stop is None or stop > self._length:
+            stop = self._length
+        return bytes(self._view[start * GameLog.RECORD_SIZE:
+                                stop * GameLog.RECORD_SIZE])
+
+    @property
+    def game_starts(self) -> List[int]:
+        """
+        The index of the GAME record of every game.
+
+        Returns
+        -------
+        List[int]
+            The record indices, in order.
+        """
+        if self._starts is None:
+            starts = []
+            game = bytes([GameLog.GAME])
+            for first in range(0, self._length, self._SCAN):
+                last = min(first + self._SCAN, self._length)
+                kinds = bytes(self._view[first * GameLog.RECORD_SIZE:
+                                         last * GameLog.RECORD_SIZE:
+                                         GameLog.RECORD_SIZE])
+                i = kinds.find(game)
+                while i != -1:
+                    starts.append(first + i)
+                    i = kinds.find(game, i + 1)
+            self._starts = starts
+        return self._starts
+
+    @property
+    def n_games(self) -> int:
+        """
+        The number of games in the log, including an unfinished last game.
+
+        Returns
+        -------
+        int
+            The number of games.
+        """
+        return len(self.game_starts)
+
+    def game(self, number: int) -> List[Event]:
+        """
+        Get the records of one game.
+
+        Parameters
+        ----------
+        number : int
+            The number of the game in the log.
+
+        Returns
+        -------
+        List[Event]
+            The records of the game, from its GAME record to its END record.
+        """
+        starts = self.game_starts
+        stop = starts[number + 1] if number + 1 < len(starts) \
+            else self._length
+        return list(self.events(starts[number], stop))
+
+    def games(self) -> Iterator[List[Event]]:
+        """
+        Iterate over the games in the log.
+
+        Yields
+        ------
+        List[Event]
+            The records of each game.
+        """
+        for number in range(self.n_games):
+            yield self.game(number)
+
+    def close(self) -> None:
+        """
+        Unmap and close the file.
+
+        Returns
+        -------
+        None
+        """
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+            self._base.release()
+            self._view = None
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "GameLogReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
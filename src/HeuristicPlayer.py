@@ -0,0 +1,435 @@
+from operator import mul
+from typing import List
+
+from Action import Action
+from ActionSpace import ActionSpace
+from MoveTable import MoveTable
+from Player import Player
+from RollTable import RollTable
+from ScoreRow import ScoreRow
+
+
+class HeuristicPlayer(Player):
+    """
+    Base class for fast players that value every mark by a fixed rule.
+
+    The value of a mark only depends on the state of the row before it: the
+    position of the last mark plus one, the number of marks and the
+    position of the new mark, counted from the left in the same way for
+    ascending and descending rows. Subclasses define the rule in
+    `mark_value`, and it is evaluated once for every combination when the
+    player is created. A decision then only looks the marks of each legal
+    action up in this table and adds them, without building any
+    combinations or copying any sheets.
+
+    The tables assume the standard rules; other rules raise a ValueError.
+
+    The value of an action is the sum of the values of its marks, plus
+    `fail_value` if the active player marks nothing. Passing as one of the
+    other players is worth 0, so they only mark what is worth more.
+    Subclasses can also value the states of the rows after each action,
+    see `sheet_evaluator`.
+
+    Attributes
+    ----------
+    fail_value : float
+        The value of a failed attempt.
+    """
+
+    N_POSITIONS = len(ScoreRow.ASCENDING)
+    LAST = N_POSITIONS - 1
+
+    # The bits of the state of a row in the key of the states of a sheet,
+    # and the shift of the field of each row
+    STATE_BITS = (MoveTable.N_STATES - 1).bit_length()
+    _SHIFTS = tuple(range(0, STATE_BITS * len(ActionSpace.COLORS),
+                          STATE_BITS))
+
+    def __init__(self, seed: int = None, fail_value: float = -5.0):
+        """
+        Initialize the player and build its table of mark values.
+
+        Parameters
+        ----------
+        seed : int, optional
+            Unused; accepted so the player can enter a `Tournament`.
+        fail_value : float, optional
+            The value of a failed attempt. Defaults to -5, its score.
+        """
+        self.fail_value = fail_value
+        n = self.N_POSITIONS
+        self._values = tuple(
+            self.mark_value(state, count, position)
+            for state in range(n + 1)
+            for count in range(n + 1)
+            for position in range(n)
+        )
+
+    def mark_value(self, state: int, count: int, position: int) -> float:
+        """
+        Value a mark.
+
+        Parameters
+        ----------
+        state : int
+            The position of the last mark in the row plus one, 0 if the row
+            is empty.
+        count : int
+            The number of marks in the row.
+        position : int
+            The position of the new mark, from 0 to `LAST`.
+
+        Returns
+        -------
+        float
+            The value of the mark.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def points(cls, count: int, position: int) -> int:
+        """
+        Get the points that a mark adds to the score of its row.
+
+        Parameters
+        ----------
+        count : int
+            The number of marks in the row before the mark.
+        position : int
+            The position of the mark.
+
+        Returns
+        -------
+        int
+            The points, including the point for locking the row.
+        """
+        return count + 1 + (position == cls.LAST)
+
+    def sheet_evaluator(self, game, player_number: int):
+        """
+        Get a function that values the states of all rows after an action.
+
+        Its value is added to the value of every action, including the
+        action that marks nothing. It is asked for once per decision. The
+        states of the rows are packed into one integer key, so that actions
+        only change one or two fields of it and results can be memoized.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The game.
+        player_number : int
+            The number of the deciding player.
+
+        Returns
+        -------
+        Callable or None
+            A function of the key of the states after the action: the
+            `ScoreRow.state` of row k, in the order of the rows of the
+            sheet, is in the `STATE_BITS` bits from bit k * `STATE_BITS`.
+            None values the marks only.
+        """
+        return None
+
+    def choose_action(self, game, player_number: int,
+                      actions: List[Action]) -> Action:
+        game.rules.require_standard(type(self).__name__)
+        if len(actions) == 1:
+            return actions[0]
+
+        evaluate = self.sheet_evaluator(game, player_number)
+        if evaluate is not None:
+            return self._choose_evaluated(game, player_number, actions,
+                                          evaluate)
+
+        rows = game.players[player_number].rows
+        values = self._values
+        n = self.N_POSITIONS
+
+        # The first action marks nothing
+        best = actions[0]
+        best_value = self.fail_value \
+            if player_number == game.current_player else 0.0
+
+        for action in actions[1:]:
+            value = 0.0
+            white_color = action.white_color
+            if white_color is not None:
+                row = rows[white_color]
+                white_position = row.position(action.white_number)
+                value = values[((row.last + 1) * (n + 1) + row.count) * n +
+                               white_position]
+
+            colored_color = action.colored_color
+            if colored_color is not None:
+                row = rows[colored_color]
+                position = row.position(action.colored_number)
+                if colored_color == white_color:
+                    value += values[((white_position + 1) * (n + 1) +
+                                     row.count + 1) * n + position]
+                else:
+                    value += values[((row.last + 1) * (n + 1) + row.count) *
+                                    n + position]
+
+            if value > best_value:
+                best, best_value = action, value
+
+        return best
+
+    def _choose_evaluated(self, game, player_number: int,
+                          actions: List[Action], evaluate) -> Action:
+        """Choose an action, valuing the states of the rows after it too."""
+        rows = game.players[player_number].rows
+        values = self._values
+        n = self.N_POSITIONS
+
+        # Per row: the function that gives the position of a number, the
+        # offset of its marks in the table of values and, for the key of the
+        # states, the shift of its field, what a mark at position p adds to
+        # the field, minus p, after one and after two marks, and what a mark
+        # of the last number adds, as it closes the row
+        ready = MoveTable.READY
+        last = self.LAST
+        before = 0
+        fields = {}
+        for (color, row), shift in zip(rows.items(), self._SHIFTS):
+            state = row.state
+            before |= state << shift
+            count = row.count - row.lock_marks
+            fields[color] = (
+                row.position, ((row.last + 1) * (n + 1) + row.count) * n,
+                shift, 1 + ready * (count >= -1) - state,
+                1 + ready * (count >= -2) - state, MoveTable.CLOSED - state)
+
+        # The first action marks nothing
+        best = actions[0]
+        best_value = evaluate(before)
+        if player_number == game.current_player:
+            best_value += self.fail_value
+
+        for action in actions[1:]:
+            key = before
+            white_color = action.white_color
+            if white_color is None:
+                value = 0.0
+            else:
+                index, offset, shift, one, _, close = fields[white_color]
+                white_position = index(action.white_number)
+                value = values[offset + white_position]
+                key += (close if white_position == last
+                        else white_position + one) << shift
+
+            colored_color = action.colored_color
+            if colored_color is not None:
+                index, offset, shift, one, two, close = fields[colored_color]
+                position = index(action.colored_number)
+                if colored_color == white_color:
+                    # Only the colored number, after the white one, can be
+                    # the last number of the row
+                    value += values[((white_position + 1) * (n + 1) +
+                                     rows[colored_color].count + 1) * n +
+                                    position]
+                    key += (close - white_position - one if position == last
+                            else position - white_position + two - one) \
+                        << shift
+                else:
+                    value += values[offset + position]
+                    key += (close if position == last
+                            else position + one) << shift
+
+            value += evaluate(key)
+            if value > best_value:
+                best, best_value = action, value
+
+        return best
+
+
+class GreedyPlayer(HeuristicPlayer):
+    """
+    A player that takes the marks that add the most points right away.
+
+    Among marks worth the same, the one that skips the fewest numbers wins.
+    As one of the other players, it marks the white sum whenever it can.
+    """
+
+    def mark_value(self, state: int, count: int, position: int) -> float:
+        return self.points(count, position) - 0.001 * (position - state)
+
+
+class SkipGapPlayer(HeuristicPlayer):
+    """
+    A player that only marks numbers that skip few numbers in their row.
+
+    Marks that skip at most `max_skip` numbers are worth their points minus
+    `gap_cost` per skipped number. Other marks are only worth minus the
+    cost of their gap, so the player takes them only to avoid a failed
+    attempt.
+
+    Attributes
+    ----------
+    max_skip : int
+        The largest number of skipped numbers of a wanted mark.
+    gap_cost : float
+        The cost of each skipped number.
+    """
+
+    def __init__(self, seed: int = None, max_skip: int = 1,
+                 gap_cost: float = 1.0):
+        """
+        Initialize the player.
+
+        Parameters
+        ----------
+        seed : int, optional
+            Unused; accepted so the player can enter a `Tournament`.
+        max_skip : int, optional
+            The largest number of skipped numbers of a wanted mark.
+            Defaults to 1.
+        gap_cost : float, optional
+            The cost of each skipped number. Defaults to 1.
+        """
+        self.max_skip = max_skip
+        self.gap_cost = gap_cost
+        super().__init__(seed)
+
+    def mark_value(self, state: int, count: int, position: int) -> float:
+        skipped = position - state
+        cost = self.gap_cost * skipped
+        if skipped > self.max_skip:
+            return -cost
+        return self.points(count, position) - cost
+
+
+class LockRacingPlayer(HeuristicPlayer):
+    """
+    A player that races to lock rows and end the game.
+
+    It prefers the rows with the most marks, cares less about skipped
+    numbers the fuller a row is, avoids marks after which a row can no
+    longer be locked, and locks a row whenever it can.
+
+    Attributes
+    ----------
+    lock_value : float
+        The value of locking a row, on top of its points.
+    gap_cost : float
+        The cost of each skipped number in an empty row.
+    """
+
+    def __init__(self, seed: int = None, lock_value: float = 10.0,
+                 gap_cost: float = 1.0):
+        """
+        Initialize the player.
+
+        Parameters
+        ----------
+        seed : int, optional
+            Unused; accepted so the player can enter a `Tournament`.
+        lock_value : float, optional
+            The value of locking a row. Defaults to 10.
+        gap_cost : float, optional
+            The cost of each skipped number in an empty row. Defaults to 1.
+        """
+        self.lock_value = lock_value
+        self.gap_cost = gap_cost
+        super().__init__(seed)
+
+    def mark_value(self, state: int, count: int, position: int) -> float:
+        value = self.points(count, position)
+        if position == self.LAST:
+            # The last number is only legal with enough marks, and locks
+            return value + self.lock_value
+
+        # The most marks the row can have before its last number
+        if count + self.LAST - position < ScoreRow.LOCK_MARKS:
+            value -= self.lock_value / 2
+
+        progress = min(count, ScoreRow.LOCK_MARKS) / ScoreRow.LOCK_MARKS
+        return value - self.gap_cost * (1 - progress) * (position - state)
+
+
+class CautiousPlayer(HeuristicPlayer):
+    """
+    A player that avoids failed attempts.
+
+    Marks are valued by their points minus `gap_cost` per skipped number.
+    On top of that, every action is valued by the chance of a failed
+    attempt on the next roll of the player as the active player, read
+    exactly from the `RollTable` of the enabled colors: the player keeps
+    its rows open to as many sums as it can.
+
+    Attributes
+    ----------
+    gap_cost : float
+        The cost of each skipped number.
+    risk_weight : float
+        The weight of the expected cost of a failed attempt.
+    """
+
+    def __init__(self, seed: int = None, gap_cost: float = 1.0,
+                 risk_weight: float = 2.0):
+        """
+        Initialize the player.
+
+        Parameters
+        ----------
+        seed : int, optional
+            Unused; accepted so the player can enter a `Tournament`.
+        gap_cost : float, optional
+            The cost of each skipped number. Defaults to 1.
+        risk_weight : float, optional
+            The weight of the expected cost of a failed attempt. Defaults
+            to 2.
+        """
+        self.gap_cost = gap_cost
+        self.risk_weight = risk_weight
+        self._evaluators = {}
+        super().__init__(seed)
+
+    def mark_value(self, state: int, count: int, position: int) -> float:
+        return self.points(count, position) - \
+            self.gap_cost * (position - state)
+
+    def sheet_evaluator(self, game, player_number: int):
+        enabled = tuple(game.enabled_colors.values())
+        evaluate = self._evaluators.get(enabled)
+        if evaluate is None:
+            evaluate = self._evaluators[enabled] = self._evaluator(
+                [color for color, on in game.enabled_colors.items() if on])
+        return evaluate
+
+    def _evaluator(self, colors: List[str]):
+        """Build the function that values the keys of sheets."""
+        # The chance of no mark is a weighted sum over the pairs of white
+        # dice of the product of the terms of the rows. The products of the
+        # first and of the last half of the rows are kept for the states of
+        # these rows, the first with the weights, and the costs of the keys
+        # seen so far
+        terms, weights, scale = RollTable.for_colors(colors).miss_terms()
+        cost = self.risk_weight * self.fail_value / scale
+        bits = self.STATE_BITS
+        field = (1 << bits) - 1
+        half = len(terms) // 2
+        split = bits * half
+        low = (1 << split) - 1
+        halves = ((terms[:half], weights, {}),
+                  (terms[half:], (1,) * len(weights), {}))
+        costs = {}
+
+        def products(side: int, key: int) -> tuple:
+            rows, result, memo = halves[side]
+            if key in memo:
+                return memo[key]
+            for k, row_terms in enumerate(rows):
+                result = tuple(map(mul, result,
+                                   row_terms[key >> bits * k & field]))
+            memo[key] = result
+            return result
+
+        def evaluate(key: int) -> float:
+            result = costs.get(key)
+            if result is None:
+                result = costs[key] = cost * sum(map(
+                    mul, products(0, key & low), products(1, key >> split)))
+            return result
+        return evaluate
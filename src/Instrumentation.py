@@ -0,0 +1,347 @@
+import random
+import signal
+import time
+from array import array
+from collections import Counter
+from typing import Dict, List
+
+from Action import Action
+from Player import Player
+
+
+class PhaseStats:
+    """
+    The calls and timings of one phase of the turn loop.
+
+    The number of calls and the total time are exact. The individual times
+    are kept in a reservoir sample of fixed size, from which the
+    percentiles are read.
+
+    Attributes
+    ----------
+    calls : int
+        The number of calls.
+    total : float
+        The total time of the calls, in seconds.
+    samples : array
+        A uniform sample of the times of the calls, in seconds.
+    max_samples : int
+        The size of the sample.
+    """
+
+    def __init__(self, max_samples: int = 100000, seed: int = None):
+        """
+        Initialize the statistics.
+
+        Parameters
+        ----------
+        max_samples : int, optional
+            The size of the sample of times. Defaults to 100000.
+        seed : int, optional
+            The seed of the sampling.
+        """
+        self.calls = 0
+        self.total = 0.0
+        self.samples = array("d")
+        self.max_samples = max_samples
+        self._rng = random.Random(seed)
+
+    def add(self, seconds: float) -> None:
+        """
+        Record one call.
+
+        Parameters
+        ----------
+        seconds : float
+            The time of the call.
+
+        Returns
+        -------
+        None
+        """
+        self.calls += 1
+        self.total += seconds
+        if len(self.samples) < self.max_samples:
+            self.samples.append(seconds)
+        else:
+            i = int(self._rng.random() * self.calls)
+            if i < self.max_samples:
+                self.samples[i] = seconds
+
+    def summary(self) -> dict:
+        """
+        Summarize the calls.
+
+        Returns
+        -------
+        dict
+            The number of calls and the total, mean, median and 99th
+            percentile time in seconds.
+        """
+        if not self.calls:
+            return {"calls": 0, "total": 0.0}
+        samples = sorted(self.samples)
+        return {
+            "calls": self.calls,
+            "total": self.total,
+            "mean": self.total / self.calls,
+            "p50": samples[len(samples) // 2],
+            "p99": samples[min(len(samples) - 1, len(samples) * 99 // 100)],
+        }
+
+
+class _TimedPolicy(Player):
+    """A policy whose decisions are timed."""
+
+    def __init__(self, policy: Player, stats: PhaseStats):
+        self.policy = policy
+        self.stats = stats
+
+    def choose_action(self, game, player_number: int,
+                      actions: List[Action]) -> Action:
+        start = time.perf_counter()
+        try:
+            return self.policy.choose_action(game, player_number, actions)
+        finally:
+            self.stats.add(time.perf_counter() - start)
+
+
+class Instrumentation:
+    """
+    Counters, timers and a sampling profiler for the turn loop of games.
+
+    `attach` wraps the `PHASES` of a game in timers: `Qwixx.turn`,
+    `Qwixx.roll_dice`, `Qwixx.allowed_combinations`, `Qwixx.play_action` and
+    the decisions of the policies. The wrappers only exist on the instances
+    of attached games, so games that are not instrumented run exactly the
+    same code as before. `detach` removes them again.
+
+    The sampling profiler interrupts the process at a fixed interval of CPU
+    time and counts the function that is running and the functions that
+    called it. It uses a profiling timer signal, so it only works on Unix,
+    in the main thread.
+
+    Attributes
+    ----------
+    stats : Dict[str, PhaseStats]
+        The statistics of each phase.
+    samples : Counter
+        The number of profiler samples in which each function was running,
+        by "file:line(function)".
+    inclusive : Counter
+        The number of profiler samples in which each function was on the
+        stack.
+    """
+
+    PHASES = ("turn", "roll_dice", "allowed_combinations", "play_action",
+              "decision")
+    _METHODS = ("turn", "roll_dice", "allowed_combinations", "play_action")
+
+    def __init__(self, max_samples: int = 100000, seed: int = None):
+        """
+        Initialize the instrumentation.
+
+        Parameters
+        ----------
+        max_samples : int, optional
+            The number of times kept per phase for the percentiles.
+            Defaults to 100000.
+        seed : int, optional
+            The seed of the sampling of the times.
+        """
+        self.stats = {phase: PhaseStats(max_samples, seed)
+                      for phase in self.PHASES}
+        self.samples = Counter()
+        self.inclusive = Counter()
+        self._sampling = False
+        self._seconds = 0.0
+        self._start = None
+        self._game = None
+
+    def attach(self, game) -> "Instrumentation":
+        """
+        Start timing the phases of a game.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The game.
+
+        Returns
+        -------
+        Instrumentation
+            This instrumentation, to detach it in a with statement.
+        """
+        for name in self._METHODS:
+            setattr(game, name,
+                    self._timed(getattr(game, name), self.stats[name]))
+        game.policies = [_TimedPolicy(policy, self.stats["decision"])
+                         for policy in game.policies]
+        if self._start is None:
+            self._start = time.perf_counter()
+        self._game = game
+        return self
+
+    def detach(self, game=None) -> None:
+        """
+        Stop timing the phases of a game.
+
+        Parameters
+        ----------
+        game : Qwixx, optional
+            The game. Defaults to the last attached game.
+
+        Returns
+        -------
+        None
+        """
+        game = game if game is not None else self._game
+        if game is None:
+            return
+        for name in self._METHODS:
+            game.__dict__.pop(name, None)
+        game.policies = [policy.policy if isinstance(policy, _TimedPolicy)
+                         else policy for policy in game.policies]
+        if self._start is not None:
+            self._seconds += time.perf_counter() - self._start
+            self._start = None
+
+    def __enter__(self) -> "Instrumentation":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.detach()
+        self.stop_sampling()
+
+    @staticmethod
+    def _timed(method, stats: PhaseStats):
+        """Wrap a bound method in a timer."""
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats.add(clock() - start)
+
+        return timed
+
+    def start_sampling(self, interval: float = 0.001) -> None:
+        """
+        Start the sampling profiler.
+
+        Parameters
+        ----------
+        interval : float, optional
+            The CPU time between samples, in seconds. Defaults to 0.001.
+
+        Returns
+        -------
+        None
+        """
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        self._sampling = True
+
+    def stop_sampling(self) -> None:
+        """
+        Stop the sampling profiler.
+
+        Returns
+        -------
+        None
+        """
+        if self._sampling:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+            self._sampling = False
+
+    def _sample(self, signum, frame) -> None:
+        """Count the running function and its callers."""
+        self.samples[self._name(frame)] += 1
+        seen = set()
+        while frame is not None:
+            name = self._name(frame)
+            if name not in seen:
+                seen.add(name)
+                self.inclusive[name] += 1
+            frame = frame.f_back
+
+    @staticmethod
+    def _name(frame) -> str:
+        """The name of the function of a frame."""
+        code = frame.f_code
+        return f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+
+    def summary(self, top: int = 20) -> dict:
+        """
+        Summarize the run so far.
+
+        Parameters
+        ----------
+        top : int, optional
+            The number of functions of the profile. Defaults to 20.
+
+        Returns
+        -------
+        dict
+            The wall-clock time while attached ("seconds"), the summary of
+            every phase ("phases", see `PhaseStats.summary`) and the
+            functions with the most profiler samples with their own and
+            inclusive counts ("profile").
+        """
+        seconds = self._seconds
+        if self._start is not None:
+            seconds += time.perf_counter() - self._start
+        return {
+            "seconds": seconds,
+            "phases": {phase: stats.summary()
+                       for phase, stats in self.stats.items()},
+            "profile": [{"function": name, "samples": count,
+                         "inclusive": self.inclusive[name]}
+                        for name, count in self.samples.most_common(top)],
+        }
+
+    def report(self) -> str:
+        """
+        Format the phase summaries as a table.
+
+        Returns
+        -------
+        str
+            The table, with times in microseconds.
+        """
+        lines = [f"{'Phase':<22}{'Calls':>10}{'Total s':>10}{'Mean us':>10}"
+                 f"{'p99 us':>10}"]
+        for phase, row in self.summary()["phases"].items():
+            if not row["calls"]:
+                continue
+            lines.append(f"{phase:<22}{row['calls']:>10}"
+                         f"{row['total']:>10.3f}{row['mean'] * 1e6:>10.2f}"
+                         f"{row['p99'] * 1e6:>10.2f}")
+        return "\n".join(lines)
+
+    @classmethod
+    def merge(cls, summaries: List[dict]) -> Dict[str, dict]:
+        """
+        Add up the call counts and total times of several summaries.
+
+        Parameters
+        ----------
+        summaries : List[dict]
+            Summaries returned by `summary`, for example by several
+            processes.
+
+        Returns
+        -------
+        Dict[str, dict]
+            The number of calls, the total and the mean time of each phase.
+        """
+        merged = {}
+        for phase in cls.PHASES:
+            calls = sum(s["phases"][phase]["calls"] for s in summaries)
+            total = sum(s["phases"][phase]["total"] for s in summaries)
+            merged[phase] = {"calls": calls, "total": total,
+                             "mean": total / calls if calls else 0.0}
+        return merged
@@ -0,0 +1,233 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List
+
+from Action import Action
+from DiceSource import BufferedDice, RandomDice
+from Player import Player, RandomPlayer
+from TranspositionTable import TranspositionTable
+
+
+class MonteCarloPlayer(Player):
+    """
+    A player that plays the rest of the game out for every legal action.
+
+    Each decision runs rollouts until its time budget is used up: the game
+    is cloned with `Qwixx.clone`, the action is applied and every player
+    finishes the game with the rollout policy. The actions are tried in
+    turn, and the one with the best mean result wins. The result of a
+    rollout is the final score of the player minus the best final score of
+    the other players, or just the final score in a solitaire game.
+
+    Rollouts can run on a pool of threads or processes. Every worker gets
+    its own copy of the game and its own dice, and reports only its sums.
+
+    With a `TranspositionTable`, the sums of every decision are stored by
+    the position (see `Qwixx.position_key`), and a decision in a position
+    that was seen before, in this game or another, adds its new rollouts to
+    the stored ones.
+
+    Attributes
+    ----------
+    time_budget : float
+        The wall-clock time per decision, in seconds.
+    rollout_policy : Player
+        The policy of all players during a rollout.
+    workers : int
+        The number of parallel workers; 1 runs the rollouts in this thread.
+    max_rollouts : int
+        The maximum number of rollouts per worker and decision, or None.
+    cache : TranspositionTable
+        The rollout sums of earlier decisions by position, or None.
+    rollouts : int
+        The number of rollouts run so far.
+    seconds : float
+        The time spent on decisions so far.
+    last_decision : dict
+        The number of rollouts, the time and the mean result of each action
+        of the last decision.
+    """
+
+    def __init__(self, time_budget: float = 0.05,
+                 rollout_policy: Player = None, workers: int = 1,
+                 use_processes: bool = False, max_rollouts: int = None,
+                 seed: int = None, cache: TranspositionTable = None):
+        """
+        Initialize the player.
+
+        Parameters
+        ----------
+        time_budget : float, optional
+            The wall-clock time per decision, in seconds. Defaults to 0.05.
+        rollout_policy : Player, optional
+            The policy of all players during a rollout. Defaults to a
+            random player.
+        workers : int, optional
+            The number of parallel workers. Defaults to 1.
+        use_processes : bool, optional
+            Whether the workers are processes instead of threads. The game
+            and the rollout policy must then be picklable. Defaults to
+            False.
+        max_rollouts : int, optional
+            The maximum number of rollouts per worker and decision.
+        seed : int, optional
+            The seed of the dice of the rollouts.
+        cache : TranspositionTable, optional
+            The table in which the rollout sums are kept by position. It
+            can be shared with other players.
+        """
+        self.time_budget = time_budget
+        self.rollout_policy = rollout_policy if rollout_policy is not None \
+            else RandomPlayer(seed)
+        self.workers = workers
+        self.max_rollouts = max_rollouts
+        self.cache = cache
+        self.rng = random.Random(seed)
+        self.rollouts = 0
+        self.seconds = 0.0
+        self.last_decision = {}
+
+        self._executor = None
+        if workers > 1:
+            pool = ProcessPoolExecutor if use_processes else \
+                ThreadPoolExecutor
+            self._executor = pool(workers)
+
+    @property
+    def rollouts_per_second(self) -> float:
+        """
+        The number of rollouts per second of decision time so far.
+
+        Returns
+        -------
+        float
+            The rollouts per second, 0 before the first decision.
+        """
+        return self.rollouts / self.seconds if self.seconds else 0.0
+
+    def close(self) -> None:
+        """
+        Shut the pool of workers down.
+
+        Returns
+        -------
+        None
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def choose_action(self, game, player_number: int,
+                      actions: List[Action]) -> Action:
+        if len(actions) == 1:
+            return actions[0]
+
+        start = time.perf_counter()
+        # Workers get their own dice, so the copy does not need any. As one
+        # of the other players, the rollouts start with this player to move
+        root = game.deciding(player_number).clone(
+            policies=[], dice_source=RandomDice())
+
+        if self._executor is None:
+            totals, counts = self.run_rollouts(
+                root, player_number, actions, self.time_budget,
+                self.max_rollouts, self.rollout_policy,
+                self.rng.getrandbits(64))
+        else:
+            futures = [
+                self._executor.submit(
+                    self.run_rollouts, root, player_number, actions,
+                    self.time_budget, self.max_rollouts,
+                    self.rollout_policy, self.rng.getrandbits(64))
+                for _ in range(self.workers)
+            ]
+            totals = [0.0] * len(actions)
+            counts = [0] * len(actions)
+            for future in futures:
+                part_totals, part_counts = future.result()
+                for i in range(len(actions)):
+                    totals[i] += part_totals[i]
+                    counts[i] += part_counts[i]
+
+        rollouts = sum(counts)
+        if self.cache is not None:
+            key = root.position_key()
+            earlier = self.cache.get(key)
+            if earlier is not None and len(earlier[0]) == len(actions):
+                totals = [a + b for a, b in zip(totals, earlier[0])]
+                counts = [a + b for a, b in zip(counts, earlier[1])]
+            self.cache.put(key, (totals, counts))
+
+        means = [total / count if count else float("-inf")
+                 for total, count in zip(totals, counts)]
+        best = max(range(len(actions)), key=means.__getitem__)
+
+        elapsed = time.perf_counter() - start
+        self.rollouts += rollouts
+        self.seconds += elapsed
+        self.last_decision = {"rollouts": rollouts, "seconds": elapsed,
+                              "means": dict(zip(actions, means))}
+        return actions[best]
+
+    @staticmethod
+    def run_rollouts(game, player_number: int, actions: List[Action],
+                     time_budget: float, max_rollouts: int,
+                     rollout_policy: Player, seed: int) -> tuple:
+        """
+        Run rollouts of the actions in turn until the time budget is used.
+
+        Every action gets at least one rollout.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The game, waiting for the decision of the player.
+        player_number : int
+            The number of the deciding player.
+        actions : List[Action]
+            The actions to try.
+        time_budget : float
+            The time to spend, in seconds.
+        max_rollouts : int
+            The maximum number of rollouts, or None.
+        rollout_policy : Player
+            The policy of all players during a rollout.
+        seed : int
+            The seed of the dice of the rollouts.
+
+        Returns
+        -------
+        List[float], List[int]
+            The sum of the results and the number of rollouts of each
+            action.
+        """
+        deadline = time.perf_counter() + time_budget
+        dice = BufferedDice(seed, buffer_size=1 << 12)
+        game = game.clone([rollout_policy] * game.n_players, dice)
+        totals = [0.0] * len(actions)
+        counts = [0] * len(actions)
+
+        n = 0
+        while True:
+            i = n % len(actions)
+            rollout = game.clone()
+            rollout.step(actions[i])
+            while rollout.to_move is not None:
+                j = rollout.to_move
+                rollout.step(rollout_policy.choose_action(
+                    rollout, j, rollout.legal_actions()))
+
+            scores = [player.calculate_score() for player in rollout.players]
+            result = scores[player_number]
+            if len(scores) > 1:
+                result -= max(scores[:player_number] +
+                              scores[player_number + 1:])
+            totals[i] += result
+            counts[i] += 1
+            n += 1
+
+            if n >= len(actions) and (
+                    time.perf_counter() >= deadline or
+                    (max_rollouts is not None and n >= max_rollouts)):
+                return totals, counts
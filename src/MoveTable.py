@@ -0,0 +1,86 @@
+class MoveTable:
+    """
+    Precomputed legal marks of a row for every row state and roll.
+
+    Whether a number may be marked only depends on the position of the last
+    mark, on whether the row has enough marks to mark its last number and on
+    whether the row is closed. The state of a row is the position of its
+    last mark plus one (0 for an empty row), plus `READY` once the last
+    number may be marked, or `CLOSED` for a closed row. Numbers are looked
+    up directly by value.
+
+    Attributes
+    ----------
+    numbers : tuple[int]
+        The numbers in the row, from left to right.
+    allowed : tuple[tuple[bool]]
+        allowed[state][value] is True if value may be marked.
+    pairs : tuple[tuple[tuple[tuple[int]]]]
+        pairs[state][low][high] holds the distinct values of the colored
+        sums low and high that may be marked, in increasing order.
+    """
+
+    # Beyond the longest row that `Rules` allows
+    CLOSED = 31
+    READY = 32
+    N_STATES = 2 * READY
+
+    _tables = {}
+
+    def __init__(self, numbers: tuple):
+        """
+        Build the tables of a row.
+
+        Parameters
+        ----------
+        numbers : tuple[int]
+            The numbers in the row, from left to right.
+        """
+        self.numbers = numbers
+        n_values = max(numbers) + 1
+        position = {x: i for i, x in enumerate(numbers)}
+
+        # The first position that may be marked is beyond the longest row in
+        # a closed state
+        last = len(numbers) - 1
+        allowed = []
+        for state in range(self.N_STATES):
+            first = state % self.READY
+            allowed.append(tuple(
+                value in position and position[value] >= first and
+                (position[value] < last or state >= self.READY)
+                for value in range(n_values)
+            ))
+        self.allowed = tuple(allowed)
+
+        self.pairs = tuple(
+            tuple(
+                tuple(
+                    tuple(sorted({v for v in (low, high)
+                                  if allowed[state][v]}))
+                    for high in range(n_values)
+                )
+                for low in range(n_values)
+            )
+            for state in range(self.N_STATES)
+        )
+
+    @classmethod
+    def for_numbers(cls, numbers: tuple) -> "MoveTable":
+        """
+        Get the tables of a row, building them only once per layout.
+
+        Parameters
+        ----------
+        numbers : tuple[int]
+            The numbers in the row, from left to right.
+
+        Returns
+        -------
+        MoveTable
+            The tables of the row.
+        """
+        table = cls._tables.get(numbers)
+        if table is None:
+            table = cls._tables[numbers] = cls(numbers)
+        return table
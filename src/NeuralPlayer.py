@@ -0,0 +1,240 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+import numpy as np
+
+from Action import Action
+from ActionSpace import ActionSpace
+from Player import Player
+from QwixxEnv import QwixxEnv
+
+
+class InferenceBatcher:
+    """
+    Collect the decisions of many games into batched calls of a model.
+
+    Games that run at the same time, each in its own thread, submit an
+    observation and a legal-action mask and wait for the answer. A worker
+    thread stacks the waiting requests into one batch as soon as
+    `batch_size` requests are waiting or the oldest one has waited
+    `max_wait` seconds, calls the model once for the batch and hands every
+    game its action. Requests with observations of different lengths, from
+    games with different numbers of players, go into separate batches.
+
+    The model is any callable that takes a (batch, observation_size)
+    float32 array of observations and a (batch, ActionSpace.N_ACTIONS)
+    bool array of legal-action masks, and returns (batch, N_ACTIONS)
+    scores, such as the logits of a policy network. The legal action with
+    the highest score is played.
+
+    Attributes
+    ----------
+    model : Callable
+        The model.
+    batch_size : int
+        The largest number of requests per call of the model.
+    max_wait : float
+        The longest time a request waits for a fuller batch, in seconds.
+    calls : int
+        The number of calls of the model so far.
+    requests : int
+        The number of answered requests so far.
+    """
+
+    def __init__(self, model: Callable, batch_size: int = 64,
+                 max_wait: float = 0.002):
+        """
+        Initialize the batcher and start its worker thread.
+
+        Parameters
+        ----------
+        model : Callable
+            The model.
+        batch_size : int, optional
+            The largest number of requests per call. Defaults to 64.
+        max_wait : float, optional
+            The longest time a request waits for a fuller batch, in
+            seconds. Defaults to 0.002.
+        """
+        self.model = model
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.calls = 0
+        self.requests = 0
+
+        self._queue = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    @property
+    def mean_batch_size(self) -> float:
+        """
+        The mean number of requests per call of the model.
+
+        Returns
+        -------
+        float
+            The mean batch size, 0 before the first call.
+        """
+        return self.requests / self.calls if self.calls else 0.0
+
+    def submit(self, observation: np.ndarray, mask: np.ndarray) -> Future:
+        """
+        Queue a request.
+
+        Parameters
+        ----------
+        observation : numpy.ndarray
+            The observation vector.
+        mask : numpy.ndarray
+            The flags of the legal action indices.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            The future `ActionSpace` index of the chosen action.
+
+        Raises
+        ------
+        RuntimeError
+            If the batcher is closed.
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The batcher is closed.")
+            self._queue.append((time.perf_counter(), observation, mask,
+                                future))
+            self._condition.notify()
+        return future
+
+    def decide(self, observation: np.ndarray, mask: np.ndarray) -> int:
+        """
+        Queue a request and wait for its answer.
+
+        Parameters
+        ----------
+        observation : numpy.ndarray
+            The observation vector.
+        mask : numpy.ndarray
+            The flags of the legal action indices.
+
+        Returns
+        -------
+        int
+            The `ActionSpace` index of the chosen action.
+        """
+        return self.submit(observation, mask).result()
+
+    def _run(self) -> None:
+        """Form batches and answer them until the batcher is closed."""
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+
+                # Wait for a full batch, at most until the oldest request
+                # has waited long enough
+                deadline = self._queue[0][0] + self.max_wait
+                while len(self._queue) < self.batch_size and \
+                        not self._closed:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                size = len(self._queue[0][1])
+                batch = [request for request in self._queue
+                         if len(request[1]) == size][:self.batch_size]
+                taken = set(id(request) for request in batch)
+                self._queue = [request for request in self._queue
+                               if id(request) not in taken]
+
+            self._answer(batch)
+
+    def _answer(self, batch: list) -> None:
+        """Run the model on a batch and resolve its futures."""
+        observations = np.stack([request[1] for request in batch])
+        masks = np.stack([request[2] for request in batch])
+        try:
+            scores = np.asarray(self.model(observations, masks),
+                                dtype=np.float64)
+            choices = np.where(masks, scores, -np.inf).argmax(axis=1)
+        except Exception as error:
+            for request in batch:
+                request[3].set_exception(error)
+            return
+
+        self.calls += 1
+        self.requests += len(batch)
+        for request, choice in zip(batch, choices.tolist()):
+            request[3].set_result(choice)
+
+    def close(self) -> None:
+        """
+        Answer the waiting requests and stop the worker thread.
+
+        Returns
+        -------
+        None
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join()
+
+    def __enter__(self) -> "InferenceBatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class NeuralPlayer(Player):
+    """
+    A player whose decisions come from a model through an InferenceBatcher.
+
+    The state is encoded with `QwixxEnv.encode` from the deciding player's
+    point of view, so a model trained on `QwixxEnv` or `VecQwixxEnv` can be
+    used as is. The player only pays off when many games run at the same
+    time in different threads, for example with
+    `ThreadPoolExecutor.map(Qwixx.play, games)`, so that their decisions
+    can be batched.
+
+    Attributes
+    ----------
+    batcher : InferenceBatcher
+        The batcher of the model.
+    """
+
+    def __init__(self, batcher: InferenceBatcher):
+        """
+        Initialize the player.
+
+        Parameters
+        ----------
+        batcher : InferenceBatcher
+            The batcher of the model.
+        """
+        self.batcher = batcher
+
+    def choose_action(self, game, player_number: int,
+                      actions: List[Action]) -> Action:
+        game.rules.require_standard("NeuralPlayer")
+        if len(actions) == 1:
+            return actions[0]
+
+        indices = {ActionSpace.encode(game.roll, action): action
+                   for action in actions}
+        mask = np.zeros(ActionSpace.N_ACTIONS, dtype=bool)
+        mask[list(indices)] = True
+
+        index = self.batcher.decide(QwixxEnv.encode(game, player_number),
+                                    mask)
+        return indices[index]
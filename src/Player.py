@@ -0,0 +1,69 @@
+import random
+from typing import List
+
+from Action import Action
+
+
+class Player:
+    """
+    Base class for a player policy.
+
+    A policy is asked for a decision whenever the player it controls has to
+    act: as the active player after each roll, and as one of the other
+    players when the white dice may be used.
+
+    Methods
+    -------
+    choose_action(game, player_number, actions) -> Action
+        Choose one of the legal actions.
+    """
+
+    def choose_action(self, game, player_number: int,
+                      actions: List[Action]) -> Action:
+        """
+        Choose one of the legal actions.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The game in which the decision is made. The other players
+            decide on the white sum at the same time, so `to_move` may be
+            another of them; a policy that plays on from the game gets it
+            with the player to move from `Qwixx.deciding`.
+        player_number : int
+            The number of the player that has to decide.
+        actions : List[Action]
+            The legal actions, as returned by `Qwixx.legal_actions`.
+
+        Returns
+        -------
+        Action
+            The chosen action.
+        """
+        raise NotImplementedError
+
+
+class RandomPlayer(Player):
+    """
+    A player that picks uniformly among the legal actions.
+
+    Attributes
+    ----------
+    rng : random.Random
+        The random number generator used for the decisions.
+    """
+
+    def __init__(self, seed: int = None):
+        """
+        Initialize the player.
+
+        Parameters
+        ----------
+        seed : int, optional
+            The seed of the random number generator.
+        """
+        self.rng = random.Random(seed)
+
+    def choose_action(self, game, player_number: int,
+                      actions: List[Action]) -> Action:
+        return actions[int(self.rng.random() * len(actions))]
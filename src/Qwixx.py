@@ -1,26 +1,83 @@
+import struct
+from typing import Dict, List
+
+from Action import Action
+from DiceSource import DiceSource, RandomDice
 from Die import Die
+from Player import Player, RandomPlayer
+from Rules import STANDARD, Rules
 from ScoreSheet import ScoreSheet
 
-import random
-
 
 class Qwixx:
     """
     A class to represent a Qwixx game.
 
+    The game is a state machine without any input or output. After `reset`,
+    the game always waits for a decision of `to_move`, which is either the
+    active player or one of the other players that can use the white dice.
+    `legal_actions` lists the possible decisions and `step` applies one.
+    `play` and `turn` drive the same machine with the player policies.
+
+    A row locked by any player during a turn is locked for everyone when
+    the turn is over (see `lock_rows`): it is closed on every score sheet
+    and its die is no longer rolled. The game ends when a player has four
+    failed attempts or when two colors are locked. Variants of these rules,
+    the rows and the dice are set by a `Rules` object.
+
     Attributes
     ----------
     n_players : int
         The number of players in the game.
+    rules : Rules
+        The rules of the game.
     players : List[ScoreSheet]
         The score sheets of the players in the game.
+    policies : List[Player]
+        The policies deciding the actions of the players.
+    dice_source : DiceSource
+        The source of the rolls of all dice and of the start player.
     dice : Dict[str, Die]
         The dice used in the game, mapped by color.
     enabled_colors : Dict[str, bool]
-        Indicates which colors are still active in the game.
+        Indicates which colors are still active in the game, that is, not
+        locked.
+    current_player : int
+        The number of the active player.
+    to_move : int
+        The number of the player that has to decide, or None if the game is
+        over or has not started yet.
+    roll : Dict[str, List[int]]
+        The dice combinations of the current roll.
+    faces : List[int]
+        The faces of the red, yellow, green, blue and the two white dice of
+        the current roll, 0 for dice that were not rolled.
+    closed_rows : List[str]
+        The rows locked by any player in the current turn.
+    turns : int
+        The number of turns that have been started.
+    game_over : bool
+        Set as soon as a player has too many failed attempts or too few
+        colors are left.
+    recorder : Recorder
+        Notified of every start, roll, decision and end of a game, or None.
+    executor : concurrent.futures.Executor
+        Asks the other players for their decisions on the white sum in
+        parallel in `prompt_other_players`, or None to ask them in turn.
     """
 
-    def __init__(self, n_players: int, *player_names: str):
+    # The number of players, the active player, the player to move (255 for
+    # none), a bit per enabled color, a bit per row closed this turn, a bit
+    # per player still to decide, the number of turns and the roll: the
+    # white sum and the two sums of each color (0 if not rolled)
+    HEADER = struct.Struct("<BBBBBHI9B")
+    _NOBODY = 255
+    _MAX_COLORS = 4
+
+    def __init__(self, n_players: int, *player_names: str,
+                 policies: List[Player] = None,
+                 dice_source: DiceSource = None, recorder=None,
+                 executor=None, rules: Rules = STANDARD):
         """
         Initializes a Qwixx game.
 
@@ -30,364 +87,759 @@ class Qwixx:
             Number of players in the game.
         *player_names : str
             Names of the players.
+        policies : List[Player], optional
+            The policies of the players. Defaults to random players.
+        dice_source : DiceSource, optional
+            The source of the rolls. Defaults to an unseeded RandomDice.
+        recorder : Recorder, optional
+            Notified of the events of the game, see `GameLog.Recorder`.
+        executor : concurrent.futures.Executor, optional
+            Asks the other players for their decisions in parallel.
+        rules : Rules, optional
+            The rules of the game. Defaults to the standard rules.
 
         Raises
         ------
         ValueError
-            If the number of players does not match the number of names
-            provided.
+            If the number of players does not match the number of names or
+            policies provided, or is more than `Rules.MAX_PLAYERS`.
         """
 
         if player_names and len(player_names) != n_players:
             raise ValueError(
                 "Number of players must match the number of names provided.")
+        if policies is not None and len(policies) != n_players:
+            raise ValueError(
+                "Number of players must match the number of policies "
+                "provided.")
+        if not 0 < n_players <= Rules.MAX_PLAYERS:
+            raise ValueError(
+                f"A game has 1 to {Rules.MAX_PLAYERS} players.")
 
         self.n_players = n_players
-        self.players = [ScoreSheet(name) for name in player_names] if \
-            player_names else [ScoreSheet(f"Player {i+1}") for i in
-                               range(n_players)]
-        self.dice = {
-            "Red": Die("Red"),
-            "Yellow": Die("Yellow"),
-            "Green": Die("Green"),
-            "Blue": Die("Blue"),
-            "White1": Die("White"),
-            "White2": Die("White")
-        }
-        self.enabled_colors = {"Red": True, "Yellow": True,
-                               "Green": True, "Blue": True}
+        self.rules = rules
+        self.player_names = list(player_names) if player_names else \
+            [f"Player {i+1}" for i in range(n_players)]
+        self.policies = list(policies) if policies is not None else \
+            [RandomPlayer() for _ in range(n_players)]
+        self.dice_source = dice_source if dice_source is not None else \
+            RandomDice()
+        self.dice = {color: Die(color, rules.sides, self.dice_source)
+                     for color in rules.colors}
+        self.dice["White1"] = Die("White", rules.sides, self.dice_source)
+        self.dice["White2"] = Die("White", rules.sides, self.dice_source)
+        self.recorder = recorder
+        self.executor = executor
+        self._new_sheets()
+
+    def _new_sheets(self) -> None:
+        """Set up empty score sheets and the state before the first turn."""
+        self.players = [ScoreSheet(name, self.rules)
+                        for name in self.player_names]
+        self.enabled_colors = {color: True for color in self.rules.colors}
+        self.current_player = 0
+        self.to_move = None
+        self.roll = None
+        self.faces = None
+        self.closed_rows = []
+        self.turns = 0
+        self.game_over = False
+        self._waiting = []
+
+    def clone(self, policies: List[Player] = None,
+              dice_source: DiceSource = None) -> "Qwixx":
+        """
+        Copy the game, so that it can be played on without changing this one.
+
+        Only the score sheets and the turn state are copied; the roll and
+        the names are shared, since the game never changes them in place.
+        The copy has no recorder and no executor.
+
+        Parameters
+        ----------
+        policies : List[Player], optional
+            The policies of the players in the copy. Defaults to the
+            policies of this game.
+        dice_source : DiceSource, optional
+            The source of the rolls in the copy. Defaults to the source of
+            this game.
 
-    def play(self):
+        Returns
+        -------
+        Qwixx
+            The copy of the game.
+        """
+        game = Qwixx.__new__(Qwixx)
+        game.n_players = self.n_players
+        game.rules = self.rules
+        game.player_names = self.player_names
+        game.policies = self.policies if policies is None else list(policies)
+
+        if dice_source is None or dice_source is self.dice_source:
+            game.dice_source = self.dice_source
+            game.dice = self.dice
+        else:
+            game.dice_source = dice_source
+            game.dice = {key: Die(die.color, die.sides, dice_source)
+                         for key, die in self.dice.items()}
+
+        game.players = [player.copy() for player in self.players]
+        game.enabled_colors = dict(self.enabled_colors)
+        game.current_player = self.current_player
+        game.to_move = self.to_move
+        game.roll = self.roll
+        game.faces = self.faces
+        game.recorder = None
+        game.executor = None
+        game.closed_rows = list(self.closed_rows)
+        game.turns = self.turns
+        game.game_over = self.game_over
+        game._waiting = list(self._waiting)
+        return game
+
+    def position_key(self) -> tuple:
         """
-        Play the game.
+        Get a compact key of the position, for caches of search results.
+
+        Two games get the same key when they are waiting for the same
+        decision on the same roll and every player's score sheet plays and
+        scores the same (see `ScoreSheet.zobrist`), even if the marks were
+        made in a different order or in a different number of turns.
 
         Returns
         -------
-        None
+        tuple
+            The active player, the player to move, the players still to
+            decide, the enabled colors, the roll and the key of each score
+            sheet.
+        """
+        roll = None if self.roll is None else \
+            tuple(tuple(sums) for sums in self.roll.values())
+        return (self.current_player, self.to_move, tuple(self._waiting),
+                tuple(self.enabled_colors.values()), roll,
+                tuple(player.zobrist for player in self.players))
+
+    @classmethod
+    def state_size(cls, n_players: int, rules: Rules = STANDARD) -> int:
         """
+        Get the number of bytes of the binary state of a game.
 
-        # Random start player
-        current_player = random.randint(0, self.n_players - 1)
+        Parameters
+        ----------
+        n_players : int
+            The number of players in the game.
+        rules : Rules, optional
+            The rules of the game. Defaults to the standard rules.
 
-        while not self.is_game_over():
-            self.turn(current_player)
-            current_player = (current_player + 1) % self.n_players
+        Returns
+        -------
+        int
+            The size of the state in bytes.
+        """
+        return cls.HEADER.size + n_players * rules.sheet_struct.size
 
-        print()
-        print("==========================")
-        print("Game over!\n")
-        print("Final score sheets:")
+    def pack_into(self, buffer, offset: int = 0) -> None:
+        """
+        Write the state of the game into a buffer.
+
+        The state has a fixed width of `state_size(n_players, rules)` bytes:
+        the `HEADER` followed by each score sheet (see
+        `ScoreSheet.pack_into`). Names, policies, the rules, the dice source
+        and the faces of the dice are not part of the state.
 
-        # Print the final score sheet
+        Parameters
+        ----------
+        buffer : bytearray or memoryview
+            The writable buffer.
+        offset : int, optional
+            The position in the buffer. Defaults to 0.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If the rules of the game have more than four colors.
+        """
+        colors = list(self.enabled_colors)
+        if len(colors) > self._MAX_COLORS:
+            raise ValueError(
+                f"Snapshots support at most {self._MAX_COLORS} colors.")
+        enabled = 0
+        closed = 0
+        for i, color in enumerate(colors):
+            enabled |= self.enabled_colors[color] << i
+            closed |= (color in self.closed_rows) << i
+        waiting = 0
+        for i in self._waiting:
+            waiting |= 1 << i
+
+        roll = [0] * 9
+        if self.roll is not None:
+            roll[0] = self.roll["White"][0]
+            for i, color in enumerate(colors):
+                if color in self.roll:
+                    roll[1 + 2 * i:3 + 2 * i] = self.roll[color]
+
+        self.HEADER.pack_into(
+            buffer, offset, self.n_players, self.current_player,
+            self._NOBODY if self.to_move is None else self.to_move,
+            enabled, closed, waiting, self.turns, *roll)
+
+        offset += self.HEADER.size
+        size = self.rules.sheet_struct.size
         for player in self.players:
-            print(player)
-            print()
+            player.pack_into(buffer, offset)
+            offset += size
+
+    def unpack_from(self, buffer, offset: int = 0) -> None:
+        """
+        Read a state written by `pack_into` into this game.
+
+        Parameters
+        ----------
+        buffer : bytes, bytearray or memoryview
+            The buffer.
+        offset : int, optional
+            The position in the buffer. Defaults to 0.
 
-        # Calculate the scores for each player and store them in a dictionary
-        scores = {}
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If the state has a different number of players.
+        """
+        n_players, current_player, to_move, enabled, closed, waiting, \
+            turns, *roll = self.HEADER.unpack_from(buffer, offset)
+        if n_players != self.n_players:
+            raise ValueError(
+                f"The state has {n_players} players instead of "
+                f"{self.n_players}.")
+
+        colors = list(self.enabled_colors)
+        self.current_player = current_player
+        self.to_move = None if to_move == self._NOBODY else to_move
+        self.enabled_colors = {color: bool(enabled >> i & 1)
+                               for i, color in enumerate(colors)}
+        self.closed_rows = [color for i, color in enumerate(colors)
+                            if closed >> i & 1]
+        self._waiting = [i for i in range(n_players) if waiting >> i & 1]
+        self.turns = turns
+
+        self.roll = None
+        self.faces = None
+        if roll[0]:
+            self.roll = {"White": [roll[0]]}
+            for i, color in enumerate(colors):
+                if roll[1 + 2 * i]:
+                    self.roll[color] = roll[1 + 2 * i:3 + 2 * i]
+
+        offset += self.HEADER.size
+        size = self.rules.sheet_struct.size
         for player in self.players:
-            scores[player.name] = player.calculate_score()
+            player.unpack_from(buffer, offset)
+            offset += size
 
-        # Sort the scores in descending order
-        sorted_scores = sorted(
-            scores.items(), key=lambda x: x[1], reverse=True)
+        self.game_over = \
+            any(player.failed_attempts >= self.rules.max_failed
+                for player in self.players) or self._enough_locked()
 
-        print()
-        # Print the scores
-        print("Scores:")
-        for name, score in sorted_scores:
-            print(f"{name}: {score}")
+    def to_bytes(self) -> bytes:
+        """
+        Encode the state of the game, see `pack_into`.
 
-        print()
+        Returns
+        -------
+        bytes
+            The binary state.
+        """
+        buffer = bytearray(self.state_size(self.n_players, self.rules))
+        self.pack_into(buffer)
+        return bytes(buffer)
+
+    @classmethod
+    def from_bytes(cls, data, *player_names: str,
+                   policies: List[Player] = None,
+                   dice_source: DiceSource = None,
+                   rules: Rules = STANDARD) -> "Qwixx":
+        """
+        Create a game from a state encoded by `to_bytes` or `pack_into`.
 
-        # Print the winner
-        print(f"Winner: {sorted_scores[0][0]}!")
+        Parameters
+        ----------
+        data : bytes, bytearray or memoryview
+            The binary state, at the start of the buffer.
+        *player_names : str
+            Names of the players.
+        policies : List[Player], optional
+            The policies of the players. Defaults to random players.
+        dice_source : DiceSource, optional
+            The source of the rolls. Defaults to an unseeded RandomDice.
+        rules : Rules, optional
+            The rules of the game. Defaults to the standard rules.
 
-    def turn(self, player_number: int):
+        Returns
+        -------
+        Qwixx
+            The game.
         """
-        Play a turn for the player with the given number.
+        game = cls(data[0], *player_names, policies=policies,
+                   dice_source=dice_source, rules=rules)
+        game.unpack_from(data)
+        return game
+
+    def reset(self, start_player: int = None) -> None:
+        """
+        Start a new game with empty score sheets and roll for the first turn.
 
         Parameters
         ----------
-        player_number : int
-            the number of the current player.
+        start_player : int, optional
+            The number of the player that starts. Defaults to a player
+            drawn from the dice source.
 
         Returns
         -------
         None
         """
+        self._new_sheets()
 
-        # A turn:
-        # 1. Roll the dice
-        # 2. Choose which dice to keep if any
-        # 3. Update the score sheet
-        # 4. Let the other players mark the score sheet using the white dice
+        # Random start player
+        if start_player is None:
+            start_player = self.dice_source.roll(self.n_players) - 1
 
-        # Roll the dice
-        roll = self.roll_dice()
+        if self.recorder is not None:
+            self.recorder.start_game(self, start_player)
+        self.begin_turn(start_player)
 
-        # Let the current player go first
-        white_combos, colored_combos = self.allowed_combinations(
-            roll, player_number)
-
-        # Print the allowed white combinations
-        print(
-            f"{self.players[player_number].name} can mark the following using "
-            "the white dice: "
-        )
-        self.print_roll(white_combos)
-
-        # Print the allowed combinations
-        print(
-            f"{self.players[player_number].name} can mark the following using "
-            "other combinations: "
-        )
-        self.print_roll(colored_combos)
-
-        # Show the player their score sheet
-        print(self.players[player_number])
-
-        closed_rows = []
-
-        # Ask the player to choose a combination
-        while True:
-            print(f"{self.players[player_number].name}, choose an action: ")
-            try:
-                action = int(
-                    input(
-                        "1. Mark the score sheet using the white dice\n2. "
-                        "Mark the score sheet using the colored dice\n3. Mark "
-                        "the score sheet with the white dice followed by the "
-                        "colored dice\n4. Add a failed attempt\n"
-                    )
-                )
-                if action not in [1, 2, 3, 4]:
-                    raise ValueError
-            except ValueError:
-                print("Invalid input.")
-                continue
+    def begin_turn(self, player_number: int) -> None:
+        """
+        Make the given player the active player and roll the dice.
 
-            print()
+        Parameters
+        ----------
+        player_number : int
+            The number of the new active player.
 
-            result = self.process_action_choice(
-                action, white_combos, colored_combos)
+        Returns
+        -------
+        None
+        """
+        self.current_player = player_number
+        self.to_move = player_number
+        self.roll = self.roll_dice()
+        self.closed_rows = []
+        self.turns += 1
+        self._waiting = []
+
+        if self.recorder is not None:
+            self.recorder.roll(self)
+
+    @property
+    def waiting_players(self) -> List[int]:
+        """
+        The other players that still decide on the white sum this turn.
 
-            if result is None:
-                continue
+        Returns
+        -------
+        List[int]
+            The numbers of the players in the order of their decisions,
+            starting with `to_move`, or an empty list while the active
+            player decides. Players that cannot use the white sum are left
+            out when their turn to decide comes.
+        """
+        if self.to_move is None or self.to_move == self.current_player:
+            return []
+        return [self.to_move] + self._waiting
 
-            white_color, white_number, colored_color, colored_number = result
+    def passive_options(self) -> Dict[int, List[Action]]:
+        """
+        List the legal actions of all other players on the white sum at once.
 
-            closed_rows = self.play_action(
-                int(action),
-                player_number,
-                white_color,
-                white_number,
-                colored_color,
-                colored_number,
-            )
+        The other players decide at the same time in the real game, and
+        their options do not depend on each other's decisions.
 
-            break
+        Returns
+        -------
+        Dict[int, List[Action]]
+            The legal actions of each player in `waiting_players` that can
+            use the white sum, by player number. The first action passes.
+        """
+        white_number = self.roll["White"][0]
+        options = {}
+        for i in self.waiting_players:
+            actions = [Action(color, white_number)
+                       for color, row in self.players[i].rows.items()
+                       if row.moves.allowed[row.state][white_number]]
+            if actions:
+                options[i] = [Action()] + actions
+        return options
+
+    def deciding(self, player_number: int) -> "Qwixx":
+        """
+        Get the game as seen by a player that decides on the white sum.
 
-        print()
+        The other players decide at the same time, but `to_move` is only
+        one of them. A policy that plays on from the game, like
+        `MonteCarloPlayer`, needs the game with itself to move and asks for
+        it; the game is only copied then.
 
-        if self.is_game_over():
-            return
-
-        # Let the other players mark the score sheet using the white dice
-        self.prompt_other_players(player_number, roll, closed_rows)
+        Parameters
+        ----------
+        player_number : int
+            The number of one of the `waiting_players`, or of `to_move`.
 
-    def get_combo_input(self, description: str, valid_combos: dict) -> tuple:
+        Returns
+        -------
+        Qwixx
+            This game if the player is `to_move`, otherwise a copy with the
+            player to move, followed by the other waiting players.
         """
-        Get the input for a combination.
+        if player_number == self.to_move:
+            return self
+        game = self.clone()
+        game._waiting = [i for i in self.waiting_players
+                         if i != player_number]
+        game.to_move = player_number
+        return game
+
+    def step_passive(self, decisions: Dict[int, Action]) -> bool:
+        """
+        Apply the decisions of all other players on the white sum at once.
+
+        All decisions are checked before any is applied, so an illegal
+        decision leaves the game unchanged. Players without a decision pass.
 
         Parameters
         ----------
-        description : str
-            The description of the combination.
-        valid_combos : dict
-            The dictionary of the allowed combinations.
+        decisions : Dict[int, Action]
+            The action of each player in `waiting_players`, by number.
 
         Returns
         -------
-        str, int
-            The chosen color and number.
+        bool
+            True if the game is over, False otherwise.
+
+        Raises
+        ------
+        ValueError
+            If the other players are not deciding or a decision is not
+            legal.
         """
+        waiting = self.waiting_players
+        if not waiting:
+            raise ValueError("The other players are not deciding.")
+        for i, action in decisions.items():
+            if i not in waiting:
+                raise ValueError(f"Player {i} is not deciding.")
+            if action.colored_color is not None:
+                raise ValueError(
+                    "Only the active player can use the colored dice.")
+            self.check_action(i, action)
+
+        turn = self.turns
+        while self.to_move is not None and self.turns == turn:
+            self.step(decisions.get(self.to_move, Action()))
+        return self.to_move is None
+
+    def legal_actions(self, player_number: int = None) -> List[Action]:
+        """
+        List the actions that a player may take on the current roll.
 
-        combo = input(description)
-        split_combo = combo.split(" ")
+        The first action always marks nothing: a failed attempt for the
+        active player and a pass for the other players.
 
-        if split_combo[0] not in valid_combos.keys() or int(split_combo[1]) \
-                not in valid_combos[split_combo[0]]:
-            print("Invalid choice. Try again.\n")
-            return None, None
+        Parameters
+        ----------
+        player_number : int, optional
+            The number of the player. Defaults to `to_move`. The other
+            players can only ever use the white sum.
 
-        return split_combo[0], int(split_combo[1])
+        Returns
+        -------
+        List[Action]
+            The legal actions.
+        """
+        if player_number is None:
+            player_number = self.to_move
+        if player_number is None or self.to_move is None:
+            return []
 
-    def process_action_choice(self, action: int, white_combos: dict,
-                              colored_combos: dict) -> tuple:
+        white_combos, colored_combos = self.allowed_combinations(
+            self.roll, player_number)
+
+        white = [(color, number) for color, numbers in white_combos.items()
+                 for number in numbers]
+        actions = [Action()]
+        actions.extend(Action(color, number) for color, number in white)
+
+        if player_number != self.current_player:
+            return actions
+
+        actions.extend(Action(None, None, color, number)
+                       for color, numbers in colored_combos.items()
+                       for number in numbers)
+
+        # A colored sum in the row of the white sum is marked after it, which
+        # can also make the last number of the row markable
+        rows = self.players[player_number].rows
+        for white_color, white_number in white:
+            row = rows[white_color]
+            for colored_color in rows:
+                if colored_color == white_color:
+                    numbers = sorted({
+                        number for number in self.roll.get(colored_color, ())
+                        if row.is_allowed(number, white_number)})
+                else:
+                    numbers = colored_combos.get(colored_color, ())
+                actions.extend(Action(white_color, white_number,
+                                      colored_color, number)
+                               for number in numbers)
+
+        return actions
+
+    def step(self, action: Action) -> bool:
         """
-        Process the action choice.
+        Apply the decision of `to_move` and advance to the next decision.
+
+        When the turn is over, the next player becomes active and the dice
+        are rolled again.
 
         Parameters
         ----------
-        action : int
-            The action to be processed.
-        white_combos : dict
-            The dictionary of the allowed white combinations.
-        colored_combos : dict
-            The dictionary of the allowed colored combinations.
+        action : Action
+            The action of the player that has to decide.
 
         Returns
         -------
-        tuple
-            The tuple of the chosen white color, white number, colored color,
-            and colored number.
+        bool
+            True if the game is over, False otherwise.
+
+        Raises
+        ------
+        ValueError
+            If the game is over or the action is not legal.
         """
+        player_number = self.to_move
+        if player_number is None:
+            raise ValueError("There is no player to move.")
+
+        self.check_action(player_number, action)
+        if self.recorder is not None:
+            self.recorder.action(self, player_number, action)
+
+        if player_number == self.current_player:
+            self.closed_rows = self.play_action(
+                action.choice, player_number, *action)
+
+            if self.is_game_over():
+                self._end_game()
+                return True
 
-        white_color, white_number, colored_color, colored_number = \
-            None, None, None, None
+            self._waiting = [i for i in range(self.n_players)
+                             if i != player_number]
 
-        if action in [1, 3]:
-            white_color, white_number = self.get_white_combo(white_combos)
-            if white_color is None:
-                return None
+        # The other players can only mark the white sum or pass
+        elif action.white_color is not None:
+            for color in self.play_action(1, player_number,
+                                          action.white_color,
+                                          action.white_number):
+                if color not in self.closed_rows:
+                    self.closed_rows.append(color)
 
-        if action in [2, 3]:
-            colored_color, colored_number = self.get_combo_input(
-                "Choose a combination that uses the colored dice:\n",
-                colored_combos)
-            if colored_color is None:
-                return None
+        self._advance()
+        return self.to_move is None
 
-        if action == 3:
-            if white_color == colored_color and \
-                ((colored_number <= white_number and colored_color in
-                  ["Red", "Yellow"]) or
-                    (colored_number >= white_number and colored_color in
-                     ["Green", "Blue"])):
-                print(
-                    "This is not possible since the white number goes first "
-                    "and the colored number comes after the white number.\n")
-                return None
+    def _advance(self) -> None:
+        """Move on to the next player that can use the white dice."""
+        white_number = self.roll["White"][0]
 
-        return white_color, white_number, colored_color, colored_number
+        while self._waiting:
+            i = self._waiting.pop(0)
+            if any(row.moves.allowed[row.state][white_number]
+                   for row in self.players[i].rows.values()):
+                self.to_move = i
+                return
 
-    def prompt_other_players(self, player_number: int, roll: dict,
-                             closed_rows: list) -> None:
+        self.lock_rows(self.closed_rows)
+
+        if self.is_game_over():
+            self._end_game()
+            return
+
+        self.begin_turn((self.current_player + 1) % self.n_players)
+
+    def lock_rows(self, colors: List[str]) -> None:
         """
-        Let the other players mark the score sheet using the white dice.
+        Lock colors for every player.
+
+        The rows of the colors are closed on every score sheet, their dice
+        are no longer rolled, and the game is over once
+        `rules.locks_to_end` colors are locked.
+
+        Parameters
+        ----------
+        colors : List[str]
+            The colors to lock.
+
+        Returns
+        -------
+        None
+        """
+        for color in colors:
+            if not self.enabled_colors[color]:
+                continue
+            self.enabled_colors[color] = False
+            for player in self.players:
+                player.close_row(color)
+
+        if self._enough_locked():
+            self.game_over = True
+
+    def _enough_locked(self) -> bool:
+        """Check if enough colors are locked to end the game."""
+        return len(self.enabled_colors) - sum(self.enabled_colors.values()) \
+            >= self.rules.locks_to_end
+
+    def _end_game(self) -> None:
+        """Stop the game and notify the recorder."""
+        self.to_move = None
+        if self.recorder is not None:
+            self.recorder.end_game(self)
+
+    def check_action(self, player_number: int, action: Action) -> None:
+        """
+        Check that the player may take the action on the current roll.
 
         Parameters
         ----------
         player_number : int
-            The player number.
-        roll : dict
-            The dictionary of the rolled dice.
-        closed_rows : list
-            The list of the closed rows.
+            The number of the player.
+        action : Action
+            The action to be checked.
 
         Returns
         -------
         None
+
+        Raises
+        ------
+        ValueError
+            If the action is not legal.
         """
+        rows = self.players[player_number].rows
 
-        # Ask the other players to mark the score sheet using the white dice
-        for i in range(self.n_players):
-            print("------------------------------------------------------")
+        if action.white_color is not None and (
+                action.white_number != self.roll["White"][0] or
+                action.white_color not in rows or
+                not rows[action.white_color].is_allowed(action.white_number)):
+            raise ValueError(f"Illegal white dice combination: {action}.")
 
-            if i != player_number:
-                # List the possible white combinations
-                white_combos, _ = self.allowed_combinations(roll, i)
+        if action.colored_color is None:
+            return
 
-                if not white_combos:
-                    print(
-                        f"{self.players[i].name} cannot mark the score sheet "
-                        "using the white dice."
-                    )
-                    continue
+        if player_number != self.current_player:
+            raise ValueError(
+                "Only the active player can use the colored dice.")
 
-                print(
-                    f"{self.players[i].name}, you can mark the score sheet "
-                    "using the white dice\n"
-                )
+        after = action.white_number \
+            if action.white_color == action.colored_color else None
+        if action.colored_number not in self.roll.get(
+                action.colored_color, ()) or \
+                not rows[action.colored_color].is_allowed(
+                    action.colored_number, after):
+            raise ValueError(f"Illegal colored dice combination: {action}.")
 
-                print(self.players[i])
-                print("\nYour possible choices: ")
-                self.print_roll(white_combos)
+    def play(self) -> List[int]:
+        """
+        Play the game with the policies of the players.
 
-                # Ask the player to choose a combination
-                color, number = self.ask_player_action(
-                    self.players[i], white_combos)
+        Returns
+        -------
+        List[int]
+            The final score of each player.
+        """
 
-                if color is not None:
-                    self.play_action(1, i, color, number, None, None)
+        self.reset()
 
-                # If the first player "closed" a row, close it for the other
-                # players
-                if closed_rows:
-                    for row in closed_rows:
-                        self.players[i].rows[row].closed = True
+        while self.to_move is not None:
+            self.turn(self.current_player)
 
-    def get_white_combo(self, white_combos: dict) -> tuple:
+        return [player.calculate_score() for player in self.players]
+
+    def turn(self, player_number: int):
         """
-        Get the input for a white combination.
+        Play a turn for the player with the given number.
 
         Parameters
         ----------
-        white_combos : dict
-            The dictionary of the allowed white combinations.
+        player_number : int
+            the number of the current player.
 
         Returns
         -------
-        str, int
-            The chosen color and number.
+        None
         """
 
-        white_combo = input("Choose a combination that uses the white dice:\n")
-        split_combo = white_combo.split(" ")
+        # A turn:
+        # 1. Roll the dice
+        # 2. Choose which dice to keep if any
+        # 3. Update the score sheet
+        # 4. Let the other players mark the score sheet using the white dice
+
+        # Roll the dice, unless this turn has just been rolled for
+        if self.to_move != player_number or \
+                self.current_player != player_number:
+            self.begin_turn(player_number)
 
-        if split_combo[0] not in white_combos.keys() or int(split_combo[1]) \
-                not in white_combos[split_combo[0]]:
-            print("Invalid choice. Try again.\n")
-            return None, None
+        # Let the current player go first
+        policy = self.policies[player_number]
+        if self.step(policy.choose_action(self, player_number,
+                                          self.legal_actions())):
+            return
 
-        return split_combo[0], int(split_combo[1])
+        # Let the other players mark the score sheet using the white dice
+        self.prompt_other_players()
 
-    def ask_player_action(self, player: ScoreSheet, white_combos: dict):
+    def prompt_other_players(self) -> None:
         """
-        Ask the player to choose an action.
+        Let the other players mark the score sheet using the white dice.
 
-        Parameters
-        ----------
-        player : ScoreSheet
-            The player.
-        white_combos : dict
-            The dictionary of the allowed white combinations.
+        All other players decide on the same options at the same time, in
+        parallel if the game has an executor, and the decisions are applied
+        together. The policies share the game, whose `to_move` is only one
+        of them; see `deciding`.
 
         Returns
         -------
-        str, int
-            The chosen color and number.
-        """
-
-        while True:
-            want_to = input(
-                "Would you like to mark the score sheet using the white dice? "
-                "(y/n)\n")
-            if want_to.lower() == "y":
-                color, number = self.get_white_combo(white_combos)
-                if color is not None:
-                    return color, number
-            elif want_to.lower() == "n":
-                return None, None
-            else:
-                print("Invalid choice. Try again.\n")
+        None
+        """
+
+        options = self.passive_options()
+        if self.executor is None:
+            decisions = {
+                i: self.policies[i].choose_action(self, i, actions)
+                for i, actions in options.items()}
+        else:
+            futures = {
+                i: self.executor.submit(self.policies[i].choose_action,
+                                        self, i, actions)
+                for i, actions in options.items()}
+            decisions = {i: future.result()
+                         for i, future in futures.items()}
+
+        if self.to_move is not None and \
+                self.to_move != self.current_player:
+            self.step_passive(decisions)
 
     def is_game_over(self) -> bool:
         """Checks if the game has ended based on game rules."""
-        if any(player.failed_attempts >= 4 for player in self.players):
-            return True
-        return sum(self.enabled_colors.values()) <= 2
+        return self.game_over
 
     def play_action(
         self,
@@ -397,7 +849,7 @@ class Qwixx:
         white_number: int = None,
         colored_color: str = None,
         colored_number: int = None,
-    ):
+    ) -> List[str]:
         """
         Play an action.
 
@@ -422,36 +874,26 @@ class Qwixx:
             The list of closed rows (if there are any).
         """
 
+        player = self.players[player_number]
+        closed_colors = []
+
         # Option 1: Mark the score sheet using the white dice
         if choice == 1:
             if white_number is None or white_color is None:
                 raise ValueError("No white dice combination was provided.")
-            self.players[player_number].mark_row(white_color, white_number)
-            print(
-                f"{self.players[player_number].name} marked the score sheet "
-                f"using the white dice {white_color} {white_number}."
-            )
+            player.mark_row(white_color, white_number)
 
-            # Print if the row is closed
-            if self.players[player_number].rows[white_color].closed:
-                print(f"The {white_color.lower()} row is now closed!")
-                return [white_color]
+            if player.rows[white_color].closed:
+                closed_colors.append(white_color)
 
         # Option 2: Mark the score sheet using the colored dice
         elif choice == 2:
             if colored_color is None or colored_number is None:
                 raise ValueError("Color and number must be provided.")
+            player.mark_row(colored_color, colored_number)
 
-            self.players[player_number].mark_row(colored_color, colored_number)
-            print(
-                f"{self.players[player_number].name} marked the score sheet "
-                "using the colored dice {colored_color} {colored_number}."
-            )
-
-            # Print if the row is closed
-            if self.players[player_number].rows[colored_color].closed:
-                print(f"The {colored_color.lower()} row is now closed!")
-                return [colored_color]
+            if player.rows[colored_color].closed:
+                closed_colors.append(colored_color)
 
         # Option 3: Mark the score sheet with the white dice followed by the
         # colored dice
@@ -461,30 +903,22 @@ class Qwixx:
             if white_number is None or white_color is None:
                 raise ValueError("No white dice combination was provided.")
 
-            self.players[player_number].mark_row(white_color, white_number)
-            self.players[player_number].mark_row(colored_color, colored_number)
-            print(
-                f"{self.players[player_number].name} marked the score sheet "
-                f"using the white dice {white_color} {white_number} and the "
-                f"colored dice {colored_color} {colored_number}."
-            )
+            player.mark_row(white_color, white_number)
+            player.mark_row(colored_color, colored_number)
 
-            closed_colors = []
-            # Print if the row is closed
-            if self.players[player_number].rows[white_color].closed:
-                print(f"The {white_color.lower()} row is now closed!")
+            if player.rows[white_color].closed:
                 closed_colors.append(white_color)
-            if self.players[player_number].rows[colored_color].closed:
-                print(f"The {colored_color.lower()} row is now closed!")
+            if colored_color != white_color and \
+                    player.rows[colored_color].closed:
                 closed_colors.append(colored_color)
 
-            return closed_colors
-
         # Option 4: Adding a failed attempt
         elif choice == 4:
-            self.players[player_number].add_failed_attempt()
-            print(
-                f"{self.players[player_number].name} added a failed attempt.")
+            player.add_failed_attempt()
+            if player.failed_attempts >= self.rules.max_failed:
+                self.game_over = True
+
+        return closed_colors
 
     def roll_dice(self):
         """
@@ -507,6 +941,9 @@ class Qwixx:
         white1 = self.dice["White1"].roll()
         white2 = self.dice["White2"].roll()
 
+        self.faces = [roll.get(color, 0) for color in self.enabled_colors]
+        self.faces += [white1, white2]
+
         # Save all possible dice combinations
         combinations = {"White": [white1 + white2]}
 
@@ -531,41 +968,15 @@ class Qwixx:
 
         Returns
         -------
-        list, list
-            The list of the allowed combinations for the white dice and the
-            list of the allowed combinations for the colored dice.
-        """
-
-        # Filter out the combinations that are not allowed for player_number
-        allowed_colored_combinations = {}
-        allowed_white_combinations = {}
-
-        for key, value in roll.items():
-            if key == "White":
-                for row in self.players[player_number].rows.values():
-                    if row.is_allowed(value[0]):
-                        allowed_white_combinations[row.color] = [value[0]]
-
-            else:
-                for i in range(len(value)):
-                    if self.players[player_number]\
-                            .rows[key].is_allowed(value[i]):
-                        allowed_colored_combinations[key] = (
-                            [value[i]]
-                            if key not in allowed_colored_combinations
-                            else (
-                                allowed_colored_combinations[key] + [value[i]]
-                                if not value[i] in
-                                allowed_colored_combinations[key]
-                                else allowed_colored_combinations[key]
-                            )
-                        )
-
-        return allowed_white_combinations, allowed_colored_combinations
-
-    def print_roll(self, roll: dict):
-        """
-        Print the roll in a nice way.
+        dict, dict
+            The allowed combinations for the white dice and the allowed
+            combinations for the colored dice, mapped by color.
+        """
+        return self._allowed(roll, self.players[player_number])
+
+    def all_allowed_combinations(self, roll: dict) -> list:
+        """
+        Filter the possible combinations of the dice for every player.
 
         Parameters
         ----------
@@ -574,16 +985,31 @@ class Qwixx:
 
         Returns
         -------
-        None
+        List[tuple]
+            The allowed white and colored combinations of each player, as
+            returned by `allowed_combinations`.
         """
-
-        print("Color     | Roll(s)")
-        print("----------+----------")
-        for key, value in roll.items():
-            r = key
-            r += " " * (10 - len(key)) + "| "
-            for v in value:
-                r += str(v) + " "
-
-            print(r)
-        print()
+        return [self._allowed(roll, player) for player in self.players]
+
+    @staticmethod
+    def _allowed(roll: dict, player: ScoreSheet) -> tuple:
+        """Look up the allowed combinations of one score sheet."""
+        white_number = roll["White"][0]
+        white_combos = {}
+        colored_combos = {}
+
+        # The MoveTable of each row holds the legal marks for its state
+        for color, row in player.rows.items():
+            moves = row.moves
+            state = row.state
+
+            if moves.allowed[state][white_number]:
+                white_combos[color] = (white_number,)
+
+            sums = roll.get(color)
+            if sums is not None:
+                numbers = moves.pairs[state][sums[0]][sums[1]]
+                if numbers:
+                    colored_combos[color] = numbers
+
+        return white_combos, colored_combos
@@ -0,0 +1,243 @@
+from typing import List
+
+import numpy as np
+
+from ActionSpace import ActionSpace
+from DiceSource import BufferedDice
+from Player import Player, RandomPlayer
+from Qwixx import Qwixx
+
+
+class QwixxEnv:
+    """
+    A reinforcement-learning environment for one seat of a Qwixx game.
+
+    The environment follows the Gymnasium interface: `reset` returns an
+    observation and an info dict, and `step` returns an observation, a
+    reward, the terminated and truncated flags and an info dict. The agent
+    plays seat 0 and acts whenever it has to decide, both as the active
+    player and on the white dice of the other players. The other seats are
+    played by their policies in between. Actions are `ActionSpace` indices
+    and the legal ones are flagged in `info["action_mask"]`. The reward is
+    the change in the score of the agent, so the rewards of an episode add
+    up to its final score.
+
+    The observation is a float32 vector, seen from the deciding player.
+    For every player, starting with the deciding player and then in seating
+    order, it holds the 11 marks of each row from left to right, the
+    closed flags of the rows and the number of failed attempts. It ends
+    with the locked flags of the colors, the white sum, the lower and
+    higher sum of each colored die (0 if the die is not rolled) and a flag
+    that is 1 for the active player.
+
+    Attributes
+    ----------
+    n_players : int
+        The number of players in the game.
+    game : Qwixx
+        The game that is played.
+    observation_size : int
+        The length of the observation vector.
+    n_actions : int
+        The number of action indices.
+    """
+
+    # The marks and closed flags of the four rows and the failed attempts
+    PLAYER_FEATURES = 4 * 11 + 4 + 1
+
+    def __init__(self, n_players: int = 2, opponents: List[Player] = None,
+                 seed: int = None):
+        """
+        Initialize the environment.
+
+        Parameters
+        ----------
+        n_players : int, optional
+            The number of players in the game. Defaults to 2.
+        opponents : List[Player], optional
+            The policies of seats 1 and up. Defaults to random players.
+        seed : int, optional
+            The seed of the dice.
+
+        Raises
+        ------
+        ValueError
+            If the number of opponents does not match the number of players.
+        """
+        if opponents is None:
+            opponents = [RandomPlayer(None if seed is None else seed + i)
+                         for i in range(1, n_players)]
+        if len(opponents) != n_players - 1:
+            raise ValueError(
+                "Number of opponents must be one less than the number of "
+                "players.")
+
+        self.n_players = n_players
+        self.game = Qwixx(n_players, policies=[None] + list(opponents),
+                          dice_source=BufferedDice(seed))
+        self.observation_size = self.get_observation_size(n_players)
+        self.n_actions = ActionSpace.N_ACTIONS
+        self._score = 0
+
+    @staticmethod
+    def get_observation_size(n_players: int) -> int:
+        """
+        Get the length of the observation vector.
+
+        Parameters
+        ----------
+        n_players : int
+            The number of players in the game.
+
+        Returns
+        -------
+        int
+            The length of the observation vector.
+        """
+        return n_players * QwixxEnv.PLAYER_FEATURES + 4 + 1 + 8 + 1
+
+    def reset(self, seed: int = None) -> tuple:
+        """
+        Start a new game and play until the agent has to decide.
+
+        Parameters
+        ----------
+        seed : int, optional
+            The seed of the dice and the start player.
+
+        Returns
+        -------
+        numpy.ndarray, dict
+            The observation and an info dict with the action mask.
+        """
+        if seed is not None:
+            self.game.dice_source.seed(seed)
+
+        self.game.reset()
+        self._score = 0
+        self._play_opponents()
+        return self.observation(), self._info()
+
+    def step(self, action: int) -> tuple:
+        """
+        Apply the action of the agent and play until it has to decide again.
+
+        Parameters
+        ----------
+        action : int
+            The `ActionSpace` index of the action.
+
+        Returns
+        -------
+        numpy.ndarray, float, bool, bool, dict
+            The observation, the reward, whether the game is over, False
+            (games are never truncated) and an info dict with the action
+            mask.
+
+        Raises
+        ------
+        ValueError
+            If the action is not legal.
+        """
+        game = self.game
+        if game.to_move != 0:
+            raise ValueError("The game is over.")
+
+        game.step(ActionSpace.decode(game.roll, int(action)))
+        self._play_opponents()
+
+        score = game.players[0].calculate_score()
+        reward = float(score - self._score)
+        self._score = score
+
+        return self.observation(), reward, game.to_move is None, False, \
+            self._info()
+
+    def _play_opponents(self) -> None:
+        """Let the other seats decide until the agent has to."""
+        game = self.game
+        while game.to_move is not None and game.to_move != 0:
+            i = game.to_move
+            game.step(game.policies[i].choose_action(
+                game, i, game.legal_actions()))
+
+    def _info(self) -> dict:
+        """Build the info dict of the current state."""
+        info = {"action_mask": self.action_mask()}
+        if self.game.to_move is None:
+            info["final_scores"] = [player.calculate_score()
+                                    for player in self.game.players]
+        return info
+
+    def action_mask(self) -> np.ndarray:
+        """
+        Flag the legal actions of the agent.
+
+        Returns
+        -------
+        numpy.ndarray
+            (n_actions,) flags of the legal actions, all False if the game
+            is over.
+        """
+        mask = np.zeros(self.n_actions, dtype=bool)
+        roll = self.game.roll
+        for action in self.game.legal_actions():
+            mask[ActionSpace.encode(roll, action)] = True
+        return mask
+
+    def observation(self) -> np.ndarray:
+        """
+        Encode the state of the game as seen from the agent.
+
+        Returns
+        -------
+        numpy.ndarray
+            (observation_size,) observation vector.
+        """
+        return self.encode(self.game, 0)
+
+    @staticmethod
+    def encode(game: Qwixx, player_number: int) -> np.ndarray:
+        """
+        Encode the state of a game as seen from one of its players.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The game.
+        player_number : int
+            The number of the player.
+
+        Returns
+        -------
+        numpy.ndarray
+            The observation vector.
+        """
+        n_players = game.n_players
+        obs = np.zeros(QwixxEnv.get_observation_size(n_players),
+                       dtype=np.float32)
+        bits = np.arange(11)
+
+        offset = 0
+        for k in range(n_players):
+            sheet = game.players[(player_number + k) % n_players]
+            rows = [sheet.rows[color] for color in ActionSpace.COLORS]
+            marks = np.array([row.mask for row in rows])
+            obs[offset:offset + 44] = \
+                ((marks[:, None] >> bits) & 1).ravel()
+            obs[offset + 44:offset + 48] = [row.closed for row in rows]
+            obs[offset + 48] = sheet.failed_attempts
+            offset += QwixxEnv.PLAYER_FEATURES
+
+        obs[offset:offset + 4] = [not game.enabled_colors[color]
+                                  for color in ActionSpace.COLORS]
+        offset += 4
+
+        roll = game.roll
+        obs[offset] = roll["White"][0]
+        for i, color in enumerate(ActionSpace.COLORS):
+            if color in roll:
+                obs[offset + 1 + 2 * i:offset + 3 + 2 * i] = roll[color]
+        obs[offset + 9] = game.current_player == player_number
+
+        return obs
@@ -0,0 +1,200 @@
+from array import array
+from multiprocessing import Pool
+from typing import Callable, List
+
+from ActionSpace import ActionSpace
+from DiceSource import ReplayDice
+from GameLog import Event, GameLog, GameLogReader
+from Qwixx import Qwixx
+
+
+class Replay:
+    """
+    Re-execute the games of a game log with the current rules.
+
+    Every game is played again by the `Qwixx` engine, with the recorded
+    start player, the recorded faces as its dice and the recorded decisions
+    instead of policies. The replay checks that every roll, every deciding
+    player and, optionally, every set of legal actions is the same as in
+    the log, that every decision is legal and that the game ends with the
+    recorded scores. A game replays until its first difference, which is
+    reported as a short description.
+
+    One engine per number of players and one dice source are reused for all
+    games, so the only work per game is the engine itself.
+
+    Attributes
+    ----------
+    check_options : bool
+        Whether the legal actions of every decision must match the log.
+    """
+
+    def __init__(self, check_options: bool = True):
+        """
+        Initialize the replay.
+
+        Parameters
+        ----------
+        check_options : bool, optional
+            Whether the legal actions of every decision must match the
+            log. Defaults to True.
+        """
+        self.check_options = check_options
+        self._dice = ReplayDice(())
+        self._games = {}
+
+    def replay(self, events: List[Event]) -> str:
+        """
+        Replay one game.
+
+        Parameters
+        ----------
+        events : List[Event]
+            The records of the game, as returned by `GameLogReader.game`.
+
+        Returns
+        -------
+        str
+            The first difference with the log, or None if there is none.
+        """
+        if not events or events[0].kind != GameLog.GAME:
+            return "the game has no start"
+
+        start = events[0]
+        n_players = start.data[0]
+        game = self._games.get(n_players)
+        if game is None:
+            game = self._games[n_players] = Qwixx(
+                n_players, dice_source=self._dice)
+
+        # The engine rolls exactly the dice that were rolled in the log, so
+        # all of them can be queued at once
+        self._dice.values = array("B", [
+            face for event in events if event.kind == GameLog.ROLL
+            for face in event.data if face])
+        self._dice.position = 0
+
+        try:
+            game.reset(start.player)
+            for event in events[1:]:
+                difference = self._check(game, event)
+                if difference is not None:
+                    return f"turn {event.turn}: {difference}"
+                if event.kind == GameLog.END:
+                    return None
+        except (KeyError, ValueError) as error:
+            return f"turn {game.turns}: {error}"
+
+        return "the log ends before the game"
+
+    def _check(self, game: Qwixx, event: Event) -> str:
+        """Compare the game with one record and apply it if it is a move."""
+        if event.kind == GameLog.ROLL:
+            if game.to_move is None:
+                return "the game is already over"
+            if game.turns != event.turn or \
+                    game.current_player != event.player or \
+                    game.faces != list(event.data):
+                return "the roll is different"
+
+        elif event.kind == GameLog.ACTION:
+            index, mask = event.data
+            if game.to_move != event.player:
+                return (f"player {game.to_move} decides instead of "
+                        f"player {event.player}")
+            if self.check_options and GameLog.legal_mask(game) != mask:
+                return "the legal actions are different"
+            game.step(ActionSpace.decode(game.roll, index))
+
+        elif event.kind == GameLog.END:
+            if game.to_move is not None:
+                return "the game is not over"
+            scores = [player.calculate_score() for player in game.players]
+            if scores != list(event.data):
+                return (f"the scores are {scores} instead of "
+                        f"{list(event.data)}")
+
+        return None
+
+    def run(self, path: str, processes: int = None,
+            chunk_size: int = 10000, progress: Callable = None) -> dict:
+        """
+        Replay all games of a log file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the log file.
+        processes : int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+            With 1, the games are replayed in this process.
+        chunk_size : int, optional
+            The number of games replayed per task. Defaults to 10000.
+        progress : Callable, optional
+            Called with the number of replayed games and the differences so
+            far after every chunk.
+
+        Returns
+        -------
+        dict
+            The number of replayed games ("games") and a list of the number
+            and the difference of every game that does not match the log
+            ("differences"), in order.
+        """
+        with GameLogReader(path) as reader:
+            n_games = reader.n_games
+
+        tasks = [(path, first, min(first + chunk_size, n_games),
+                  self.check_options)
+                 for first in range(0, n_games, chunk_size)]
+
+        done = 0
+        differences = []
+        if processes == 1:
+            parts = map(self.replay_chunk, tasks)
+            for n_replayed, part in parts:
+                done += n_replayed
+                differences.extend(part)
+                if progress is not None:
+                    progress(done, differences)
+        else:
+            with Pool(processes) as pool:
+                for n_replayed, part in pool.imap_unordered(
+                        self.replay_chunk, tasks):
+                    done += n_replayed
+                    differences.extend(part)
+                    if progress is not None:
+                        progress(done, differences)
+
+        differences.sort()
+        return {"games": done, "differences": differences}
+
+    @staticmethod
+    def replay_chunk(task: tuple) -> tuple:
+        """
+        Replay a range of games of a log file.
+
+        Parameters
+        ----------
+        task : tuple
+            The path of the log file, the numbers of the first game and of
+            the game after the last one, and whether the legal actions are
+            checked.
+
+        Returns
+        -------
+        int, List[tuple]
+            The number of replayed games, and the number and the difference
+            of every game that does not match the log.
+        """
+        path, first, last, check_options = task
+        replay = Replay(check_options)
+        differences = []
+
+        with GameLogReader(path) as reader:
+            for number in range(first, last):
+                difference = replay.replay(reader.game(number))
+                if difference is not None:
+                    differences.append((number, difference))
+
+        return last - first, differences
@@ -0,0 +1,324 @@
+from itertools import product
+from operator import mul
+from typing import Sequence
+
+from ActionSpace import ActionSpace
+from Rules import STANDARD
+from ScoreRow import ScoreRow
+
+
+class RollTable:
+    """
+    Exact probabilities of the sums of a roll, by exhaustive enumeration.
+
+    A roll of the two white dice and the dice of the enabled colors has at
+    most 6 ** 6 equally likely outcomes. The table groups them by what the
+    players see: the white sum and the lower and higher sum of each colored
+    die with a white die. It also answers how likely a row in a given state
+    can be marked, so that bots and analysis code can use exact odds
+    instead of sampling. Tables are built on first use and shared, see
+    `for_colors`. They assume the standard rules; the methods raise a
+    ValueError for rows and sheets of other rules.
+
+    Attributes
+    ----------
+    colors : tuple[str]
+        The enabled colors, in the order of `ActionSpace.COLORS`.
+    outcomes : tuple[tuple]
+        The distinct outcomes as (probability, white sum, sums), where sums
+        holds the (lower, higher) sums of each color in `colors`. They are
+        only enumerated on first use.
+    white : tuple[float]
+        white[s] is the probability that the white sum is s.
+    """
+
+    _tables = {}
+
+    # The distinct outcomes of the white dice and one colored die, as
+    # (probability, white sum, lower sum, higher sum)
+    _SINGLE = None
+
+    # The numbers of the standard rows, by color
+    _STANDARD_ROWS = dict(STANDARD.rows)
+
+    def __init__(self, colors: Sequence[str]):
+        """
+        Build the table for a set of enabled colors.
+
+        Parameters
+        ----------
+        colors : Sequence[str]
+            The enabled colors.
+        """
+        self.colors = tuple(c for c in ActionSpace.COLORS if c in colors)
+        self._outcomes = None
+        self._white = None
+
+        # The memoized results of p_any_mark_states for the other players
+        # and for the active player
+        self._any_mark = ({}, {})
+
+        # For each row and state, the number of ways per pair of white dice
+        # that the row gives no mark: 0 if the white sum may be marked,
+        # otherwise 1 for the other players, and the number of faces of the
+        # die of the row that give no mark for the active player. Both
+        # orders of two white dice give the same terms, so each pair is
+        # listed once and weighted by its number of rolls
+        pairs = [(w1, w2) for w1 in range(1, 7) for w2 in range(w1, 7)]
+        self._weights = tuple(1 if w1 == w2 else 2 for w1, w2 in pairs)
+        passive = []
+        active = []
+        for color in ActionSpace.COLORS:
+            allowed = ScoreRow(color).moves.allowed
+            passive.append(tuple(
+                tuple(int(not row[w1 + w2]) for w1, w2 in pairs)
+                for row in allowed))
+            active.append(tuple(
+                tuple(0 if row[w1 + w2] else 6 if color not in self.colors
+                      else sum(not row[c + w1] and not row[c + w2]
+                               for c in range(1, 7))
+                      for w1, w2 in pairs)
+                for row in allowed))
+        self._terms = (tuple(passive), tuple(active))
+        self._scales = (36, 36 * 6 ** len(ActionSpace.COLORS))
+
+    @property
+    def outcomes(self) -> tuple:
+        """
+        The distinct outcomes, enumerated on first use.
+
+        Returns
+        -------
+        tuple[tuple]
+            The outcomes as (probability, white sum, sums), where sums holds
+            the (lower, higher) sums of each color in `colors`.
+        """
+        if self._outcomes is None:
+            k = len(self.colors)
+            counts = {}
+            for dice in product(range(1, 7), repeat=2 + k):
+                white1, white2 = dice[0], dice[1]
+                outcome = (white1 + white2,) + tuple(
+                    (min(c + white1, c + white2), max(c + white1, c + white2))
+                    for c in dice[2:])
+                counts[outcome] = counts.get(outcome, 0) + 1
+
+            total = 6 ** (2 + k)
+            self._outcomes = tuple(
+                (count / total, outcome[0], outcome[1:])
+                for outcome, count in counts.items())
+        return self._outcomes
+
+    @property
+    def white(self) -> tuple:
+        """
+        The probabilities of the white sums.
+
+        Returns
+        -------
+        tuple[float]
+            white[s] is the probability that the white sum is s.
+        """
+        if self._white is None:
+            white = [0.0] * 13
+            for probability, white_sum, _ in self.outcomes:
+                white[white_sum] += probability
+            self._white = tuple(white)
+        return self._white
+
+    @classmethod
+    def for_colors(cls, colors: Sequence[str] = ActionSpace.COLORS
+                   ) -> "RollTable":
+        """
+        Get the table of a set of enabled colors, building it only once.
+
+        Parameters
+        ----------
+        colors : Sequence[str], optional
+            The enabled colors. Defaults to all four colors.
+
+        Returns
+        -------
+        RollTable
+            The table.
+        """
+        key = frozenset(colors)
+        table = cls._tables.get(key)
+        if table is None:
+            table = cls._tables[key] = cls(key)
+        return table
+
+    @classmethod
+    def _single(cls) -> tuple:
+        """The distinct outcomes of the white dice and one colored die."""
+        if cls._SINGLE is None:
+            cls._SINGLE = tuple(
+                (probability, white_sum, sums[0][0], sums[0][1])
+                for probability, white_sum, sums
+                in cls.for_colors(("Red",)).outcomes)
+        return cls._SINGLE
+
+    @classmethod
+    def _check_row(cls, row) -> None:
+        """
+        Check that a row is a row of the standard rules.
+
+        Parameters
+        ----------
+        row : ScoreRow
+            The row.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If the row has other numbers or lock marks.
+        """
+        if row.numbers != cls._STANDARD_ROWS.get(row.color) or \
+                row.lock_marks != STANDARD.lock_marks:
+            raise ValueError("RollTable only supports the standard rules.")
+
+    def p_white(self, row) -> float:
+        """
+        Get the probability that the white sum may be marked in a row.
+
+        Parameters
+        ----------
+        row : ScoreRow
+            The row.
+
+        Returns
+        -------
+        float
+            The probability.
+        """
+        self._check_row(row)
+        allowed = row.moves.allowed[row.state]
+        return sum(p for s, p in enumerate(self.white) if allowed[s])
+
+    def p_colored(self, row) -> float:
+        """
+        Get the probability that a sum of the die of a row may be marked.
+
+        Parameters
+        ----------
+        row : ScoreRow
+            The row.
+
+        Returns
+        -------
+        float
+            The probability, 0 if the color is not enabled.
+        """
+        self._check_row(row)
+        if row.color not in self.colors:
+            return 0.0
+        allowed = row.moves.allowed[row.state]
+        return sum(p for p, _, low, high in self._single()
+                   if allowed[low] or allowed[high])
+
+    def p_mark(self, row, active: bool = True) -> float:
+        """
+        Get the probability that a row can be marked on a roll.
+
+        Parameters
+        ----------
+        row : ScoreRow
+            The row.
+        active : bool, optional
+            Whether the player is the active player, who may also use the
+            colored dice. Defaults to True.
+
+        Returns
+        -------
+        float
+            The probability.
+        """
+        if not active or row.color not in self.colors:
+            return self.p_white(row)
+        self._check_row(row)
+        allowed = row.moves.allowed[row.state]
+        return sum(p for p, white_sum, low, high in self._single()
+                   if allowed[white_sum] or allowed[low] or allowed[high])
+
+    def p_any_mark(self, sheet, active: bool = True) -> float:
+        """
+        Get the probability that a player can mark anything on a roll.
+
+        For the active player, this is the probability of not having to
+        take a failed attempt.
+
+        Parameters
+        ----------
+        sheet : ScoreSheet
+            The score sheet of the player.
+        active : bool, optional
+            Whether the player is the active player. Defaults to True.
+
+        Returns
+        -------
+        float
+            The probability.
+        """
+        sheet.rules.require_standard("RollTable")
+        return self.p_any_mark_states(
+            tuple(sheet.rows[color].state for color in ActionSpace.COLORS),
+            active)
+
+    def miss_terms(self, active: bool = True) -> tuple:
+        """
+        Get the terms of each row of the probability that a player can
+        mark nothing, to evaluate many sheets quickly.
+
+        Given the white dice, the rows give no mark independently, so the
+        probability that a sheet gives no mark is the sum over the pairs of
+        white dice of their weight times the product of the terms of its
+        rows, divided by the scale.
+
+        Parameters
+        ----------
+        active : bool, optional
+            Whether the player is the active player. Defaults to True.
+
+        Returns
+        -------
+        tuple, tuple, int
+            The terms, indexed by the row in `ActionSpace.COLORS`, its
+            `ScoreRow.state` and the pair of white dice, the weights of the
+            pairs and the scale.
+        """
+        return self._terms[active], self._weights, self._scales[active]
+
+    def p_any_mark_states(self, states: tuple, active: bool = True) -> float:
+        """
+        Get the probability that a player can mark anything on a roll, from
+        the states of the rows.
+
+        Parameters
+        ----------
+        states : tuple[int]
+            The `ScoreRow.state` of each row, in the order of
+            `ActionSpace.COLORS`.
+        active : bool, optional
+            Whether the player is the active player. Defaults to True.
+
+        Returns
+        -------
+        float
+            The probability.
+        """
+        memo = self._any_mark[active]
+        probability = memo.get(states)
+        if probability is not None:
+            return probability
+
+        misses = self._weights
+        for row_terms, state in zip(self._terms[active], states):
+            misses = map(mul, misses, row_terms[state])
+        probability = 1 - sum(misses) / self._scales[active]
+
+        memo[states] = probability
+        return probability
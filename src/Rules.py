@@ -0,0 +1,196 @@
+import struct
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+ASCENDING = tuple(range(2, 13))
+DESCENDING = tuple(range(12, 1, -1))
+
+
+class Rules(NamedTuple):
+    """
+    The rules of a variant of Qwixx.
+
+    The default rules are the standard game: four rows, red and yellow from
+    2 to 12 and green and blue from 12 to 2, six-sided dice, the last number
+    of a row, which locks it, only markable after five marks, failed
+    attempts worth -5 and the game over after four failed attempts of a
+    player or two locked colors. Any number of players up to 16 can play.
+
+    A row holds every sum of two dice once, in any order. The tables that
+    depend on a layout, like the `MoveTable` of its rows, are built once per
+    layout and shared, so variant games are as fast as standard games.
+
+    Binary snapshots of games support up to four colors. `GameLog`,
+    `ActionSpace`, `BatchQwixx`, the reinforcement-learning environments,
+    `Solver`, `RollTable` and the heuristic players only support the
+    standard rules, and raise a ValueError when given a game or sheet of
+    other rules, see `require_standard`.
+
+    Attributes
+    ----------
+    rows : tuple[tuple[str, tuple[int]]]
+        The color and the numbers of each row, from left to right. Each
+        color has its own die.
+    sides : int
+        The number of sides of every die.
+    lock_marks : int
+        The number of marks a row needs before its last number, which locks
+        the row, may be marked.
+    failed_penalty : int
+        The points a failed attempt costs.
+    max_failed : int
+        The number of failed attempts of a player that ends the game.
+    locks_to_end : int
+        The number of locked colors that ends the game.
+    """
+
+    rows: Tuple[Tuple[str, Tuple[int, ...]], ...] = (
+        ("Red", ASCENDING), ("Yellow", ASCENDING),
+        ("Green", DESCENDING), ("Blue", DESCENDING))
+    sides: int = 6
+    lock_marks: int = 5
+    failed_penalty: int = 5
+    max_failed: int = 4
+    locks_to_end: int = 2
+
+    # The longest row that the tables of the engine support
+    MAX_NUMBERS = 30
+    MAX_PLAYERS = 16
+
+    @classmethod
+    def variant(cls, sides: int = 6, colors: Sequence[str] = (
+                    "Red", "Yellow", "Green", "Blue"),
+                descending: Sequence[str] = ("Green", "Blue"),
+                layouts: Dict[str, Sequence[int]] = None,
+                **kwargs) -> "Rules":
+        """
+        Create the rules of a variant.
+
+        Parameters
+        ----------
+        sides : int, optional
+            The number of sides of every die. Defaults to 6.
+        colors : Sequence[str], optional
+            The colors of the rows. Defaults to the four standard colors.
+        descending : Sequence[str], optional
+            The colors whose rows run from the highest sum to the lowest.
+            Defaults to green and blue.
+        layouts : Dict[str, Sequence[int]], optional
+            The numbers of rows in another order, such as mixed-direction
+            rows, by color.
+        **kwargs
+            The other fields of the rules.
+
+        Returns
+        -------
+        Rules
+            The checked rules.
+
+        Raises
+        ------
+        ValueError
+            If the rules are not valid, see `check`.
+        """
+        ascending = tuple(range(2, 2 * sides + 1))
+        layouts = layouts or {}
+        rows = tuple(
+            (color, tuple(layouts[color]) if color in layouts else
+             ascending[::-1] if color in descending else ascending)
+            for color in colors)
+        rules = cls(rows, sides, **kwargs)
+        rules.check()
+        return rules
+
+    @property
+    def colors(self) -> Tuple[str, ...]:
+        """
+        The colors of the rows.
+
+        Returns
+        -------
+        tuple[str]
+            The colors, in the order of the rows.
+        """
+        return tuple(color for color, _ in self.rows)
+
+    @property
+    def sheet_struct(self) -> struct.Struct:
+        """
+        The binary layout of a score sheet, see `ScoreSheet.pack_into`.
+
+        Returns
+        -------
+        struct.Struct
+            The marks of each row, a bit per closed row and the number of
+            failed attempts.
+        """
+        layout = _STRUCTS.get(self.rows)
+        if layout is None:
+            longest = max(len(numbers) for _, numbers in self.rows)
+            mask = "H" if longest <= 16 else "I"
+            closed = "B" if len(self.rows) <= 8 else "I"
+            layout = _STRUCTS[self.rows] = struct.Struct(
+                f"<{len(self.rows)}{mask}{closed}B")
+        return layout
+
+    def check(self) -> None:
+        """
+        Check that the rules can be played.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If a row does not hold every sum of two dice once or is too
+            long, if colors repeat or are named "White", or if a limit is
+            not positive.
+        """
+        if self.sides < 2 or self.lock_marks < 1 or self.max_failed < 1 or \
+                self.locks_to_end < 1:
+            raise ValueError("The limits of the rules must be positive.")
+        colors = self.colors
+        if not colors or len(set(colors)) != len(colors) or \
+                any(color.startswith("White") for color in colors):
+            raise ValueError(
+                "The rows need distinct colors other than white.")
+        if self.locks_to_end > len(colors):
+            raise ValueError("The game could never end by locked colors.")
+        sums = list(range(2, 2 * self.sides + 1))
+        if len(sums) > self.MAX_NUMBERS:
+            raise ValueError(
+                f"Rows can have at most {self.MAX_NUMBERS} numbers.")
+        for color, numbers in self.rows:
+            if sorted(numbers) != sums:
+                raise ValueError(
+                    f"The {color} row must hold every number from 2 to "
+                    f"{2 * self.sides} once.")
+
+    def require_standard(self, user: str) -> None:
+        """
+        Check that the rules are the standard rules, for the parts of the
+        code that only support them.
+
+        Parameters
+        ----------
+        user : str
+            The name of the part, for the message.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If the rules are not the standard rules.
+        """
+        if self is not STANDARD and self != STANDARD:
+            raise ValueError(f"{user} only supports the standard rules.")
+
+
+# The sheet layouts by rows, built once
+_STRUCTS = {}
+
+STANDARD = Rules()
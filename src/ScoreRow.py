@@ -1,18 +1,70 @@
+import random
+
+from MoveTable import MoveTable
+from Rules import ASCENDING, DESCENDING, STANDARD
+
+
 class ScoreRow:
     """
     A class for a row in the score sheet.
 
+    The marks are kept as a bitmask over the positions of the row, together
+    with the position of the last mark, the number of marks and the running
+    score, so that checking, marking and scoring take constant time.
+
+    The last number of the row may only be marked once the row has at
+    least `lock_marks` marks. Marking it locks the row: it is closed and
+    scores an extra point. A row can also be closed with `close` when
+    another player locks its color, which does not score the extra point.
+
+    Rows with the same last mark, number of marks and closed flag play and
+    score the same, whatever marks led there. `zobrist` is a random 64-bit
+    key of this state, looked up on every change, that score sheets combine
+    into a key of their own (see `ScoreSheet.zobrist`).
+
     Attributes
     ----------
     color : str
         The color of the row.
     closed : bool
         Indicates if the row is closed.
-    values : dict[int, bool]
-        Represents the numbers in the row and their statuses.
+    numbers : tuple[int]
+        The numbers in the row, from left to right.
+    mask : int
+        Bit i is set if the number at position i is marked.
+    last : int
+        The position of the last mark, or -1 if nothing is marked.
+    count : int
+        The number of marks in the row.
+    score : int
+        The score of the row.
+    moves : MoveTable
+        The precomputed legal marks of rows with these numbers.
+    lock_marks : int
+        The number of marks needed before the last number may be marked.
+    zobrist : int
+        The key of the state of the row.
     """
 
-    def __init__(self, color: str):
+    __slots__ = ("color", "closed", "numbers", "mask", "last", "count",
+                 "score", "moves", "lock_marks", "zobrist", "_index",
+                 "_keys")
+
+    LOCK_MARKS = STANDARD.lock_marks
+    ASCENDING = ASCENDING
+    DESCENDING = DESCENDING
+
+    # The position of each number in the row, shared by all rows that have
+    # the same numbers
+    _POSITIONS = {}
+
+    # The keys of each color, indexed by (closed * 32 + last + 1) * 32 +
+    # count. They are drawn from a seed made from the color, so keys are the
+    # same in every process.
+    ZOBRIST = {}
+
+    def __init__(self, color: str, numbers: tuple = None,
+                 lock_marks: int = LOCK_MARKS):
         """
         Initialize the ScoreRow.
 
@@ -20,14 +72,132 @@ class ScoreRow:
         ----------
         color : str
             The color of the row.
+        numbers : tuple[int], optional
+            The numbers in the row, from left to right. Defaults to the
+            standard row of the color: descending for green and blue,
+            ascending otherwise.
+        lock_marks : int, optional
+            The number of marks needed before the last number may be
+            marked. Defaults to `LOCK_MARKS`.
         """
         self.color = color
         self.closed = False
 
-        if color in ["Green", "Blue"]:
-            self.values = {x: False for x in range(12, 1, -1)}
+        if numbers is not None:
+            self.numbers = tuple(numbers)
+        elif color in ["Green", "Blue"]:
+            self.numbers = self.DESCENDING
         else:
-            self.values = {x: False for x in range(2, 13)}
+            self.numbers = self.ASCENDING
+
+        self._index = self._POSITIONS.get(self.numbers)
+        if self._index is None:
+            self._index = self._POSITIONS[self.numbers] = \
+                {x: i for i, x in enumerate(self.numbers)}
+        self.moves = MoveTable.for_numbers(self.numbers)
+        self.lock_marks = lock_marks
+        self._keys = self.ZOBRIST.get(color)
+        if self._keys is None:
+            rng = random.Random(f"zobrist {color}")
+            self._keys = self.ZOBRIST[color] = tuple(
+                rng.getrandbits(64) for _ in range(2 * 32 * 32))
+        self.mask = 0
+        self.last = -1
+        self.count = 0
+        self.score = 0
+        self.zobrist = self._keys[0]
+
+    def copy(self) -> "ScoreRow":
+        """
+        Returns a copy of the ScoreRow.
+
+        Returns
+        -------
+        ScoreRow
+            A row with the same marks that can be changed independently.
+        """
+        row = ScoreRow.__new__(ScoreRow)
+        row.color = self.color
+        row.closed = self.closed
+        row.numbers = self.numbers
+        row.mask = self.mask
+        row.last = self.last
+        row.count = self.count
+        row.score = self.score
+        row.moves = self.moves
+        row.lock_marks = self.lock_marks
+        row.zobrist = self.zobrist
+        row._index = self._index
+        row._keys = self._keys
+        return row
+
+    def set_marks(self, mask: int, closed: bool) -> None:
+        """
+        Replaces the marks of the row.
+
+        Parameters
+        ----------
+        mask : int
+            Bit i is set if the number at position i is marked.
+        closed : bool
+            Whether the row is closed.
+
+        Returns
+        -------
+        None
+        """
+        self.mask = mask
+        self.last = mask.bit_length() - 1
+        self.count = bin(mask).count("1")
+        self.closed = closed
+        self.score = self._score(self.count, self.last)
+        self.zobrist = self._key()
+
+    def _key(self) -> int:
+        """The key of the current state of the row."""
+        return self._keys[(self.closed * 32 + self.last + 1) * 32 +
+                          self.count]
+
+    def _score(self, count: int, last: int) -> int:
+        """The score of the row with the given marks."""
+        score = count * (count + 1) // 2
+
+        # Add an extra point if the player locked the row
+        if last == len(self.numbers) - 1:
+            score += 1
+
+        return score
+
+    @property
+    def values(self) -> dict:
+        """
+        The numbers in the row and their statuses.
+
+        Returns
+        -------
+        dict[int, bool]
+            For each number in the row, from left to right, True if it is
+            marked and False otherwise.
+        """
+        mask = self.mask
+        return {x: bool(mask >> i & 1) for i, x in enumerate(self.numbers)}
+
+    @property
+    def state(self) -> int:
+        """
+        The state of the row in its `MoveTable`.
+
+        Returns
+        -------
+        int
+            `MoveTable.CLOSED` if the row is closed, otherwise the position
+            of the last mark plus one, plus `MoveTable.READY` if the last
+            number may be marked.
+        """
+        if self.closed:
+            return MoveTable.CLOSED
+        return self.last + 1 + MoveTable.READY * (
+            self.count >= self.lock_marks)
 
     def __str__(self) -> str:
         """
@@ -38,8 +208,9 @@ class ScoreRow:
         str
             A string representation of the ScoreRow.
         """
-        row = "".join([f"({value})" if self.values[value]
-                      else f" {value} " for value in self.values])
+        values = self.values
+        row = "".join([f"({value})" if values[value]
+                      else f" {value} " for value in values])
         return f"Color: {self.color}\n{row}\nScore: {self.calculate_score()}"
 
     def calculate_score(self) -> int:
@@ -51,16 +222,26 @@ class ScoreRow:
         int
             The score of the row.
         """
-        count = sum(self.values.values())
-        score = count * (count + 1) // 2
+        return self.score
 
-        # Add an extra point if the row is locked and has at least 5 crosses
-        if self.closed and count >= 5:
-            score += 1
+    def position(self, value: int) -> int:
+        """
+        Gets the position of a value in the row.
 
-        return score
+        Parameters
+        ----------
+        value : int
+            The value.
 
-    def is_allowed(self, value: int) -> bool:
+        Returns
+        -------
+        int
+            The position of the value from the left, or None if the value is
+            not in the row.
+        """
+        return self._index.get(value)
+
+    def is_allowed(self, value: int, after: int = None) -> bool:
         """
         Checks if the given value is allowed to be marked in the row.
 
@@ -68,6 +249,10 @@ class ScoreRow:
         ----------
         value : int
             The value to be checked.
+        after : int, optional
+            A value that is marked first in the same decision, like the
+            white sum before a colored sum in the same row. It must be
+            allowed itself.
 
         Returns
         -------
@@ -75,28 +260,21 @@ class ScoreRow:
             True if the value is allowed to be marked in the row, False
             otherwise.
         """
-        # If the value is already marked or the row is closed, it's not allowed
-        if value in self.values and self.values[value] or self.closed:
+        # If the row is closed, nothing is allowed
+        if self.closed:
             return False
 
-        latest_filled_value = next((v for v in reversed(
-            self.values.keys()) if self.values[v]), None)
-
-        # If no value has been marked yet, then the given value is allowed
-        if latest_filled_value is None:
-            return True
-
-        # For Red and Yellow rows, the next value should be greater than the
-        # latest filled value
-        if self.color in ["Red", "Yellow"]:
-            return value > latest_filled_value
-
-        # For Green and Blue rows, the next value should be smaller than the
-        # latest filled value
-        if self.color in ["Green", "Blue"]:
-            return value < latest_filled_value
+        # The value should be to the right of the last mark, which also rules
+        # out values that are already marked
+        last, count = self.last, self.count
+        if after is not None:
+            last, count = self._index[after], count + 1
+        index = self._index.get(value)
+        if index is None or index <= last:
+            return False
 
-        return False
+        # The last number needs enough marks before it
+        return index < len(self.numbers) - 1 or count >= self.lock_marks
 
     def fill_in_number(self, value: int) -> bool:
         """
@@ -112,10 +290,34 @@ class ScoreRow:
         bool
             True if the value is marked in the row, False otherwise.
         """
-        if self.is_allowed(value):
-            self.values[value] = True
+        index = self._index.get(value)
+        if self.closed or index is None or index <= self.last:
+            return False
+        last = len(self.numbers) - 1
+        if index == last and self.count < self.lock_marks:
+            return False
+
+        self.mask |= 1 << index
+        self.last = index
+        self.count += 1
+        # The n-th mark is worth n points
+        self.score += self.count
+
+        # Marking the last number locks the row
+        if index == last:
+            self.closed = True
+            self.score += 1
+        self.zobrist = self._keys[(self.closed * 32 + index + 1) * 32 +
+                                  self.count]
+        return True
+
+    def close(self) -> None:
+        """
+        Closes the row, so that nothing can be marked in it anymore.
 
-            if value == list(self.values)[-1]:
-                self.closed = True
-            return True
-        return False
+        Returns
+        -------
+        None
+        """
+        self.closed = True
+        self.zobrist = self._key()
@@ -1,3 +1,6 @@
+import random
+
+from Rules import STANDARD, Rules
 from ScoreRow import ScoreRow
 
 
@@ -11,19 +14,112 @@ class ScoreSheet:
         The name of the player.
     rows : dict[str, ScoreRow]
         A dictionary of ScoreRow objects representing each colored row.
+    rules : Rules
+        The rules of the game, which set the rows and the penalty of a
+        failed attempt.
     failed_attempts : int
         The number of failed attempts.
+    score : int
+        The total score, kept up to date by `mark_row` and
+        `add_failed_attempt`.
+    zobrist : int
+        A 64-bit key of the state of the sheet: the keys of the rows (see
+        `ScoreRow.zobrist`) and of the number of failed attempts, combined
+        with XOR and updated on every change. Sheets that play and score
+        the same have the same key, whatever order the marks were made in.
     """
 
-    def __init__(self, player_name: str):
+    # The marks of the four rows, the closed rows and the failed attempts,
+    # under the standard rules (see `Rules.sheet_struct`)
+    STRUCT = STANDARD.sheet_struct
+
+    # The keys of the numbers of failed attempts
+    FAILED_ZOBRIST = tuple(random.Random(0x4641494C).getrandbits(64)
+                           for _ in range(256))
+
+    def __init__(self, player_name: str, rules: Rules = STANDARD):
         self.name = player_name
+        self.rules = rules
         self.rows = {
-            "Red": ScoreRow("Red"),
-            "Yellow": ScoreRow("Yellow"),
-            "Green": ScoreRow("Green"),
-            "Blue": ScoreRow("Blue"),
+            color: ScoreRow(color, numbers, rules.lock_marks)
+            for color, numbers in rules.rows
         }
         self.failed_attempts = 0
+        self.score = 0
+        self.zobrist = self.FAILED_ZOBRIST[0]
+        for row in self.rows.values():
+            self.zobrist ^= row.zobrist
+
+    def copy(self) -> "ScoreSheet":
+        """
+        Returns a copy of the ScoreSheet.
+
+        Returns
+        -------
+        ScoreSheet
+            A score sheet with the same marks that can be changed
+            independently.
+        """
+        sheet = ScoreSheet.__new__(ScoreSheet)
+        sheet.name = self.name
+        sheet.rules = self.rules
+        sheet.rows = {color: row.copy() for color, row in self.rows.items()}
+        sheet.failed_attempts = self.failed_attempts
+        sheet.score = self.score
+        sheet.zobrist = self.zobrist
+        return sheet
+
+    def pack_into(self, buffer, offset: int = 0) -> None:
+        """
+        Writes the marks and failed attempts into a buffer.
+
+        The sheet takes `rules.sheet_struct.size` bytes (`STRUCT.size`
+        under the standard rules): the bitmask of each row, a bit per
+        closed row and the number of failed attempts.
+
+        Parameters
+        ----------
+        buffer : bytearray or memoryview
+            The writable buffer.
+        offset : int, optional
+            The position in the buffer. Defaults to 0.
+
+        Returns
+        -------
+        None
+        """
+        rows = list(self.rows.values())
+        closed = 0
+        for i, row in enumerate(rows):
+            closed |= row.closed << i
+        self.rules.sheet_struct.pack_into(
+            buffer, offset, *(row.mask for row in rows), closed,
+            self.failed_attempts)
+
+    def unpack_from(self, buffer, offset: int = 0) -> None:
+        """
+        Reads the marks and failed attempts written by `pack_into`.
+
+        Parameters
+        ----------
+        buffer : bytes, bytearray or memoryview
+            The buffer.
+        offset : int, optional
+            The position in the buffer. Defaults to 0.
+
+        Returns
+        -------
+        None
+        """
+        *masks, closed, self.failed_attempts = \
+            self.rules.sheet_struct.unpack_from(buffer, offset)
+        for i, (row, mask) in enumerate(zip(self.rows.values(), masks)):
+            row.set_marks(mask, bool(closed >> i & 1))
+        self.score = sum(row.score for row in self.rows.values()) \
+            - self.failed_attempts * self.rules.failed_penalty
+        self.zobrist = self.FAILED_ZOBRIST[self.failed_attempts]
+        for row in self.rows.values():
+            self.zobrist ^= row.zobrist
 
     def __str__(self) -> str:
         """
@@ -57,20 +153,50 @@ class ScoreSheet:
         bool
             True if the marking was successful, False otherwise.
         """
-        return self.rows[row_name].fill_in_number(value)
+        row = self.rows[row_name]
+        score = row.score
+        key = row.zobrist
+        if not row.fill_in_number(value):
+            return False
+        self.score += row.score - score
+        self.zobrist ^= key ^ row.zobrist
+        return True
+
+    def close_row(self, row_name: str) -> None:
+        """
+        Closes the specified row after its color has been locked.
+
+        Parameters
+        ----------
+        row_name : str
+            The name of the row.
+
+        Returns
+        -------
+        None
+        """
+        row = self.rows[row_name]
+        key = row.zobrist
+        row.close()
+        self.zobrist ^= key ^ row.zobrist
 
     def add_failed_attempt(self) -> None:
-        """Increments the number of failed attempts by 1."""
+        """Adds a failed attempt, which costs `rules.failed_penalty`."""
+        self.zobrist ^= self.FAILED_ZOBRIST[self.failed_attempts] ^ \
+            self.FAILED_ZOBRIST[self.failed_attempts + 1]
         self.failed_attempts += 1
+        self.score -= self.rules.failed_penalty
 
     def calculate_score(self) -> int:
         """
         Calculates the total score based on the rows and failed attempts.
 
+        The score is updated on every change of the sheet, so this takes
+        constant time.
+
         Returns
         -------
         int
             The total score.
         """
-        return sum(row.calculate_score() for row in self.rows.values()) \
-            - (self.failed_attempts * 5)
+        return self.score
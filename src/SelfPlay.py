@@ -0,0 +1,366 @@
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterator
+
+import numpy as np
+
+from ActionSpace import ActionSpace
+from DiceSource import BufferedDice
+from Player import RandomPlayer
+from Qwixx import Qwixx
+from QwixxEnv import QwixxEnv
+
+
+class SelfPlay:
+    """
+    Generate training data from self-play games into shards on disk.
+
+    Worker processes play games in which every seat is played by the same
+    policy, and record a sample for every decision with more than one legal
+    action: the observation of the deciding player (see `QwixxEnv.encode`),
+    the mask of the legal `ActionSpace` indices, the index of the chosen
+    action and the final reward of the deciding player. The reward is the
+    final score of the player minus the best final score of the other
+    players, as in `MonteCarloPlayer`.
+
+    The samples are collected in shards of exactly `shard_size` samples,
+    preallocated per worker, so memory stays bounded however much data is
+    generated. Every shard is played from its own seed, and is written to a
+    temporary file and renamed when it is complete. Running the pipeline
+    again on the same directory therefore only generates the shards that
+    are missing, and gives the same data as an uninterrupted run.
+
+    Attributes
+    ----------
+    directory : str
+        The directory of the shards.
+    n_players : int
+        The number of players of the games.
+    shard_size : int
+        The number of samples per shard.
+    policy : type
+        The Player class of all seats, constructed with a `seed` keyword
+        argument.
+    seed : int
+        The seed of the pipeline.
+    observation_size : int
+        The length of the observation vectors.
+    """
+
+    META = "meta.json"
+
+    def __init__(self, directory: str, n_players: int = 2,
+                 shard_size: int = 65536, policy: type = RandomPlayer,
+                 seed: int = 0):
+        """
+        Initialize the pipeline and its directory.
+
+        Parameters
+        ----------
+        directory : str
+            The directory of the shards, created if needed.
+        n_players : int, optional
+            The number of players of the games. Defaults to 2.
+        shard_size : int, optional
+            The number of samples per shard. Defaults to 65536.
+        policy : type, optional
+            The Player class of all seats. Defaults to RandomPlayer.
+        seed : int, optional
+            The seed of the pipeline. Defaults to 0.
+
+        Raises
+        ------
+        ValueError
+            If the directory holds shards of other settings.
+        """
+        self.directory = directory
+        self.n_players = n_players
+        self.shard_size = shard_size
+        self.policy = policy
+        self.seed = seed
+        self.observation_size = QwixxEnv.get_observation_size(n_players)
+
+        meta = {"n_players": n_players, "shard_size": shard_size,
+                "policy": policy.__name__, "seed": seed,
+                "observation_size": self.observation_size}
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.META)
+        if os.path.exists(path):
+            with open(path) as file:
+                existing = json.load(file)
+            if existing != meta:
+                raise ValueError(
+                    f"The directory holds shards of other settings: "
+                    f"{existing}.")
+        else:
+            with open(path, "w") as file:
+                json.dump(meta, file, indent=2)
+
+    @staticmethod
+    def shard_name(number: int) -> str:
+        """
+        Get the file name of a shard.
+
+        Parameters
+        ----------
+        number : int
+            The number of the shard.
+
+        Returns
+        -------
+        str
+            The file name.
+        """
+        return f"shard-{number:06d}.npz"
+
+    def missing(self, n_shards: int) -> list:
+        """
+        List the shards that have not been written yet.
+
+        Parameters
+        ----------
+        n_shards : int
+            The total number of shards.
+
+        Returns
+        -------
+        list
+            The numbers of the missing shards, in order.
+        """
+        return [number for number in range(n_shards)
+                if not os.path.exists(os.path.join(
+                    self.directory, self.shard_name(number)))]
+
+    def run(self, n_shards: int, processes: int = None,
+            progress: Callable = None) -> Dict[str, float]:
+        """
+        Generate the shards that are missing.
+
+        Parameters
+        ----------
+        n_shards : int
+            The total number of shards.
+        processes : int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+            With 1, the games are played in this process.
+        progress : Callable, optional
+            Called with the number of shards written so far in this run and
+            the statistics so far after every shard.
+
+        Returns
+        -------
+        Dict[str, float]
+            The number of shards written ("shards") and skipped because
+            they existed ("skipped"), the number of samples ("samples") and
+            games ("games") generated, the time in seconds ("seconds") and
+            the samples per second ("samples_per_second").
+        """
+        numbers = self.missing(n_shards)
+        tasks = [(self.directory, number, self.n_players, self.shard_size,
+                  self.policy, self.seed * 1_000_003 + number)
+                 for number in numbers]
+
+        stats = {"shards": 0, "skipped": n_shards - len(numbers),
+                 "samples": 0, "games": 0, "seconds": 0.0,
+                 "samples_per_second": 0.0}
+        start = time.perf_counter()
+
+        def collect(parts):
+            for n_games in parts:
+                stats["shards"] += 1
+                stats["samples"] += self.shard_size
+                stats["games"] += n_games
+                stats["seconds"] = time.perf_counter() - start
+                stats["samples_per_second"] = \
+                    stats["samples"] / max(stats["seconds"], 1e-9)
+                if progress is not None:
+                    progress(stats["shards"], stats)
+
+        if processes == 1:
+            collect(map(self.play_shard, tasks))
+        else:
+            with Pool(processes) as pool:
+                collect(pool.imap_unordered(self.play_shard, tasks))
+
+        return stats
+
+    @staticmethod
+    def play_shard(task: tuple) -> int:
+        """
+        Play games until a shard is full and write it.
+
+        Parameters
+        ----------
+        task : tuple
+            The directory, the number of the shard, the number of players,
+            the shard size, the policy class and the seed of the shard.
+
+        Returns
+        -------
+        int
+            The number of games played. The samples of the last game that
+            do not fit are dropped.
+        """
+        directory, number, n_players, shard_size, policy, seed = task
+        rng = random.Random(seed)
+        dice = BufferedDice(rng.getrandbits(64))
+        player = policy(seed=rng.getrandbits(64))
+        game = Qwixx(n_players, policies=[player] * n_players,
+                     dice_source=dice)
+
+        observations = np.zeros(
+            (shard_size, QwixxEnv.get_observation_size(n_players)),
+            dtype=np.float32)
+        masks = np.zeros((shard_size, ActionSpace.N_ACTIONS), dtype=bool)
+        actions = np.zeros(shard_size, dtype=np.int8)
+        rewards = np.zeros(shard_size, dtype=np.float32)
+        players = np.zeros(shard_size, dtype=np.int8)
+
+        n = 0
+        n_games = 0
+        while n < shard_size:
+            game.reset()
+            first = n
+            while game.to_move is not None:
+                i = game.to_move
+                legal = game.legal_actions()
+                action = player.choose_action(game, i, legal)
+                if len(legal) > 1 and n < shard_size:
+                    roll = game.roll
+                    observations[n] = QwixxEnv.encode(game, i)
+                    for option in legal:
+                        masks[n, ActionSpace.encode(roll, option)] = True
+                    actions[n] = ActionSpace.encode(roll, action)
+                    players[n] = i
+                    n += 1
+                game.step(action)
+            n_games += 1
+
+            scores = np.array([sheet.calculate_score()
+                               for sheet in game.players], dtype=np.float32)
+            if n_players > 1:
+                best_other = np.array(
+                    [np.delete(scores, i).max() for i in range(n_players)])
+                scores = scores - best_other
+            rewards[first:n] = scores[players[first:n]]
+
+        path = os.path.join(directory, SelfPlay.shard_name(number))
+        with open(path + ".tmp", "wb") as file:
+            np.savez(file, observations=observations, masks=masks,
+                     actions=actions, rewards=rewards)
+        os.replace(path + ".tmp", path)
+        return n_games
+
+
+class ShardLoader:
+    """
+    Stream shuffled batches of samples from the shards of a `SelfPlay` run.
+
+    The shards are visited in a random order, and only `buffer_shards` of
+    them are loaded at a time. Their samples are shuffled together and cut
+    into batches, so memory stays bounded by the size of the buffer. Every
+    iteration over the loader is one epoch over all shards that exist when
+    it starts.
+
+    Attributes
+    ----------
+    directory : str
+        The directory of the shards.
+    batch_size : int
+        The number of samples per batch.
+    buffer_shards : int
+        The number of shards shuffled together.
+    shuffle : bool
+        Whether the shards and samples are shuffled.
+    drop_last : bool
+        Whether a smaller last batch of an epoch is dropped.
+    """
+
+    FIELDS = ("observations", "masks", "actions", "rewards")
+
+    def __init__(self, directory: str, batch_size: int = 1024,
+                 buffer_shards: int = 4, shuffle: bool = True,
+                 drop_last: bool = False, seed: int = None):
+        """
+        Initialize the loader.
+
+        Parameters
+        ----------
+        directory : str
+            The directory of the shards.
+        batch_size : int, optional
+            The number of samples per batch. Defaults to 1024.
+        buffer_shards : int, optional
+            The number of shards shuffled together. Defaults to 4.
+        shuffle : bool, optional
+            Whether the shards and samples are shuffled. Defaults to True.
+        drop_last : bool, optional
+            Whether a smaller last batch is dropped. Defaults to False.
+        seed : int, optional
+            The seed of the shuffling.
+        """
+        self.directory = directory
+        self.batch_size = batch_size
+        self.buffer_shards = buffer_shards
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self._rng = np.random.default_rng(seed)
+
+    def shards(self) -> list:
+        """
+        List the complete shards.
+
+        Returns
+        -------
+        list
+            The paths of the shards, in order.
+        """
+        return [os.path.join(self.directory, name)
+                for name in sorted(os.listdir(self.directory))
+                if name.startswith("shard-") and name.endswith(".npz")]
+
+    def __iter__(self) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Iterate over one epoch of batches.
+
+        Returns
+        -------
+        Iterator[Dict[str, numpy.ndarray]]
+            Batches with the observations, masks, actions and rewards of
+            their samples, by field name.
+        """
+        paths = self.shards()
+        if self.shuffle:
+            self._rng.shuffle(paths)
+
+        rest = None
+        for start in range(0, len(paths), self.buffer_shards):
+            parts = []
+            for path in paths[start:start + self.buffer_shards]:
+                with np.load(path) as shard:
+                    parts.append({field: shard[field]
+                                  for field in self.FIELDS})
+            if rest is not None:
+                parts.insert(0, rest)
+            buffer = {field: np.concatenate([part[field] for part in parts])
+                      for field in self.FIELDS}
+
+            size = len(buffer["actions"])
+            order = self._rng.permutation(size) if self.shuffle else \
+                np.arange(size)
+            full = size - size % self.batch_size
+            for first in range(0, full, self.batch_size):
+                index = order[first:first + self.batch_size]
+                yield {field: values[index]
+                       for field, values in buffer.items()}
+
+            # Keep the samples that do not fill a batch for the next buffer
+            index = order[full:]
+            rest = {field: values[index]
+                    for field, values in buffer.items()}
+
+        if rest is not None and len(rest["actions"]) and not self.drop_last:
+            yield rest
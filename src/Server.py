@@ -0,0 +1,605 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List
+
+from Action import Action
+from DiceSource import RandomDice
+from Player import Player, RandomPlayer
+from Qwixx import Qwixx
+
+logger = logging.getLogger(__name__)
+
+
+class Seat:
+    """
+    Base class for the occupant of a seat at a table.
+
+    Methods
+    -------
+    decide(game, player_number, actions) -> Action
+        Return the action of the seat.
+    send(message)
+        Tell the seat about the game.
+    """
+
+    name = "Seat"
+
+    async def decide(self, game: Qwixx, player_number: int,
+                     actions: List[Action]) -> Action:
+        """
+        Decide on one of the legal actions.
+
+        Parameters
+        ----------
+        game : Qwixx
+            The game.
+        player_number : int
+            The number of the seat in the game.
+        actions : List[Action]
+            The legal actions.
+
+        Returns
+        -------
+        Action
+            The chosen action.
+        """
+        raise NotImplementedError
+
+    async def send(self, message: dict) -> None:
+        """
+        Tell the seat about the game; does nothing by default.
+
+        Parameters
+        ----------
+        message : dict
+            The message.
+
+        Returns
+        -------
+        None
+        """
+
+
+class BotSeat(Seat):
+    """
+    A seat played by a policy.
+
+    The policy runs in the default executor of the event loop, so a slow bot
+    does not hold up the other tables.
+
+    Attributes
+    ----------
+    name : str
+        The name of the bot.
+    policy : Player
+        The policy of the bot.
+    """
+
+    def __init__(self, name: str, policy: Player):
+        self.name = name
+        self.policy = policy
+
+    async def decide(self, game: Qwixx, player_number: int,
+                     actions: List[Action]) -> Action:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.policy.choose_action, game, player_number, actions)
+
+
+class ClientSeat(Seat):
+    """
+    A seat played by a client connected to the server.
+
+    Attributes
+    ----------
+    name : str
+        The name of the player.
+    connection : Connection
+        The connection of the client.
+    """
+
+    def __init__(self, name: str, connection: "Connection"):
+        self.name = name
+        self.connection = connection
+
+    async def decide(self, game: Qwixx, player_number: int,
+                     actions: List[Action]) -> Action:
+        index = await self.connection.ask(
+            {"type": "decide", "seat": player_number,
+             "actions": [list(action) for action in actions]})
+        if not isinstance(index, int) or not 0 <= index < len(actions):
+            raise ValueError(f"Invalid action index: {index!r}.")
+        return actions[index]
+
+    async def send(self, message: dict) -> None:
+        await self.connection.send(message)
+
+
+class Table:
+    """
+    A game of Qwixx run as a coroutine.
+
+    The active player decides first. Then all other players that can use
+    the white sum are asked at the same time, and their answers are applied
+    in the order of the game once everyone has answered or the timeout has
+    passed. A seat that does not answer in time, answers with an invalid
+    action, disconnects or whose bot raises an error makes the safe choice:
+    a pass for the other players and a failed attempt for the active
+    player.
+
+    Attributes
+    ----------
+    name : str
+        The name of the table.
+    n_players : int
+        The number of seats.
+    seats : List[Seat]
+        The occupants of the seats, in order of joining.
+    timeout : float
+        The time a seat has for a decision, in seconds.
+    dice_source : DiceSource
+        The source of the rolls.
+    game : Qwixx
+        The game, once it has started.
+    task : asyncio.Task
+        The task running the game, once the table is full.
+    """
+
+    def __init__(self, name: str, n_players: int, timeout: float = 60.0,
+                 dice_source=None):
+        """
+        Initialize the table.
+
+        Parameters
+        ----------
+        name : str
+            The name of the table.
+        n_players : int
+            The number of seats.
+        timeout : float, optional
+            The time a seat has for a decision, in seconds. Defaults to 60.
+        dice_source : DiceSource, optional
+            The source of the rolls. Defaults to an unseeded RandomDice.
+        """
+        self.name = name
+        self.n_players = n_players
+        self.seats = []
+        self.timeout = timeout
+        self.dice_source = dice_source if dice_source is not None else \
+            RandomDice()
+        self.game = None
+        self.task = None
+
+    @property
+    def is_full(self) -> bool:
+        """
+        Whether every seat is taken.
+
+        Returns
+        -------
+        bool
+            True if the table is full.
+        """
+        return len(self.seats) >= self.n_players
+
+    async def broadcast(self, message: dict) -> None:
+        """
+        Send a message to every seat.
+
+        Parameters
+        ----------
+        message : dict
+            The message.
+
+        Returns
+        -------
+        None
+        """
+        await asyncio.gather(*(seat.send(message) for seat in self.seats))
+
+    def state(self) -> dict:
+        """
+        Describe the game for the clients.
+
+        Returns
+        -------
+        dict
+            The message with the roll, the active player, the player to
+            move and, per player, the marked numbers of each row, the
+            failed attempts and the score.
+        """
+        game = self.game
+        return {
+            "type": "state",
+            "table": self.name,
+            "turn": game.turns,
+            "current_player": game.current_player,
+            "to_move": game.to_move,
+            "roll": game.roll,
+            "locked": [color for color, enabled in game.enabled_colors.items()
+                       if not enabled],
+            "players": [{
+                "name": seat.name,
+                "rows": {color: [x for x, marked in row.values.items()
+                                 if marked]
+                         for color, row in sheet.rows.items()},
+                "failed_attempts": sheet.failed_attempts,
+                "score": sheet.calculate_score(),
+            } for seat, sheet in zip(self.seats, game.players)],
+        }
+
+    async def _decide(self, player_number: int,
+                      actions: List[Action]) -> Action:
+        """Get the decision of a seat, or the safe choice."""
+        seat = self.seats[player_number]
+        try:
+            action = await asyncio.wait_for(
+                seat.decide(self.game, player_number, actions),
+                self.timeout)
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            return actions[0]
+        except Exception:
+            logger.exception("The seat %s of table %s failed to decide.",
+                             seat.name, self.name)
+            return actions[0]
+        return action if action in actions else actions[0]
+
+    async def run(self) -> List[int]:
+        """
+        Play the game.
+
+        Returns
+        -------
+        List[int]
+            The final score of each player.
+        """
+        self.game = game = Qwixx(
+            self.n_players, *(seat.name for seat in self.seats),
+            dice_source=self.dice_source)
+        game.reset()
+        await self.broadcast({"type": "start", "table": self.name,
+                              "players": game.player_names})
+
+        while game.to_move is not None:
+            await self.broadcast(self.state())
+            player_number = game.current_player
+            actions = game.legal_actions()
+            game.step(await self._decide(player_number, actions))
+
+            # Ask everyone who can use the white sum at once
+            options = game.passive_options()
+            if not options:
+                continue
+            await self.broadcast(self.state())
+            decisions = await asyncio.gather(*(
+                self._decide(i, actions) for i, actions in options.items()))
+            game.step_passive(dict(zip(options, decisions)))
+
+        scores = [player.calculate_score() for player in game.players]
+        await self.broadcast(self.state())
+        await self.broadcast({"type": "end", "table": self.name,
+                              "scores": scores})
+        return scores
+
+
+class Connection:
+    """
+    A client of the server, speaking JSON lines.
+
+    Attributes
+    ----------
+    reader : asyncio.StreamReader
+        The stream of the requests.
+    writer : asyncio.StreamWriter
+        The stream of the responses.
+    table : Table
+        The table of the client, or None.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.table = None
+        self._pending = None
+        self._lock = asyncio.Lock()
+
+    async def send(self, message: dict) -> None:
+        """
+        Send one message.
+
+        Parameters
+        ----------
+        message : dict
+            The message.
+
+        Returns
+        -------
+        None
+        """
+        if self.writer.is_closing():
+            return
+        async with self._lock:
+            self.writer.write(json.dumps(message).encode() + b"\n")
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+
+    async def ask(self, message: dict):
+        """
+        Send a request for a decision and wait for the answer.
+
+        Parameters
+        ----------
+        message : dict
+            The request.
+
+        Returns
+        -------
+        Any
+            The "action" of the answer.
+
+        Raises
+        ------
+        ConnectionError
+            If the client has disconnected.
+        """
+        if self.writer.is_closing():
+            raise ConnectionError("The client has disconnected.")
+        self._pending = asyncio.get_running_loop().create_future()
+        try:
+            await self.send(message)
+            return await self._pending
+        finally:
+            self._pending = None
+
+    def answer(self, action) -> bool:
+        """
+        Deliver the answer to the pending request.
+
+        Parameters
+        ----------
+        action : Any
+            The "action" of the answer.
+
+        Returns
+        -------
+        bool
+            False if there was no pending request.
+        """
+        if self._pending is None or self._pending.done():
+            return False
+        self._pending.set_result(action)
+        return True
+
+    def disconnect(self) -> None:
+        """
+        Fail the pending request after the client has disconnected.
+
+        Returns
+        -------
+        None
+        """
+        if self._pending is not None and not self._pending.done():
+            self._pending.set_exception(
+                ConnectionError("The client has disconnected."))
+
+
+class Server:
+    """
+    An asyncio server hosting many Qwixx tables at once.
+
+    Clients connect over TCP or a Unix socket and exchange JSON objects, one
+    per line. A client joins a table with
+
+        {"cmd": "join", "table": "t1", "name": "Ann", "players": 3,
+         "bots": ["random"]}
+
+    The first client at a table sets the number of players and the bots
+    that fill seats, and the game starts as soon as the table is full. The
+    server then sends "start", "state", "decide" and "end" messages. A
+    "decide" message lists the legal actions as [white color, white number,
+    colored color, colored number], and the client answers with the index of
+    its choice:
+
+        {"cmd": "act", "action": 0}
+
+    Errors are reported as {"type": "error", "message": ...}.
+
+    Every table runs in its own task, so a table only ever waits for its own
+    players.
+
+    Attributes
+    ----------
+    tables : Dict[str, Table]
+        The tables that are waiting for players or playing, by name.
+    strategies : Dict[str, type]
+        The Player classes that bots can use, mapped by name.
+    timeout : float
+        The time a player has for a decision, in seconds.
+    max_players : int
+        The largest number of players at a table.
+    """
+
+    def __init__(self, strategies: Dict[str, type] = None,
+                 timeout: float = 60.0, max_players: int = 5):
+        """
+        Initialize the server.
+
+        Parameters
+        ----------
+        strategies : Dict[str, type], optional
+            The Player classes that bots can use, mapped by name. Defaults
+            to random players.
+        timeout : float, optional
+            The time a player has for a decision, in seconds. Defaults to
+            60.
+        max_players : int, optional
+            The largest number of players at a table. Defaults to 5.
+        """
+        self.strategies = dict(strategies) if strategies is not None else \
+            {"random": RandomPlayer}
+        self.timeout = timeout
+        self.max_players = max_players
+        self.tables = {}
+
+    async def serve_tcp(self, host: str = "127.0.0.1",
+                        port: int = 8765) -> asyncio.AbstractServer:
+        """
+        Start listening on a TCP port.
+
+        Parameters
+        ----------
+        host : str, optional
+            The address to listen on. Defaults to 127.0.0.1.
+        port : int, optional
+            The port. Defaults to 8765.
+
+        Returns
+        -------
+        asyncio.AbstractServer
+            The listening server.
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        """
+        Start listening on a Unix socket.
+
+        Parameters
+        ----------
+        path : str
+            The path of the socket.
+
+        Returns
+        -------
+        asyncio.AbstractServer
+            The listening server.
+        """
+        return await asyncio.start_unix_server(self.handle, path)
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """
+        Serve one client until it disconnects.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            The stream of the requests.
+        writer : asyncio.StreamWriter
+            The stream of the responses.
+
+        Returns
+        -------
+        None
+        """
+        connection = Connection(reader, writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    await self._dispatch(connection, request)
+                except (ValueError, TypeError, KeyError) as error:
+                    await connection.send({"type": "error",
+                                           "message": str(error)})
+        except ConnectionError:
+            pass
+        finally:
+            connection.disconnect()
+            writer.close()
+            self._leave(connection)
+
+    def _leave(self, connection: Connection) -> None:
+        """Remove a waiting table when its last client has disconnected."""
+        table = connection.table
+        if table is None or table.task is not None or \
+                self.tables.get(table.name) is not table:
+            return
+        if all(seat.connection.writer.is_closing() for seat in table.seats
+               if isinstance(seat, ClientSeat)):
+            del self.tables[table.name]
+
+    async def _dispatch(self, connection: Connection, request: dict) -> None:
+        """Handle one request of a client."""
+        cmd = request["cmd"]
+        if cmd == "act":
+            if not connection.answer(request["action"]):
+                raise ValueError("No decision is pending.")
+        elif cmd == "join":
+            await self.join(connection, request)
+        elif cmd == "tables":
+            await connection.send({
+                "type": "tables",
+                "tables": {name: {"players": table.n_players,
+                                  "seated": len(table.seats),
+                                  "playing": table.game is not None}
+                           for name, table in self.tables.items()}})
+        else:
+            raise ValueError(f"Unknown command: {cmd!r}.")
+
+    async def join(self, connection: Connection, request: dict) -> None:
+        """
+        Seat a client at a table, creating the table if needed.
+
+        Parameters
+        ----------
+        connection : Connection
+            The client.
+        request : dict
+            The join request.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If the table cannot be joined.
+        """
+        if connection.table is not None and \
+                connection.table.name in self.tables:
+            raise ValueError("The client is already seated at a table.")
+
+        name = str(request["table"])
+        table = self.tables.get(name)
+
+        if table is None:
+            n_players = int(request.get("players", 2))
+            bots = list(request.get("bots", []))
+            unknown = set(bots) - set(self.strategies)
+            if unknown:
+                raise ValueError(
+                    f"Unknown bots: {', '.join(sorted(unknown))}.")
+            if not 1 <= n_players <= self.max_players or \
+                    len(bots) >= n_players:
+                raise ValueError("Invalid number of players or bots.")
+
+            table = self.tables[name] = Table(name, n_players, self.timeout)
+            for i, bot in enumerate(bots):
+                table.seats.append(
+                    BotSeat(f"{bot} {i + 1}", self.strategies[bot]()))
+        elif table.is_full:
+            raise ValueError(f"Table {name} is full.")
+
+        seat = ClientSeat(str(request.get("name", "Player")), connection)
+        table.seats.append(seat)
+        connection.table = table
+        await connection.send({"type": "joined", "table": name,
+                               "seat": len(table.seats) - 1})
+
+        if table.is_full:
+            table.task = asyncio.create_task(self._play(table))
+
+    async def _play(self, table: Table) -> None:
+        """Run a table and remove it when the game is over."""
+        try:
+            await table.run()
+        finally:
+            self.tables.pop(table.name, None)
@@ -0,0 +1,348 @@
+from itertools import product
+from typing import Sequence
+
+import numpy as np
+
+from ActionSpace import ActionSpace
+from RollTable import RollTable
+from ScoreRow import ScoreRow
+from ScoreSheet import ScoreSheet
+
+
+class Solver:
+    """
+    Exact expected final scores of solitaire Qwixx under optimal play.
+
+    In the solitaire variant a single player is the active player on every
+    roll, as in `Qwixx(1)`. A state is the score sheet before a roll: per row
+    the position of the last mark, the number of marks and whether the row
+    is closed, plus the failed attempts. Its value is the expected final
+    `ScoreSheet.calculate_score` when every later decision is optimal, found
+    by dynamic programming over the distribution of the dice sums. Values are
+    computed on demand and memoized in `table` under a compact integer key,
+    and the table can be saved to and loaded from disk.
+
+    The solver can be restricted to some of the rows, in which case the
+    other rows are never marked. Every row multiplies the number of states
+    by about 67: a table for one or two rows is solved in seconds, three
+    rows take about an hour, and all four rows have tens of millions of
+    states.
+
+    As in the game, the last number of a row may only be marked once the row
+    has enough marks, which closes the row, and the game ends after
+    `max_failed` failed attempts or when two rows are closed.
+
+    Attributes
+    ----------
+    colors : tuple[str]
+        The rows the player may mark.
+    max_failed : int
+        The number of failed attempts that ends the game.
+    table : dict[int, float]
+        The memoized values of the solved states.
+    """
+
+    N_POSITIONS = 11
+    _ROW_BITS = 9
+
+    def __init__(self, colors: Sequence[str] = ActionSpace.COLORS,
+                 max_failed: int = 4):
+        """
+        Initialize the solver.
+
+        Parameters
+        ----------
+        colors : Sequence[str], optional
+            The rows the player may mark. Defaults to all four rows.
+        max_failed : int, optional
+            The number of failed attempts that ends the game. Defaults to 4.
+        """
+        self.colors = tuple(colors)
+        self.max_failed = max_failed
+        self.table = {}
+        self._outcomes = self._roll_outcomes()
+
+    def _roll_outcomes(self) -> tuple:
+        """
+        Enumerate the distinct outcomes of a roll with their probabilities.
+
+        Returns
+        -------
+        numpy.ndarray, numpy.ndarray, numpy.ndarray
+            The (n,) probabilities, the (n, rows) positions of the white sum
+            in each row and the (n, rows, 2) positions of the lower and
+            higher colored sum of each row.
+        """
+        k = len(self.colors)
+        descending = [color in ("Green", "Blue") for color in self.colors]
+
+        # The table orders the colors like ActionSpace.COLORS
+        table = RollTable.for_colors(self.colors)
+        order = [table.colors.index(color) for color in self.colors]
+        probabilities = np.array([o[0] for o in table.outcomes])
+        white = np.array([o[1] for o in table.outcomes])
+        colored = np.array([o[2] for o in table.outcomes]).reshape(-1, k, 2)
+        colored = colored[:, order]
+        direction = np.where(descending, -1, 1)
+        offset = np.where(descending, 12, -2)
+
+        white_pos = white[:, None] * direction + offset
+        colored_pos = colored * direction[:, None] + offset[:, None]
+        return probabilities, white_pos, colored_pos
+
+    def key(self, lasts: Sequence[int], counts: Sequence[int],
+            closed: Sequence[bool], failed: int) -> int:
+        """
+        Pack a state into its compact key.
+
+        Parameters
+        ----------
+        lasts : Sequence[int]
+            The position of the last mark of each row, -1 if none.
+        counts : Sequence[int]
+            The number of marks of each row.
+        closed : Sequence[bool]
+            Whether each row is closed.
+        failed : int
+            The number of failed attempts.
+
+        Returns
+        -------
+        int
+            The key of the state.
+        """
+        key = failed
+        for last, count, is_closed in zip(lasts, counts, closed):
+            key = (key << self._ROW_BITS) | \
+                (is_closed << 8) | ((last + 1) << 4) | count
+        return key
+
+    def unpack(self, key: int) -> tuple:
+        """
+        Unpack a key into its state.
+
+        Parameters
+        ----------
+        key : int
+            The key of the state.
+
+        Returns
+        -------
+        list, list, list, int
+            The last positions, counts and closed flags of the rows and the
+            number of failed attempts.
+        """
+        lasts, counts, closed = [], [], []
+        for _ in self.colors:
+            row = key & 0x1FF
+            key >>= self._ROW_BITS
+            lasts.append((row >> 4 & 0xF) - 1)
+            counts.append(row & 0xF)
+            closed.append(bool(row >> 8))
+        lasts.reverse()
+        counts.reverse()
+        closed.reverse()
+        return lasts, counts, closed, key
+
+    def sheet_key(self, sheet: ScoreSheet) -> int:
+        """
+        Get the key of the state of a score sheet.
+
+        Parameters
+        ----------
+        sheet : ScoreSheet
+            The score sheet.
+
+        Returns
+        -------
+        int
+            The key of the state.
+        """
+        rows = [sheet.rows[color] for color in self.colors]
+        return self.key([row.last for row in rows],
+                        [row.count for row in rows],
+                        [row.closed for row in rows],
+                        min(sheet.failed_attempts, self.max_failed))
+
+    def score(self, key: int) -> int:
+        """
+        Calculate the score of a state, like `ScoreSheet.calculate_score`.
+
+        Parameters
+        ----------
+        key : int
+            The key of the state.
+
+        Returns
+        -------
+        int
+            The score.
+        """
+        # Only the player can close a row in solitaire, by locking it
+        _, counts, closed, failed = self.unpack(key)
+        return sum(count * (count + 1) // 2 + is_closed
+                   for count, is_closed in zip(counts, closed)) - 5 * failed
+
+    def mark(self, key: int, row: int, position: int) -> int:
+        """
+        Get the key after a mark, or None if the mark is not allowed.
+
+        Parameters
+        ----------
+        key : int
+            The key of the state.
+        row : int
+            The index of the row in `colors`.
+        position : int
+            The position to mark.
+
+        Returns
+        -------
+        int
+            The key of the new state, or None.
+        """
+        shift = self._ROW_BITS * (len(self.colors) - 1 - row)
+        bits = key >> shift & 0x1FF
+        if bits >> 8 or position < (bits >> 4 & 0xF):
+            return None
+
+        # The last number needs enough marks before it, and locks the row
+        closed = position == self.N_POSITIONS - 1
+        if closed and (bits & 0xF) < ScoreRow.LOCK_MARKS:
+            return None
+        count = (bits & 0xF) + 1
+        bits = (closed << 8) | ((position + 1) << 4) | count
+        return key & ~(0x1FF << shift) | bits << shift
+
+    def fail(self, key: int) -> int:
+        """
+        Get the key after a failed attempt.
+
+        Parameters
+        ----------
+        key : int
+            The key of the state.
+
+        Returns
+        -------
+        int
+            The key of the new state.
+        """
+        return key + (1 << (self._ROW_BITS * len(self.colors)))
+
+    def is_over(self, key: int) -> bool:
+        """
+        Check if a state ends the game.
+
+        Parameters
+        ----------
+        key : int
+            The key of the state.
+
+        Returns
+        -------
+        bool
+            True if the game is over.
+        """
+        if key >> (self._ROW_BITS * len(self.colors)) >= self.max_failed:
+            return True
+        _, _, closed, _ = self.unpack(key)
+        return sum(closed) >= 2
+
+    def value(self, key: int) -> float:
+        """
+        Get the expected final score of a state under optimal play.
+
+        Parameters
+        ----------
+        key : int
+            The key of the state.
+
+        Returns
+        -------
+        float
+            The expected final score.
+        """
+        value = self.table.get(key)
+        if value is None:
+            if self.is_over(key):
+                value = float(self.score(key))
+            else:
+                value = self._solve(key)
+            self.table[key] = value
+        return value
+
+    def _solve(self, key: int) -> float:
+        """Average the best action value over all roll outcomes."""
+        k = len(self.colors)
+        n = self.N_POSITIONS
+        probabilities, white_pos, colored_pos = self._outcomes
+
+        # The values after one mark, and after a white mark followed by a
+        # colored mark; -inf where the marks are not allowed
+        single = np.full((k, n), -np.inf)
+        double = np.full((k, n, k, n), -np.inf)
+        for row, position in product(range(k), range(n)):
+            first = self.mark(key, row, position)
+            if first is None:
+                continue
+            single[row, position] = self.value(first)
+            for row2, position2 in product(range(k), range(n)):
+                second = self.mark(first, row2, position2)
+                if second is not None:
+                    double[row, position, row2, position2] = \
+                        self.value(second)
+
+        rows = np.arange(k)
+        best = np.full(len(probabilities), self.value(self.fail(key)))
+        best = np.maximum(best, single[rows, white_pos].max(axis=1))
+        best = np.maximum(
+            best, single[rows[:, None], colored_pos].max(axis=(1, 2)))
+        both = double[rows[:, None, None], white_pos[:, :, None, None],
+                      rows[None, :, None], colored_pos[:, None, :, :]]
+        best = np.maximum(best, both.max(axis=(1, 2, 3)))
+
+        return float(probabilities @ best)
+
+    def save(self, path: str) -> None:
+        """
+        Save the memoized values to a NumPy .npz file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+
+        Returns
+        -------
+        None
+        """
+        keys = np.fromiter(self.table.keys(), dtype=np.int64,
+                           count=len(self.table))
+        values = np.fromiter(self.table.values(), dtype=np.float64,
+                             count=len(self.table))
+        np.savez_compressed(path, keys=keys, values=values,
+                            colors=np.array(self.colors),
+                            max_failed=self.max_failed)
+
+    @classmethod
+    def load(cls, path: str) -> "Solver":
+        """
+        Load a solver with the values saved by `save`.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+
+        Returns
+        -------
+        Solver
+            The solver.
+        """
+        with np.load(path) as data:
+            solver = cls([str(color) for color in data["colors"]],
+                         int(data["max_failed"]))
+            solver.table = dict(zip(data["keys"].tolist(),
+                                    data["values"].tolist()))
+        return solver
@@ -0,0 +1,70 @@
+from typing import List
+
+from Action import Action
+from Player import Player
+from Solver import Solver
+
+
+class SolverPlayer(Player):
+    """
+    A player that picks the action with the best value in a solver table.
+
+    Each legal action is applied to the player's own score sheet and the
+    resulting states are compared with `Solver.value`. Marks in rows the
+    solver does not cover are never chosen, and the other players are
+    ignored.
+
+    Attributes
+    ----------
+    solver : Solver
+        The solver that values the states.
+    """
+
+    def __init__(self, solver: Solver = None, seed: int = None):
+        """
+        Initialize the player.
+
+        Parameters
+        ----------
+        solver : Solver, optional
+            The solver that values the states. Defaults to a solver for the
+            red and green rows.
+        seed : int, optional
+            Unused; accepted so the player can enter a `Tournament`.
+        """
+        self.solver = solver if solver is not None else \
+            Solver(["Red", "Green"])
+
+    def choose_action(self, game, player_number: int,
+                      actions: List[Action]) -> Action:
+        game.rules.require_standard("SolverPlayer")
+        solver = self.solver
+        sheet = game.players[player_number]
+        key = solver.sheet_key(sheet)
+        rows = {color: i for i, color in enumerate(solver.colors)}
+        active = player_number == game.current_player
+
+        best, best_value = actions[0], None
+        for action in actions:
+            after = key
+            for color, number in ((action.white_color, action.white_number),
+                                  (action.colored_color,
+                                   action.colored_number)):
+                if color is None:
+                    continue
+                if color not in rows:
+                    after = None
+                    break
+                after = solver.mark(after, rows[color],
+                                    sheet.rows[color].position(number))
+
+            if after is None:
+                continue
+            if active and action.choice == 4:
+                after = solver.fail(after)
+
+            value = solver.value(after)
+            if best_value is None or value > best_value:
+                best, best_value = action, value
+
+        return best
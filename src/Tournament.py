@@ -0,0 +1,274 @@
+import math
+import random
+from multiprocessing import Pool
+from typing import Callable, Dict, List, Sequence
+
+from DiceSource import BufferedDice
+from Qwixx import Qwixx
+
+
+class Tournament:
+    """
+    Rank player policies by playing many headless games in parallel.
+
+    Every game draws its number of players from `player_counts` and fills
+    each seat with a random strategy; `Qwixx.play` picks the start player.
+    The games are split into chunks that run on a process pool. Each chunk
+    seeds its own random number generators from the tournament seed and the
+    chunk number, so results do not depend on the number of processes, and
+    only sends back its aggregated statistics.
+
+    The statistics of a strategy are a dict with the number of seats played
+    ("games"), the number of wins ("wins", shared on ties), the sum and sum
+    of squares of the scores ("score_sum", "score_sq_sum") and a histogram
+    of the scores ("scores").
+
+    Attributes
+    ----------
+    strategies : Dict[str, type]
+        The Player classes in the tournament, mapped by name. They are
+        constructed with a `seed` keyword argument.
+    player_counts : Sequence[int]
+        The numbers of players a game can have.
+    seed : int
+        The seed of the tournament.
+    chunk_size : int
+        The number of games played per task.
+    """
+
+    def __init__(self, strategies: Dict[str, type],
+                 player_counts: Sequence[int] = (2, 3, 4, 5), seed: int = 0,
+                 chunk_size: int = 1000):
+        """
+        Initialize the tournament.
+
+        Parameters
+        ----------
+        strategies : Dict[str, type]
+            The Player classes in the tournament, mapped by name.
+        player_counts : Sequence[int], optional
+            The numbers of players a game can have. Defaults to 2 to 5.
+        seed : int, optional
+            The seed of the tournament. Defaults to 0.
+        chunk_size : int, optional
+            The number of games played per task. Defaults to 1000.
+
+        Raises
+        ------
+        ValueError
+            If no strategies or player counts are given.
+        """
+        if not strategies or not player_counts:
+            raise ValueError(
+                "A tournament needs at least one strategy and player count.")
+
+        self.strategies = dict(strategies)
+        self.player_counts = tuple(player_counts)
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+    def run(self, n_games: int, processes: int = None,
+            progress: Callable = None) -> Dict[str, dict]:
+        """
+        Play the tournament.
+
+        Parameters
+        ----------
+        n_games : int
+            The number of games to play.
+        processes : int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+            With 1, the games are played in this process.
+        progress : Callable, optional
+            Called with the number of finished games and the statistics so
+            far after every chunk.
+
+        Returns
+        -------
+        Dict[str, dict]
+            The statistics of each strategy.
+        """
+        tasks = []
+        for chunk, start in enumerate(range(0, n_games, self.chunk_size)):
+            tasks.append((self.strategies, self.player_counts,
+                          self.seed * 1_000_003 + chunk,
+                          min(self.chunk_size, n_games - start)))
+
+        results = {name: self.empty_stats() for name in self.strategies}
+
+        if processes == 1:
+            parts = map(self.play_chunk, tasks)
+            self._collect(parts, results, progress)
+        else:
+            with Pool(processes) as pool:
+                parts = pool.imap_unordered(self.play_chunk, tasks)
+                self._collect(parts, results, progress)
+
+        return results
+
+    def _collect(self, parts, results: Dict[str, dict],
+                 progress: Callable) -> None:
+        """Merge the statistics of the chunks as they come in."""
+        done = 0
+        for n_played, part in parts:
+            for name, stats in part.items():
+                self.merge(results[name], stats)
+            done += n_played
+            if progress is not None:
+                progress(done, results)
+
+    @staticmethod
+    def empty_stats() -> dict:
+        """
+        Create the statistics of a strategy that has not played yet.
+
+        Returns
+        -------
+        dict
+            The empty statistics.
+        """
+        return {"games": 0, "wins": 0.0, "score_sum": 0, "score_sq_sum": 0,
+                "scores": {}}
+
+    @staticmethod
+    def merge(total: dict, part: dict) -> None:
+        """
+        Add the statistics of a chunk to the totals of a strategy.
+
+        Parameters
+        ----------
+        total : dict
+            The statistics to add to.
+        part : dict
+            The statistics of the chunk.
+
+        Returns
+        -------
+        None
+        """
+        for key in ("games", "wins", "score_sum", "score_sq_sum"):
+            total[key] += part[key]
+        scores = total["scores"]
+        for score, count in part["scores"].items():
+            scores[score] = scores.get(score, 0) + count
+
+    @staticmethod
+    def play_chunk(task: tuple) -> tuple:
+        """
+        Play one chunk of games.
+
+        Parameters
+        ----------
+        task : tuple
+            The strategies, the player counts, the seed of the chunk and the
+            number of games.
+
+        Returns
+        -------
+        int, Dict[str, dict]
+            The number of games played and the statistics of each strategy.
+        """
+        strategies, player_counts, seed, n_games = task
+        rng = random.Random(seed)
+        dice = BufferedDice(rng.getrandbits(64))
+
+        names = sorted(strategies)
+        policies = {name: strategies[name](seed=rng.getrandbits(64))
+                    for name in names}
+        results = {name: Tournament.empty_stats() for name in names}
+
+        for _ in range(n_games):
+            n_players = rng.choice(player_counts)
+            seats = [rng.choice(names) for _ in range(n_players)]
+            game = Qwixx(n_players,
+                         policies=[policies[name] for name in seats],
+                         dice_source=dice)
+            scores = game.play()
+
+            best = max(scores)
+            winners = scores.count(best)
+            for name, score in zip(seats, scores):
+                stats = results[name]
+                stats["games"] += 1
+                stats["score_sum"] += score
+                stats["score_sq_sum"] += score * score
+                stats["scores"][score] = stats["scores"].get(score, 0) + 1
+                if score == best:
+                    stats["wins"] += 1 / winners
+
+        return n_games, results
+
+    @staticmethod
+    def summary(results: Dict[str, dict], z: float = 1.96) -> List[dict]:
+        """
+        Summarize the statistics of the strategies, best win rate first.
+
+        Parameters
+        ----------
+        results : Dict[str, dict]
+            The statistics of each strategy, as returned by `run`.
+        z : float, optional
+            The z-value of the confidence intervals. Defaults to 1.96 (95%).
+
+        Returns
+        -------
+        List[dict]
+            Per strategy the name, the number of seats played, the win rate
+            and mean score with the half-widths of their confidence
+            intervals, and the 10th, 50th and 90th percentile of the scores.
+        """
+        rows = []
+        for name, stats in results.items():
+            n = stats["games"]
+            row = {"name": name, "games": n}
+
+            if n:
+                win_rate = stats["wins"] / n
+                mean = stats["score_sum"] / n
+                variance = max(stats["score_sq_sum"] / n - mean * mean, 0)
+                row.update({
+                    "win_rate": win_rate,
+                    "win_rate_ci": z * math.sqrt(
+                        win_rate * (1 - win_rate) / n),
+                    "mean_score": mean,
+                    "mean_score_ci": z * math.sqrt(variance / n),
+                })
+                row.update(Tournament.percentiles(stats["scores"],
+                                                  (10, 50, 90)))
+            rows.append(row)
+
+        rows.sort(key=lambda row: row.get("win_rate", 0), reverse=True)
+        return rows
+
+    @staticmethod
+    def percentiles(histogram: Dict[int, int],
+                    percents: Sequence[int]) -> dict:
+        """
+        Read percentiles from a histogram of scores.
+
+        Parameters
+        ----------
+        histogram : Dict[int, int]
+            The number of times each score occurred.
+        percents : Sequence[int]
+            The percentiles to read.
+
+        Returns
+        -------
+        dict
+            The score at each percentile, mapped by "p<percent>".
+        """
+        total = sum(histogram.values())
+        values = sorted(histogram.items())
+        result = {}
+
+        for percent in percents:
+            target = percent / 100 * total
+            seen = 0
+            for score, count in values:
+                seen += count
+                if seen >= target:
+                    result[f"p{percent}"] = score
+                    break
+
+        return result
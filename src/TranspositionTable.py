@@ -0,0 +1,167 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class TranspositionTable:
+    """
+    A bounded cache of search results by position, with LRU eviction.
+
+    Search and rollout policies store what they computed for a position,
+    keyed by `Qwixx.position_key` or `ScoreSheet.zobrist`, and find it again
+    when the same position comes up through another order of moves, in
+    another decision or in another game. When the table is full, the entry
+    that was used least recently is dropped. A table can be shared by
+    several policies and threads.
+
+    Attributes
+    ----------
+    max_size : int
+        The largest number of entries.
+    hits : int
+        The number of lookups that found an entry.
+    misses : int
+        The number of lookups that did not find an entry.
+    evictions : int
+        The number of entries dropped to make room.
+    """
+
+    def __init__(self, max_size: int = 1 << 20):
+        """
+        Initialize an empty table.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            The largest number of entries. Defaults to 2 ** 20.
+
+        Raises
+        ------
+        ValueError
+            If the size is not positive.
+        """
+        if max_size < 1:
+            raise ValueError("The table must hold at least one entry.")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The fraction of lookups that found an entry.
+
+        Returns
+        -------
+        float
+            The hit rate, 0 before the first lookup.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: Hashable, default=None):
+        """
+        Look up the entry of a position.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the position.
+        default : optional
+            Returned if there is no entry. Defaults to None.
+
+        Returns
+        -------
+        object
+            The stored value, or the default.
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value) -> None:
+        """
+        Store the entry of a position, replacing any earlier entry.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the position.
+        value : object
+            The value to store.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def lookup(self, key: Hashable, compute: Callable):
+        """
+        Get the entry of a position, computing and storing it if missing.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the position.
+        compute : Callable
+            Called without arguments to compute a missing value. It runs
+            outside the lock, so it may use the table itself.
+
+        Returns
+        -------
+        object
+            The value.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset the statistics.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Summarize the use of the table.
+
+        Returns
+        -------
+        dict
+            The number of entries, hits, misses and evictions and the hit
+            rate.
+        """
+        return {"size": len(self._entries), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hit_rate}
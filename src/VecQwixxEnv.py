@@ -0,0 +1,203 @@
+import numpy as np
+
+from ActionSpace import ActionSpace
+from BatchQwixx import BatchQwixx
+from QwixxEnv import QwixxEnv
+
+
+class VecQwixxEnv:
+    """
+    Many self-play Qwixx environments stepped at once on a `BatchQwixx`.
+
+    The agent plays every seat of every game. Each turn takes one decision
+    per player: first the active player, then the other players in seating
+    order on the white dice. A call to `step` takes one `ActionSpace` index
+    per environment for its deciding player, and the observations and
+    action masks use the same encoding as `QwixxEnv`, seen from the player
+    that decides next. The reward is the change in the score of the player
+    that acted. Finished games are reported through `terminated` and
+    `info["final_scores"]` and are started again right away.
+
+    Attributes
+    ----------
+    n_envs : int
+        The number of environments.
+    n_players : int
+        The number of players in each game.
+    batch : BatchQwixx
+        The games that are played.
+    phase : numpy.ndarray
+        (n_envs,) index of the decision within the turn: 0 for the active
+        player and k for the k-th of the other players.
+    observation_size : int
+        The length of the observation vectors.
+    n_actions : int
+        The number of action indices.
+    """
+
+    def __init__(self, n_envs: int, n_players: int = 2, seed: int = None):
+        """
+        Initialize the environments.
+
+        Parameters
+        ----------
+        n_envs : int
+            The number of environments.
+        n_players : int, optional
+            The number of players in each game. Defaults to 2.
+        seed : int, optional
+            The seed of the random number generator of the batch.
+        """
+        self.n_envs = n_envs
+        self.n_players = n_players
+        self.batch = BatchQwixx(n_envs, n_players, seed)
+        self.phase = np.zeros(n_envs, dtype=np.int8)
+        self.observation_size = QwixxEnv.get_observation_size(n_players)
+        self.n_actions = ActionSpace.N_ACTIONS
+        self._envs = np.arange(n_envs)
+        self._scores = np.zeros((n_envs, n_players), dtype=np.int32)
+
+    def reset(self) -> tuple:
+        """
+        Start all games.
+
+        Returns
+        -------
+        numpy.ndarray, dict
+            The (n_envs, observation_size) observations and an info dict
+            with the action masks and the deciding players.
+        """
+        self.batch.reset()
+        self.batch.begin_turn(self._envs)
+        self.phase[:] = 0
+        self._scores[:] = 0
+        return self._observe()
+
+    def deciding_players(self) -> np.ndarray:
+        """
+        Get the player that decides next in every game.
+
+        Returns
+        -------
+        numpy.ndarray
+            (n_envs,) player numbers.
+        """
+        current = self.batch.current
+        passive = self.phase.astype(np.int64) - 1
+        return np.where(self.phase == 0, current,
+                        passive + (passive >= current))
+
+    def step(self, actions: np.ndarray) -> tuple:
+        """
+        Apply one legal action in every environment.
+
+        Parameters
+        ----------
+        actions : numpy.ndarray
+            (n_envs,) `ActionSpace` indices.
+
+        Returns
+        -------
+        numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, dict
+            The observations, the (n_envs,) rewards, the terminated and
+            truncated flags, and an info dict with the action masks, the
+            deciding players and the (n_envs, n_players) final scores of the
+            terminated games.
+        """
+        batch = self.batch
+        actions = np.asarray(actions)
+        envs = self._envs
+        players = self.deciding_players()
+        active = self.phase == 0
+
+        batch.apply_active(envs[active], actions[active])
+        batch.apply_passive(envs[~active], players[~active],
+                            actions[~active])
+
+        terminated = np.zeros(self.n_envs, dtype=bool)
+        games = envs[active]
+        terminated[games[batch.is_game_over(games)]] = True
+
+        # Finish the turn once every player has decided
+        self.phase += 1
+        games = envs[(self.phase == self.n_players) & ~terminated]
+        terminated[games[batch.end_turn(games)]] = True
+        games = games[~batch.done[games]]
+        batch.begin_turn(games)
+        self.phase[games] = 0
+
+        scores = batch.calculate_scores()
+        rewards = (scores[envs, players] -
+                   self._scores[envs, players]).astype(np.float32)
+        self._scores = scores
+
+        final_scores = np.where(terminated[:, None], scores, 0)
+
+        # Start the finished games again
+        games = envs[terminated]
+        batch.reset_games(games)
+        batch.begin_turn(games)
+        self.phase[games] = 0
+        self._scores[games] = 0
+
+        obs, info = self._observe()
+        info["final_scores"] = final_scores
+        return obs, rewards, terminated, \
+            np.zeros(self.n_envs, dtype=bool), info
+
+    def _observe(self) -> tuple:
+        """Encode the observations and action masks of the next decision."""
+        batch = self.batch
+        envs = self._envs
+        players = self.deciding_players()
+        active = self.phase == 0
+
+        mask = np.zeros((self.n_envs, self.n_actions), dtype=bool)
+        mask[active] = batch.legal_mask(envs[active], players[active], True)
+        mask[~active] = batch.legal_mask(envs[~active], players[~active],
+                                         False)
+
+        return self.encode(batch, players), \
+            {"action_mask": mask, "players": players}
+
+    @staticmethod
+    def encode(batch: BatchQwixx, players: np.ndarray) -> np.ndarray:
+        """
+        Encode every game as seen from one of its players, like
+        `QwixxEnv.encode`.
+
+        Parameters
+        ----------
+        batch : BatchQwixx
+            The games.
+        players : numpy.ndarray
+            (n_games,) number of the player in each game.
+
+        Returns
+        -------
+        numpy.ndarray
+            (n_games, observation_size) observations.
+        """
+        n, n_players = batch.n_games, batch.n_players
+        games = np.arange(n)[:, None]
+        seats = (players[:, None] + np.arange(n_players)) % n_players
+
+        bits = (batch.marks[games, seats][..., None] >>
+                np.arange(11, dtype=np.uint16)) & 1
+        sheets = np.concatenate([
+            bits.reshape(n, n_players, 44),
+            batch.closed[games, seats],
+            batch.failed[games, seats][..., None],
+        ], axis=2)
+
+        dice = batch.dice.astype(np.int32)
+        colored = np.sort(dice[:, :4, None] + dice[:, None, 4:], axis=2)
+        colored = colored * batch.enabled[:, :, None]
+
+        return np.concatenate([
+            sheets.reshape(n, -1),
+            ~batch.enabled,
+            (dice[:, 4] + dice[:, 5])[:, None],
+            colored.reshape(n, 8),
+            (batch.current == players)[:, None],
+        ], axis=1).astype(np.float32)
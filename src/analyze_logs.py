@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import time
+
+from Analytics import Analytics
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Summarize the games of Qwixx game logs: scores, game "
+        "lengths, locks, failed attempts and decisions without options.")
+    parser.add_argument("logs", nargs="+", help="the paths of the game logs")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="the number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="the number of games per task")
+    parser.add_argument("--save",
+                        help="save the histograms to this .npz file")
+    parser.add_argument("--json", help="save the tables to this JSON file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    analytics = Analytics.run(args.logs, args.processes, args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(analytics.report())
+    print(f"\nAnalyzed in {elapsed:.1f}s "
+          f"({analytics.games / max(elapsed, 1e-9):.0f} games/s)")
+    if args.save:
+        analytics.save(args.save)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(analytics.tables(), file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
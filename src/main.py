@@ -1,7 +1,52 @@
 #!/usr/bin/env python3
 
+from ConsolePlayer import ConsolePlayer
 from Qwixx import Qwixx
 
+
+def print_results(game: Qwixx, scores: list) -> None:
+    """
+    Print the final score sheets, the scores and the winner.
+
+    Parameters
+    ----------
+    game : Qwixx
+        The finished game.
+    scores : list
+        The final score of each player.
+
+    Returns
+    -------
+    None
+    """
+
+    print()
+    print("==========================")
+    print("Game over!\n")
+    print("Final score sheets:")
+
+    # Print the final score sheet
+    for player in game.players:
+        print(player)
+        print()
+
+    # Sort the scores in descending order
+    sorted_scores = sorted(
+        zip((player.name for player in game.players), scores),
+        key=lambda x: x[1], reverse=True)
+
+    print()
+    # Print the scores
+    print("Scores:")
+    for name, score in sorted_scores:
+        print(f"{name}: {score}")
+
+    print()
+
+    # Print the winner
+    print(f"Winner: {sorted_scores[0][0]}!")
+
+
 if __name__ == "__main__":
-    Q = Qwixx(4)
-    Q.play()
+    Q = Qwixx(4, policies=[ConsolePlayer() for _ in range(4)])
+    print_results(Q, Q.play())
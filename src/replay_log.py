@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+
+from Replay import Replay
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay the games of a Qwixx game log and check that "
+        "the current rules give the same games and scores.")
+    parser.add_argument("log", help="the path of the game log")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="the number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="the number of games per task")
+    parser.add_argument("--no-options", action="store_true",
+                        help="do not compare the legal actions")
+    parser.add_argument("--show", type=int, default=10,
+                        help="the number of differences to print")
+    args = parser.parse_args()
+
+    replay = Replay(check_options=not args.no_options)
+    start = time.perf_counter()
+    results = replay.run(args.log, args.processes, args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    games = results["games"]
+    differences = results["differences"]
+    print(f"{games} games replayed in {elapsed:.1f}s "
+          f"({games / max(elapsed, 1e-9):.0f} games/s)")
+    print(f"{len(differences)} games differ from the log")
+    for number, difference in differences[:args.show]:
+        print(f"  game {number}: {difference}")
+
+
+if __name__ == "__main__":
+    main()
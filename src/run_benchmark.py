@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+
+from Benchmark import Benchmark
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the hot paths of the Qwixx engine.")
+    parser.add_argument("cases", nargs="*", metavar="case",
+                        help="the cases to run (default: all)")
+    parser.add_argument("-p", "--players", default="2,3,4,5",
+                        help="comma-separated numbers of players")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="the number of timed runs per case")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="the seed of the inputs")
+    parser.add_argument("--baseline",
+                        help="compare with the results in this file")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="the slowdown that counts as a regression")
+    parser.add_argument("--save",
+                        help="save the results to this file")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    parser.add_argument("--list", action="store_true",
+                        help="list the cases and exit")
+    args = parser.parse_args()
+
+    benchmark = Benchmark(
+        player_counts=[int(n) for n in args.players.split(",")],
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+
+    if args.list:
+        print("\n".join(benchmark.cases()))
+        return
+
+    unknown = set(args.cases) - set(benchmark.cases())
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    def progress(name, result):
+        if not args.json:
+            print(f"{name:<28}{result['ops_per_sec']:>14,.0f} ops/s"
+                  f"{result['usec_per_op']:>12.2f} us/op")
+
+    results = benchmark.run(args.cases or None, progress)
+    if args.save:
+        Benchmark.save(results, args.save)
+
+    rows = []
+    if args.baseline:
+        rows = Benchmark.compare(results, Benchmark.load(args.baseline),
+                                 args.tolerance)
+
+    if args.json:
+        print(json.dumps({"results": results, "comparison": rows},
+                         indent=2))
+    elif rows:
+        print(f"\n{'Case':<28}{'Baseline':>14}{'Now':>14}{'Speedup':>9}")
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<28}{row['baseline']:>14,.0f}"
+                  f"{row['ops_per_sec']:>14,.0f}{row['speedup']:>8.2f}x"
+                  f"{flag}")
+
+    # A regression fails the run, so it can gate a deployment
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+import argparse
+
+from SelfPlay import SelfPlay
+from run_tournament import STRATEGIES
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate training data from self-play Qwixx games. "
+        "Run it again on the same directory to resume.")
+    parser.add_argument("directory", help="the directory of the shards")
+    parser.add_argument("-n", "--shards", type=int, default=16,
+                        help="the total number of shards")
+    parser.add_argument("-p", "--players", type=int, default=2,
+                        help="the number of players per game")
+    parser.add_argument("--shard-size", type=int, default=65536,
+                        help="the number of samples per shard")
+    parser.add_argument("--policy", default="random",
+                        choices=sorted(STRATEGIES),
+                        help="the strategy of all seats")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="the number of worker processes")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="the seed of the games")
+    args = parser.parse_args()
+
+    try:
+        pipeline = SelfPlay(args.directory, args.players, args.shard_size,
+                            STRATEGIES[args.policy], args.seed)
+    except ValueError as error:
+        parser.error(str(error))
+
+    def progress(shards, stats):
+        print(f"{shards} shards, {stats['samples']} samples "
+              f"({stats['samples_per_second']:.0f} samples/s)")
+
+    stats = pipeline.run(args.shards, args.processes, progress)
+    print(f"{stats['shards']} shards written, {stats['skipped']} already "
+          f"done; {stats['samples']} samples from {stats['games']} games "
+          f"in {stats['seconds']:.1f}s "
+          f"({stats['samples_per_second']:.0f} samples/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+
+from Server import Server
+from run_tournament import STRATEGIES
+
+
+async def serve(args):
+    server = Server(STRATEGIES, timeout=args.timeout)
+    if args.unix:
+        listener = await server.serve_unix(args.unix)
+        print(f"Serving Qwixx on {args.unix}")
+    else:
+        listener = await server.serve_tcp(args.host, args.port)
+        print(f"Serving Qwixx on {args.host}:{args.port}")
+
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Host Qwixx tables for clients speaking JSON lines.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="the address to listen on")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="the TCP port to listen on")
+    parser.add_argument("--unix", metavar="PATH",
+                        help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="the seconds a player has for a decision")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
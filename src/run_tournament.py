@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import time
+
+from HeuristicPlayer import (CautiousPlayer, GreedyPlayer, LockRacingPlayer,
+                             SkipGapPlayer)
+from Player import RandomPlayer
+from Tournament import Tournament
+
+# The strategies that can enter a tournament, mapped by name
+STRATEGIES = {
+    "random": RandomPlayer,
+    "greedy": GreedyPlayer,
+    "skip-gap": SkipGapPlayer,
+    "lock-racing": LockRacingPlayer,
+    "cautious": CautiousPlayer,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rank Qwixx strategies by playing headless games.")
+    parser.add_argument("strategies", nargs="*", metavar="strategy",
+                        help="the strategies to enter, out of "
+                        f"{', '.join(sorted(STRATEGIES))} (default: all)")
+    parser.add_argument("-n", "--games", type=int, default=10000,
+                        help="the number of games to play")
+    parser.add_argument("-p", "--players", default="2,3,4,5",
+                        help="comma-separated numbers of players per game")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="the number of worker processes")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="the seed of the tournament")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="the number of games per task")
+    parser.add_argument("--json", action="store_true",
+                        help="print the summary as JSON")
+    args = parser.parse_args()
+
+    unknown = set(args.strategies) - set(STRATEGIES)
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(sorted(unknown))}")
+    names = args.strategies or sorted(STRATEGIES)
+
+    tournament = Tournament(
+        {name: STRATEGIES[name] for name in names},
+        player_counts=[int(n) for n in args.players.split(",")],
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+    )
+
+    start = time.perf_counter()
+    results = tournament.run(args.games, args.processes)
+    elapsed = time.perf_counter() - start
+    rows = Tournament.summary(results)
+
+    if args.json:
+        print(json.dumps({"games": args.games, "seconds": elapsed,
+                          "strategies": rows}, indent=2))
+        return
+
+    print(f"{args.games} games in {elapsed:.1f}s "
+          f"({args.games / elapsed:.0f} games/s)\n")
+    print(f"{'Strategy':<12}{'Seats':>9}{'Win rate':>17}{'Mean score':>18}"
+          f"{'p10':>6}{'p50':>6}{'p90':>6}")
+    for row in rows:
+        if not row["games"]:
+            continue
+        print(f"{row['name']:<12}{row['games']:>9}"
+              f"{row['win_rate']:>10.3f} ±{row['win_rate_ci']:.3f}"
+              f"{row['mean_score']:>11.2f} ±{row['mean_score_ci']:.2f}"
+              f"{row['p10']:>6}{row['p50']:>6}{row['p90']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules of the game live in src and import each other by name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from Analytics import Analytics  # noqa: E402
+from DiceSource import BufferedDice  # noqa: E402
+from GameLog import GameLog, GameLogReader, GameLogWriter  # noqa: E402
+from Player import Player  # noqa: E402
+from Qwixx import Qwixx  # noqa: E402
+
+
+class PassingPlayer(Player):
+    """Never mark anything, so every game ends on failed attempts."""
+
+    def choose_action(self, game, player_number, actions):
+        return actions[0]
+
+
+def test_no_passive_options_after_the_last_failed_attempt(tmp_path):
+    path = str(tmp_path / "games.qlog")
+    turns = 0
+    with GameLogWriter(path) as log:
+        for seed in range(5):
+            game = Qwixx(3, policies=[PassingPlayer()] * 3,
+                         dice_source=BufferedDice(seed), recorder=log)
+            game.play()
+            assert max(p.failed_attempts for p in game.players) == 4
+            turns += game.turns
+
+    analytics = Analytics()
+    with GameLogReader(path) as log:
+        analytics.add_records(log.raw())
+        passive = 0
+        for event in log:
+            if event.kind == GameLog.ROLL:
+                active = event.player
+            elif event.kind == GameLog.ACTION:
+                passive += event.player != active
+
+    # The other players decide on every roll but the last of each game
+    opportunities = (turns - 5) * 2
+    assert analytics.options["passive"] == opportunities
+    assert analytics.options["passive_none"] == opportunities - passive
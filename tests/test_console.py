@@ -0,0 +1,16 @@
+from Action import Action
+from ConsolePlayer import ConsolePlayer
+from Qwixx import Qwixx
+
+
+def test_same_row_lock_can_be_entered(monkeypatch):
+    game = Qwixx(1)
+    game.reset()
+    for value in (2, 3, 4, 5):
+        game.players[0].mark_row("Red", value)
+    game.roll = {"White": [6], "Red": [6, 12]}
+
+    answers = iter(["3", "Red 6", "Red 12"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    action = ConsolePlayer().choose_action(game, 0, game.legal_actions())
+    assert action == Action("Red", 6, "Red", 12)
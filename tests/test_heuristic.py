@@ -0,0 +1,41 @@
+from DiceSource import BufferedDice
+from HeuristicPlayer import CautiousPlayer, HeuristicPlayer
+from Qwixx import Qwixx
+
+
+class KeyCheckingPlayer(CautiousPlayer):
+    """A cautious player that checks the keys of the states it values."""
+
+    def __init__(self):
+        super().__init__()
+        self.locks = 0
+
+    def sheet_evaluator(self, game, player_number):
+        evaluate = super().sheet_evaluator(game, player_number)
+        expected = iter(game.legal_actions() if game.to_move == player_number
+                        else game.deciding(player_number).legal_actions())
+        sheet = game.players[player_number]
+
+        def check(key):
+            assert key == self.key(sheet, next(expected))
+            return evaluate(key)
+        return check
+
+    def key(self, sheet, action):
+        after = sheet.copy()
+        if action.white_color is not None:
+            after.mark_row(action.white_color, action.white_number)
+        if action.colored_color is not None:
+            after.mark_row(action.colored_color, action.colored_number)
+        self.locks += sum(row.closed and not sheet.rows[color].closed
+                          for color, row in after.rows.items())
+        return sum(row.state << shift for row, shift
+                   in zip(after.rows.values(), HeuristicPlayer._SHIFTS))
+
+
+def test_keys_are_the_states_after_each_action():
+    policy = KeyCheckingPlayer()
+    for seed in range(20):
+        Qwixx(3, policies=[policy] * 3,
+              dice_source=BufferedDice(seed)).play()
+    assert policy.locks
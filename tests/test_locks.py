@@ -0,0 +1,113 @@
+import pytest
+
+from Action import Action
+from DiceSource import BufferedDice
+from GameLog import Recorder
+from Player import RandomPlayer
+from Qwixx import Qwixx
+from ScoreRow import ScoreRow
+
+
+class TurnRecorder(Recorder):
+    """Remember the state of the game at the start of every turn."""
+
+    def __init__(self):
+        self.turns = []
+
+    def roll(self, game):
+        self.turns.append((
+            [color for color, on in game.enabled_colors.items() if not on],
+            [player.failed_attempts for player in game.players],
+            list(game.faces)))
+
+
+def play(n_players, seed):
+    recorder = TurnRecorder()
+    policy = RandomPlayer(seed)
+    game = Qwixx(n_players, policies=[policy] * n_players,
+                 dice_source=BufferedDice(seed), recorder=recorder)
+    game.play()
+    return game, recorder.turns
+
+
+def test_last_number_needs_enough_marks():
+    row = ScoreRow("Red")
+    assert not row.fill_in_number(12)
+    assert row.count == 0 and not row.closed
+
+    for value in (2, 3, 4, 5):
+        assert row.fill_in_number(value)
+    assert not row.is_allowed(12)
+    assert row.is_allowed(12, after=6)
+    assert row.fill_in_number(6)
+    assert row.fill_in_number(12)
+    assert row.closed
+    assert row.calculate_score() == 6 * 7 // 2 + 1
+
+
+def test_white_mark_counts_towards_the_last_number():
+    game = Qwixx(1)
+    game.reset()
+    for value in (2, 3, 4, 5):
+        game.players[0].mark_row("Red", value)
+    game.roll = {"White": [6], "Red": [6, 12]}
+
+    actions = game.legal_actions()
+    assert Action(None, None, "Red", 12) not in actions
+    assert Action("Red", 6, "Red", 12) in actions
+    with pytest.raises(ValueError):
+        game.check_action(0, Action(None, None, "Red", 12))
+
+    game.step(Action("Red", 6, "Red", 12))
+    assert not game.enabled_colors["Red"]
+
+
+@pytest.mark.parametrize("n_players", [1, 2, 4])
+def test_games_end_on_time(n_players):
+    for seed in range(30):
+        game, turns = play(n_players, seed)
+        locked, failed, _ = turns[-1]
+
+        # Nothing ended the game before its last turn
+        assert len(locked) < 2 and max(failed) < 4
+        assert len(game.players[0].rows) - sum(
+            game.enabled_colors.values()) >= 2 or \
+            max(player.failed_attempts for player in game.players) >= 4
+        assert game.turns == len(turns)
+
+        # Every turn marks something or is a failed attempt of the active
+        # player, so no game outlasts its sheets
+        assert game.turns <= n_players * (4 * 11 + 3) + 1
+
+
+def test_locked_dice_are_not_rolled():
+    for seed in range(30):
+        game, turns = play(3, seed)
+        for locked, _, faces in turns:
+            for color in locked:
+                assert faces[game.rules.colors.index(color)] == 0
+
+
+def test_locks_apply_to_every_sheet_and_end_the_game():
+    game = Qwixx(2)
+    game.reset(start_player=0)
+    for value in (2, 3, 4, 5, 6):
+        game.players[0].mark_row("Red", value)
+        game.players[1].mark_row("Yellow", value)
+
+    # The active player locks red; the other player passes
+    game.roll = {"White": [12]}
+    game.step(Action("Red", 12))
+    while game.to_move not in (None, game.current_player):
+        game.step(Action())
+    assert not game.enabled_colors["Red"]
+    assert all(player.rows["Red"].closed for player in game.players)
+    assert game.faces[list(game.enabled_colors).index("Red")] == 0
+    assert game.current_player == game.to_move == 1
+
+    # The second lock ends the game at the end of the turn
+    game.roll = {"White": [12]}
+    game.step(Action("Yellow", 12))
+    while game.to_move not in (None, game.current_player):
+        game.step(Action())
+    assert game.to_move is None
@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from DiceSource import BufferedDice
+from MonteCarloPlayer import MonteCarloPlayer
+from Player import RandomPlayer
+from Qwixx import Qwixx
+
+
+class CheckingPlayer(RandomPlayer):
+    """A random player that checks the game it is given."""
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.games = set()
+
+    def choose_action(self, game, player_number, actions):
+        self.games.add(id(game))
+        assert player_number == game.to_move or \
+            player_number in game.waiting_players
+        deciding = game.deciding(player_number)
+        assert deciding.to_move == player_number
+        assert deciding.legal_actions() == actions
+        return super().choose_action(game, player_number, actions)
+
+
+def test_policies_decide_on_the_game_itself():
+    for seed in range(20):
+        policy = CheckingPlayer(seed)
+        game = Qwixx(4, policies=[policy] * 4,
+                     dice_source=BufferedDice(seed))
+        game.play()
+        assert policy.games == {id(game)}
+
+
+def test_monte_carlo_players_play_multiplayer_games():
+    for seed in range(10):
+        policy = MonteCarloPlayer(0.001, max_rollouts=5, seed=seed)
+        game = Qwixx(3, policies=[policy] * 3,
+                     dice_source=BufferedDice(seed))
+        scores = game.play()
+        assert len(scores) == 3 and game.to_move is None
+
+
+def test_monte_carlo_players_with_an_executor():
+    with ThreadPoolExecutor(3) as executor:
+        policies = [MonteCarloPlayer(0.001, max_rollouts=5, seed=i)
+                    for i in range(3)]
+        game = Qwixx(3, policies=policies, dice_source=BufferedDice(1),
+                     executor=executor)
+        game.play()
+        assert game.to_move is None
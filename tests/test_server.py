@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+from Player import Player
+from Server import Server
+
+
+class FailingPlayer(Player):
+    """Raise on every decision."""
+
+    def choose_action(self, game, player_number, actions):
+        raise RuntimeError("broken bot")
+
+
+async def _start(server):
+    listener = await server.serve_tcp(port=0)
+    return listener, listener.sockets[0].getsockname()[1]
+
+
+async def _join(port, **request):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(json.dumps({"cmd": "join", **request}).encode() + b"\n")
+    await writer.drain()
+    assert json.loads(await reader.readline())["type"] == "joined"
+    return reader, writer
+
+
+async def _until(condition):
+    for _ in range(200):
+        if condition():
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+def test_waiting_table_is_removed_with_its_last_client():
+    async def main():
+        server = Server()
+        listener, port = await _start(server)
+        _, first = await _join(port, table="t", players=3)
+        _, second = await _join(port, table="t", players=3)
+
+        first.close()
+        await asyncio.sleep(0.1)
+        assert "t" in server.tables
+        second.close()
+        assert await _until(lambda: "t" not in server.tables)
+
+        listener.close()
+        await listener.wait_closed()
+
+    asyncio.run(main())
+
+
+def test_failing_bot_makes_the_safe_choice(caplog):
+    async def main():
+        server = Server({"failing": FailingPlayer}, timeout=1.0)
+        listener, port = await _start(server)
+        reader, writer = await _join(port, table="t", players=2,
+                                     bots=["failing"])
+
+        while True:
+            message = json.loads(
+                await asyncio.wait_for(reader.readline(), 10))
+            if message["type"] == "decide":
+                writer.write(b'{"cmd": "act", "action": 0}\n')
+                await writer.drain()
+            elif message["type"] == "state":
+                state = message
+            elif message["type"] == "end":
+                break
+
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return state
+
+    state = asyncio.run(main())
+    bot = state["players"][0]
+    assert all(not marks for marks in bot["rows"].values())
+    assert bot["failed_attempts"] > 0
+    assert "failed to decide" in caplog.text
@@ -0,0 +1,56 @@
+import pytest
+
+from Action import Action
+from HeuristicPlayer import CautiousPlayer, GreedyPlayer
+from Qwixx import Qwixx
+from RollTable import RollTable
+from Rules import Rules
+
+
+def test_descending_red_row_pairs():
+    game = Qwixx(1, rules=Rules.variant(descending=("Red",)))
+    game.reset()
+    game.roll = {"White": [8], "Red": [9, 7]}
+
+    actions = game.legal_actions()
+    assert Action("Red", 8, "Red", 9) not in actions
+    assert Action("Red", 8, "Red", 7) in actions
+    with pytest.raises(ValueError):
+        game.check_action(0, Action("Red", 8, "Red", 9))
+
+    game.step(Action("Red", 8, "Red", 7))
+    row = game.players[0].rows["Red"]
+    assert row.count == 2
+    assert row.position(7) == row.last
+
+
+@pytest.mark.parametrize("rules", [
+    Rules.variant(sides=8),
+    Rules.variant(layouts={"Red": (2, 4, 3, 5, 6, 7, 8, 9, 10, 11, 12)}),
+])
+def test_standard_only_bots_reject_other_rules(rules):
+    for policy in (GreedyPlayer(), CautiousPlayer()):
+        game = Qwixx(2, policies=[policy] * 2, rules=rules)
+        with pytest.raises(ValueError, match="standard rules"):
+            game.play()
+
+
+def test_roll_table_rejects_other_rows():
+    table = RollTable.for_colors(("Red",))
+    sheet = Qwixx(1, rules=Rules.variant(sides=8)).players[0]
+    for check in (table.p_white, table.p_colored, table.p_mark):
+        with pytest.raises(ValueError, match="standard rules"):
+            check(sheet.rows["Red"])
+    with pytest.raises(ValueError, match="standard rules"):
+        table.p_any_mark(sheet)
+    assert table.p_mark(Qwixx(1).players[0].rows["Red"]) > 0
+
+
+def test_game_log_rejects_other_rules(tmp_path):
+    pytest.importorskip("numpy")
+    from GameLog import GameLogWriter
+
+    game = Qwixx(2, rules=Rules.variant(colors=("Red", "Blue")))
+    with GameLogWriter(str(tmp_path / "games.qlog")) as log:
+        with pytest.raises(ValueError, match="standard rules"):
+            log.start_game(game, 0)